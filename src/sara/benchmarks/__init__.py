@@ -0,0 +1,7 @@
+"""Suite de benchmarks reproducible (uso: python -m sara.benchmarks --help)."""
+
+from .generate import SCALES, generate
+from .startup import cli_startup
+from .suite import CASES, compare, run_suite
+
+__all__ = ["CASES", "SCALES", "cli_startup", "compare", "generate", "run_suite"]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+from .generate import SCALES, generate
+from .startup import DEFAULT_BUDGET, cli_startup
+from .suite import CASES, compare, load_results, run_suite
+
+app = typer.Typer(help="Benchmarks de SARA (datasets sintéticos, resultados en JSON).")
+
+
+@app.command("run")
+def bench_run(
+    scale: str = typer.Option("1m", "--scale", help=f"{', '.join(SCALES)} o cantidad de filas."),
+    cases: Optional[List[str]] = typer.Option(None, "--case", help=f"Caso (repetible): {', '.join(CASES)}."),
+    repeat: int = typer.Option(3, "--repeat", help="Repeticiones por caso (se reporta la mediana)."),
+    seed: int = typer.Option(42, "--seed", help="Semilla del dataset sintético."),
+    workdir: Path = typer.Option(Path("bench-work"), "--workdir", help="CSVs generados + data_dir temporal."),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Archivo JSON de salida (default: stdout)."),
+    baseline: Optional[Path] = typer.Option(None, "--baseline", help="JSON de otra release para comparar."),
+    tolerance: float = typer.Option(0.2, "--tolerance", help="Empeoramiento tolerado vs baseline (0.2 = 20%)."),
+):
+    """Correr la suite; con --baseline sale con código 1 si hay regresiones."""
+    log = lambda msg: typer.echo(msg, err=True)  # noqa: E731 - progreso a stderr, JSON a stdout
+    results = run_suite(workdir, scale=scale, cases=cases or None, repeat=repeat, seed=seed, log=log)
+
+    payload = json.dumps(results, indent=2)
+    if output is None:
+        typer.echo(payload)
+    else:
+        output.write_text(payload, encoding="utf-8")
+        log(f"resultados: {output}")
+
+    if baseline is not None:
+        rows = compare(load_results(baseline), results, tolerance=tolerance)
+        for row in rows:
+            flag = "REGRESIÓN" if row["regression"] else "ok"
+            log(
+                f"{row['case']:<11} {row['baseline_seconds']:.3f}s -> {row['current_seconds']:.3f}s "
+                f"(x{row['ratio']:.2f}) {flag}"
+            )
+        if any(row["regression"] for row in rows):
+            raise typer.Exit(code=1)
+
+
+@app.command("generate")
+def bench_generate(
+    out_path: Path,
+    rows: str = typer.Option("1m", "--rows", help=f"{', '.join(SCALES)} o cantidad de filas."),
+    kind: str = typer.Option("survey", "--kind", help="survey (hogares) o panel (unidad x año)."),
+    seed: int = typer.Option(42, "--seed", help="Semilla (mismo seed => mismo archivo)."),
+):
+    """Generar un dataset sintético (.csv o .parquet) sin correr la suite."""
+    n = SCALES[rows] if rows in SCALES else int(rows)
+    typer.echo(generate(out_path, n, kind=kind, seed=seed))
+
+
+@app.command("startup")
+def bench_startup(
+    budget: float = typer.Option(DEFAULT_BUDGET, "--budget", help="Mediana máxima por invocación, en segundos."),
+    repeat: int = typer.Option(5, "--repeat", help="Invocaciones por comando."),
+    workdir: Path = typer.Option(Path("bench-work"), "--workdir", help="Directorio desde el que se corre el CLI."),
+):
+    """Medir el arranque del CLI; sale con código 1 si supera --budget o carga módulos pesados."""
+    result = cli_startup(workdir, repeat=repeat)
+    over = False
+    for command, stats in result["commands"].items():
+        slow = stats["median_seconds"] > budget
+        over = over or slow
+        typer.echo(f"sara {command:<14} {stats['median_seconds']:.3f}s {'SOBRE BUDGET' if slow else 'ok'}")
+    if result["heavy_imports"]:
+        over = True
+        typer.echo(f"import sara.cli.app carga: {', '.join(result['heavy_imports'])}")
+    if over:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+
+# Escalas estándar de la suite (filas).
+SCALES = {
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+    "100m": 100_000_000,
+}
+
+# Provincias sintéticas: 24, como en la EPH.
+N_PROVINCIAS = 24
+
+# Años por unidad en el panel.
+PANEL_YEARS = 10
+
+
+def _uniform(salt: int, seed: int) -> str:
+    """
+    Uniforme en (0, 1) determinística por fila: hash(fila, salt, seed).
+
+    No usamos random(): en DuckDB depende del orden de los hilos y el
+    dataset no sería reproducible byte a byte entre corridas.
+    """
+    return f"((hash(range, {int(salt)}, {int(seed)}) % 1000000007) + 0.5) / 1000000007.0"
+
+
+def _normal(salt: int, seed: int) -> str:
+    """Normal estándar (Box-Muller sobre dos uniformes determinísticas)."""
+    return f"(sqrt(-2 * ln({_uniform(salt, seed)})) * cos(2 * pi() * {_uniform(salt + 1, seed)}))"
+
+
+def survey_sql(rows: int, seed: int = 42) -> str:
+    """
+    SELECT que genera una encuesta de hogares sintética (una fila por persona).
+
+    Columnas: id, provincia, edad, sexo, ocupacion, ingreso (log-normal),
+    gasto (correlacionado con ingreso), peso (factor de expansión).
+    """
+    return f"""
+        SELECT
+            range AS id,
+            CAST(hash(range, 1, {int(seed)}) % {N_PROVINCIAS} AS INTEGER) + 1 AS provincia,
+            CAST(15 + floor({_uniform(2, seed)} * 75) AS INTEGER) AS edad,
+            CASE WHEN {_uniform(3, seed)} < 0.5 THEN 'M' ELSE 'F' END AS sexo,
+            CAST(hash(range, 4, {int(seed)}) % 500 AS INTEGER) AS ocupacion,
+            round(exp(11 + 0.8 * {_normal(5, seed)}), 2) AS ingreso,
+            round(exp(10.5 + 0.6 * {_normal(5, seed)} + 0.3 * {_normal(7, seed)}), 2) AS gasto,
+            round(50 + {_uniform(9, seed)} * 950, 3) AS peso
+        FROM range({int(rows)})
+    """
+
+
+def panel_sql(rows: int, seed: int = 42) -> str:
+    """
+    SELECT que genera un panel balanceado sintético (unidad x año).
+
+    y = 1 + 2*x1 - 0.5*x2 + efecto_unidad + efecto_año + ruido, útil para
+    medir regresiones/efectos fijos además de las operaciones básicas.
+    """
+    return f"""
+        SELECT
+            range // {PANEL_YEARS} AS unidad,
+            CAST(2010 + range % {PANEL_YEARS} AS INTEGER) AS anio,
+            CAST(hash(range // {PANEL_YEARS}, 1, {int(seed)}) % {N_PROVINCIAS} AS INTEGER) + 1 AS provincia,
+            {_normal(2, seed)} AS x1,
+            {_normal(4, seed)} AS x2,
+            1 + 2 * {_normal(2, seed)} - 0.5 * {_normal(4, seed)}
+              + ((hash(range // {PANEL_YEARS}, 6, {int(seed)}) % 1000) / 500.0 - 1)
+              + 0.1 * (range % {PANEL_YEARS})
+              + {_normal(8, seed)} AS y
+        FROM range({int(rows)})
+    """
+
+
+def generate(out_path: Path, rows: int, kind: str = "survey", seed: int = 42) -> Path:
+    """
+    Escribe un dataset sintético (CSV o Parquet, según la extensión).
+
+    Mismo (rows, kind, seed) => mismo contenido: los números de la suite se
+    pueden comparar entre releases.
+    """
+    builders = {"survey": survey_sql, "panel": panel_sql}
+    if kind not in builders:
+        raise ValueError(f"Tipo de dataset desconocido: {kind!r} (usar {', '.join(builders)})")
+    if rows <= 0:
+        raise ValueError(f"rows debe ser > 0 (recibido: {rows}).")
+
+    out_path = Path(out_path)
+    suffix = out_path.suffix.lower()
+    if suffix == ".csv":
+        fmt = "FORMAT CSV, HEADER true"
+    elif suffix == ".parquet":
+        fmt = "FORMAT PARQUET"
+    else:
+        raise ValueError(f"Formato no soportado: {out_path.name} (usar .csv o .parquet)")
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with duckdb.connect() as con:
+        # Orden estable de salida (el de range): mismo archivo en cada corrida.
+        con.execute("SET preserve_insertion_order = true")
+        con.execute(f"COPY ({builders[kind](rows, seed)}) TO $1 ({fmt});", [str(out_path)])
+    return out_path
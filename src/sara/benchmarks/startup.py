@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+# Módulos que `import sara.cli.app` NO debe cargar (se importan recién
+# cuando un subcomando usa el Orchestrator).
+HEAVY_MODULES = ("duckdb", "pyarrow", "sara.orchestrator", "sara.engine")
+
+# Mediana máxima por invocación, en segundos (benchmark `startup` y tests/).
+DEFAULT_BUDGET = 0.5
+
+# Invocaciones medidas por defecto: las que no tocan datos.
+DEFAULT_COMMANDS = (("--help",), ("stats", "--help"))
+
+_PROBE = (
+    "import json, sys, sara.cli.app; "
+    "print(json.dumps([m for m in {mods!r} if m in sys.modules]))"
+)
+
+
+def _env() -> Dict[str, str]:
+    # El CLI se corre en otro proceso: que encuentre este mismo sara (src/).
+    env = dict(os.environ)
+    src = str(Path(__file__).resolve().parents[2])
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def heavy_imports(workdir: Path) -> List[str]:
+    """Módulos pesados que quedan cargados tras `import sara.cli.app` (ideal: ninguno)."""
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(mods=HEAVY_MODULES)],
+        cwd=workdir,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def cli_startup(
+    workdir: Path,
+    commands: Sequence[Sequence[str]] = DEFAULT_COMMANDS,
+    repeat: int = 5,
+) -> Dict[str, Any]:
+    """
+    Mide el arranque del CLI: tiempo de pared de `python -m sara.cli.app ...`.
+
+    Cada invocación es un proceso nuevo (como lo llaman los scripts), así
+    que incluye el arranque del intérprete. Se corre desde `workdir` para
+    no ensuciar el data_dir del repo.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat debe ser >= 1 (recibido: {repeat}).")
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    env = _env()
+
+    results: Dict[str, Any] = {}
+    for args in commands:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "sara.cli.app", *args],
+                cwd=workdir,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+            times.append(time.perf_counter() - start)
+        results[" ".join(args)] = {"seconds": times, "median_seconds": statistics.median(times)}
+    return {"commands": results, "heavy_imports": heavy_imports(workdir)}
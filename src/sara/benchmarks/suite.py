@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from queue import Empty
+from typing import Any, Callable, Dict, List, Sequence
+
+from .generate import SCALES, generate
+
+# Identificadores fijos de la suite (las versiones que crea cada caso llevan
+# el nombre del caso + repetición, así las corridas no chocan entre sí).
+DATASET_ID = "bench"
+BASE_VERSION = "v1"
+
+# Casos en orden de ejecución: import_csv primero (crea la versión base).
+CASES = ("import_csv", "filter", "mean", "describe", "preview", "winsorize", "recode", "pipeline")
+
+# Mapping de recode: provincia -> región.
+_REGIONES = {str(p): ("centro", "noa", "nea", "cuyo", "patagonia")[p % 5] for p in range(1, 25)}
+
+
+# ---------------------------
+# Casos
+# ---------------------------
+# Cada caso recibe (orc, csv_path, rows, tag) y hace UNA llamada al
+# Orchestrator. Lo que se mide es solo esa llamada.
+
+
+def _base(orc: Any) -> Any:
+    return orc.get_version(DATASET_ID, BASE_VERSION)
+
+
+def _case_import_csv(orc: Any, csv_path: Path, rows: int, tag: str) -> Any:
+    version = BASE_VERSION if tag.endswith("_0") else tag
+    return orc.import_csv(DATASET_ID, csv_path=csv_path, version=version)
+
+
+def _case_filter(orc: Any, csv_path: Path, rows: int, tag: str) -> Any:
+    return orc.filter(_base(orc), where="edad >= 18 AND ingreso > 50000", out_version=tag)
+
+
+def _case_mean(orc: Any, csv_path: Path, rows: int, tag: str) -> Any:
+    return orc.mean(_base(orc), column="ingreso", where="edad >= 18")
+
+
+def _case_describe(orc: Any, csv_path: Path, rows: int, tag: str) -> Any:
+    return orc.describe(_base(orc), columns=["edad", "ingreso", "gasto"], group_by=["provincia"])
+
+
+def _case_preview(orc: Any, csv_path: Path, rows: int, tag: str) -> Any:
+    # Página del medio: mide el seek por row groups, no la primera página.
+    return orc.preview(_base(orc), limit=100, offset=rows // 2)
+
+
+def _case_winsorize(orc: Any, csv_path: Path, rows: int, tag: str) -> Any:
+    return orc.winsorize(
+        _base(orc), columns=["ingreso", "gasto"], p_low=0.01, p_high=0.99, out_columns=None, out_version=tag
+    )
+
+
+def _case_recode(orc: Any, csv_path: Path, rows: int, tag: str) -> Any:
+    return orc.recode(_base(orc), mappings={"provincia": _REGIONES}, out_columns={"provincia": "region"}, out_version=tag)
+
+
+def _case_pipeline(orc: Any, csv_path: Path, rows: int, tag: str) -> Any:
+    return (
+        orc.pipeline(_base(orc))
+        .filter("edad >= 18")
+        .winsorize(columns=["ingreso", "gasto"], p_low=0.01, p_high=0.99)
+        .recode({"provincia": _REGIONES}, out_columns={"provincia": "region"})
+        .materialize(tag)
+    )
+
+
+_CASES: Dict[str, Callable[[Any, Path, int, str], Any]] = {
+    "import_csv": _case_import_csv,
+    "filter": _case_filter,
+    "mean": _case_mean,
+    "describe": _case_describe,
+    "preview": _case_preview,
+    "winsorize": _case_winsorize,
+    "recode": _case_recode,
+    "pipeline": _case_pipeline,
+}
+
+
+# ---------------------------
+# Medición
+# ---------------------------
+
+
+def _dir_bytes(path: Path) -> int:
+    if not path.exists():
+        return 0
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows: sin getrusage
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB; macOS, bytes.
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _run_case(case: str, workdir: str, csv_path: str, rows: int, tag: str, queue: Any) -> None:
+    """
+    Corre UN caso en un proceso nuevo (spawn).
+
+    Proceso limpio por caso: el pico de RSS es el del caso y no arrastra
+    buffers ni cachés de casos anteriores.
+    """
+    try:
+        from sara.config.setting import SARASettings
+        from sara.orchestrator import Orchestrator
+
+        data_dir = Path(workdir) / "data"
+        settings = SARASettings(
+            data_dir=data_dir,
+            # Catálogo persistente: cada caso corre en otro proceso.
+            repository_backend="sqlite",
+            # Sin caché de resultados: se mide el cómputo, no un lookup.
+            result_cache_entries=0,
+        )
+        with Orchestrator(settings=settings) as orc:
+            try:
+                orc.get_dataset(DATASET_ID)
+            except KeyError:
+                orc.create_dataset(DATASET_ID, name="benchmark")
+
+            datasets_dir = data_dir / "datasets"
+            objects_dir = data_dir / "objects"
+            before = _dir_bytes(datasets_dir) + _dir_bytes(objects_dir)
+            start = time.perf_counter()
+            _CASES[case](orc, Path(csv_path), rows, tag)
+            seconds = time.perf_counter() - start
+            written = _dir_bytes(datasets_dir) + _dir_bytes(objects_dir) - before
+
+        queue.put({"seconds": seconds, "peak_rss_bytes": _peak_rss_bytes(), "bytes_written": max(written, 0)})
+    except BaseException as exc:  # noqa: BLE001 - se reporta al padre
+        queue.put({"error": f"{type(exc).__name__}: {exc}"})
+
+
+# Cada cuánto se mira si el proceso del caso sigue vivo mientras se espera el resultado.
+_POLL_SECONDS = 1.0
+
+
+def _measure(case: str, workdir: Path, csv_path: Path, rows: int, tag: str) -> Dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(case, str(workdir), str(csv_path), rows, tag, queue))
+    proc.start()
+    try:
+        while True:
+            try:
+                return queue.get(timeout=_POLL_SECONDS)
+            except Empty:
+                if proc.is_alive():
+                    continue
+            # El hijo murió sin reportar (OOM killer, segfault de una
+            # extensión): una última lectura por si el resultado quedó en
+            # el pipe justo antes de salir, y si no, caso fallido.
+            try:
+                return queue.get(timeout=_POLL_SECONDS)
+            except Empty:
+                return {"error": f"el proceso del caso terminó sin resultado (exitcode {proc.exitcode})"}
+    finally:
+        proc.join()
+
+
+# ---------------------------
+# Suite
+# ---------------------------
+
+
+def _environment() -> Dict[str, Any]:
+    import duckdb
+
+    try:
+        from importlib.metadata import version
+
+        sara_version = version("sara")
+    except Exception:  # noqa: BLE001 - instalado en modo fuente
+        sara_version = "unknown"
+    return {
+        "sara": sara_version,
+        "duckdb": duckdb.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(
+    workdir: Path,
+    scale: str = "1m",
+    cases: Sequence[str] | None = None,
+    repeat: int = 3,
+    seed: int = 42,
+    log: Callable[[str], None] | None = None,
+) -> Dict[str, Any]:
+    """
+    Corre la suite a una escala y devuelve resultados en formato JSON-able.
+
+    - workdir: CSVs generados (se reutilizan entre corridas: mismo seed =>
+      mismo archivo) y un data_dir de SARA que se crea de cero.
+    - scale: "1m" | "10m" | "100m" o un número de filas.
+    - repeat: repeticiones por caso; se reportan todas y la mediana.
+    """
+    rows = SCALES[scale] if scale in SCALES else int(scale)
+    cases = list(cases) if cases else list(CASES)
+    unknown = [c for c in cases if c not in _CASES]
+    if unknown:
+        raise ValueError(f"Casos desconocidos: {unknown} (válidos: {', '.join(CASES)})")
+    if repeat < 1:
+        raise ValueError(f"repeat debe ser >= 1 (recibido: {repeat}).")
+    log = log or (lambda _msg: None)
+
+    workdir = Path(workdir)
+    csv_path = workdir / f"survey_{rows}_{seed}.csv"
+    if not csv_path.exists():
+        log(f"generando {csv_path.name} ({rows:,} filas)")
+        generate(csv_path, rows, kind="survey", seed=seed)
+
+    shutil.rmtree(workdir / "data", ignore_errors=True)
+    # Todo caso que no es el import necesita la versión base.
+    if "import_csv" not in cases:
+        cases.insert(0, "import_csv")
+        measured = cases[1:]
+    else:
+        cases.sort(key=lambda c: c != "import_csv")
+        measured = cases
+
+    results: List[Dict[str, Any]] = []
+    for case in cases:
+        for rep in range(repeat if case in measured else 1):
+            tag = f"{case}_{rep}"
+            result = _measure(case, workdir, csv_path, rows, tag)
+            if "error" in result:
+                raise RuntimeError(f"Caso {case!r} falló: {result['error']}")
+            if case in measured:
+                results.append({"case": case, "rep": rep, **result})
+                log(f"{case:<11} rep={rep} {result['seconds']:.3f}s")
+
+    summary: Dict[str, Dict[str, Any]] = {}
+    for case in measured:
+        runs = [r for r in results if r["case"] == case]
+        summary[case] = {
+            "median_seconds": statistics.median(r["seconds"] for r in runs),
+            "max_peak_rss_bytes": max(r["peak_rss_bytes"] or 0 for r in runs),
+            "bytes_written": runs[0]["bytes_written"],
+        }
+    return {
+        "suite": "sara-bench/1",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "environment": _environment(),
+        "scale": scale,
+        "rows": rows,
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+        "summary": summary,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Compara medianas contra un baseline (otra release, misma escala).
+
+    Devuelve una fila por caso en común con el ratio actual/baseline;
+    `regression` es True si el tiempo empeoró más que `tolerance` (0.2 = 20%).
+    """
+    if baseline.get("rows") != current.get("rows"):
+        raise ValueError(f"Escalas distintas: baseline {baseline.get('rows')} vs actual {current.get('rows')} filas.")
+    rows = []
+    for case, cur in current["summary"].items():
+        base = baseline.get("summary", {}).get(case)
+        if base is None:
+            continue
+        ratio = cur["median_seconds"] / base["median_seconds"] if base["median_seconds"] else float("inf")
+        rows.append(
+            {
+                "case": case,
+                "baseline_seconds": base["median_seconds"],
+                "current_seconds": cur["median_seconds"],
+                "ratio": ratio,
+                "regression": ratio > 1 + tolerance,
+            }
+        )
+    return rows
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
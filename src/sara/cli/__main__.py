@@ -0,0 +1,5 @@
+"""`python -m sara.cli`: entry point liviano (reenvía a `sara serve` si SARA_SOCKET está seteada)."""
+
+from .client import main
+
+main()
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional, Callable, TypeVar
+from typing import TYPE_CHECKING, List, Optional, Callable, TypeVar
 
 import typer
 
-from sara.orchestrator import Orchestrator
+if TYPE_CHECKING:
+    from sara.orchestrator import Orchestrator
 
 T = TypeVar("T")
 
@@ -15,20 +16,42 @@ T = TypeVar("T")
 
 app = typer.Typer(help="SARA CLI (skeleton). Interfaces datasets, transforms y stats.")
 dataset_app = typer.Typer(help="Crear y consultar datasets.")
+version_app = typer.Typer(help="Metadata de versiones (sin leer datos).")
 import_app = typer.Typer(help="Importar datos (crea versiones inmutables).")
 transform_app = typer.Typer(help="Transformaciones que generan nuevas versiones.")
 stats_app = typer.Typer(help="Estadística descriptiva sobre una versión.")
+ops_app = typer.Typer(help="Operaciones registradas (linaje + telemetría).")
+runs_app = typer.Typer(help="Runs de estadística registrados (telemetría).")
 
 app.add_typer(dataset_app, name="dataset")
+app.add_typer(version_app, name="version")
 app.add_typer(import_app, name="import")
 app.add_typer(transform_app, name="transform")
 app.add_typer(stats_app, name="stats")
+app.add_typer(ops_app, name="ops")
+app.add_typer(runs_app, name="runs")
 
 # ------------------------------------------------------------
 # Orchestrator (Facade)
 # ------------------------------------------------------------
+# Importante: nada pesado a nivel de módulo. Importar sara.orchestrator trae
+# DuckDB y todo el engine; construir el Orchestrator abre catálogo/pool.
+# `sara --help` o un typo en un subcomando no deberían pagar eso: el
+# Orchestrator se arma en el primer uso y queda cacheado para el proceso
+# (`sara serve` lo arma de entrada, con settings de server).
 
-orc = Orchestrator()
+_orchestrator: "Orchestrator | None" = None
+
+
+def _orc() -> "Orchestrator":
+    global _orchestrator
+    if _orchestrator is None:
+        from sara.config.setting import SARASettings
+        from sara.orchestrator import Orchestrator
+
+        # Settings: defaults <- $SARA_CONFIG <- variables SARA_<CAMPO>.
+        _orchestrator = Orchestrator(settings=SARASettings.load())
+    return _orchestrator
 
 
 # ------------------------------------------------------------
@@ -70,13 +93,31 @@ def _cli_guard(fn: Callable[[], T]) -> T:
 
 def _get_version(ref: str):
     dataset_id, version = _parse_dataset_version(ref)
-    return orc.get_version(dataset_id, version)
+    return _orc().get_version(dataset_id, version)
 
 
 def _print_new_version(v) -> None:
     typer.echo(f"Nueva versión: {v.dataset_id}:{v.version}")
 
 
+def _print_columnar(result: dict) -> None:
+    """Imprime un resultado columnar ({col: [valores]}) como tabla alineada."""
+    names = list(result)
+    rows = [[_fmt_cell(v) for v in values] for values in zip(*result.values())]
+    widths = [max([len(n)] + [len(r[i]) for r in rows]) for i, n in enumerate(names)]
+    typer.echo("  ".join(n.ljust(w) for n, w in zip(names, widths)))
+    for r in rows:
+        typer.echo("  ".join(cell.rjust(w) for cell, w in zip(r, widths)))
+
+
+def _fmt_cell(value) -> str:
+    if value is None:
+        return "NA"
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+
 # ------------------------------------------------------------
 # dataset: create/list/show
 # ------------------------------------------------------------
@@ -90,7 +131,7 @@ def dataset_create(
     """Registrar un nuevo dataset lógico."""
 
     def run():
-        dataset = orc.create_dataset(dataset_id=dataset_id, name=name, description=description)
+        dataset = _orc().create_dataset(dataset_id=dataset_id, name=name, description=description)
         typer.echo(f"Dataset creado: {dataset.dataset_id} ({dataset.name})")
 
     _cli_guard(run)
@@ -101,7 +142,7 @@ def dataset_list():
     """Listar datasets registrados."""
 
     def run():
-        datasets = orc.list_datasets()
+        datasets = _orc().list_datasets()
         if not datasets:
             typer.echo("No hay datasets registrados.")
             raise typer.Exit(code=0)
@@ -116,28 +157,122 @@ def dataset_show(dataset_id: str):
     """Mostrar un dataset por id."""
 
     def run():
-        ds = orc.get_dataset(dataset_id)
+        ds = _orc().get_dataset(dataset_id)
         typer.echo(f"{ds.dataset_id} :: {ds.name}")
         if ds.description:
             typer.echo(ds.description)
+        if ds.write_policy:
+            typer.echo(f"Escritura: {_format_policy(ds.write_policy)}")
+        # Metadata guardada en cada versión: no se abre ningún Parquet.
+        for v in _orc().list_versions(dataset_id):
+            typer.echo(f"- {v.version}: {_version_summary(v)}")
+
+    _cli_guard(run)
+
+
+@dataset_app.command("policy")
+def dataset_policy(
+    dataset_id: str,
+    codec: Optional[str] = typer.Option(None, "--codec", help="zstd, snappy, gzip, lz4, brotli o uncompressed."),
+    level: Optional[int] = typer.Option(None, "--level", help="Nivel de zstd (1-22)."),
+    row_group_size: Optional[int] = typer.Option(None, "--row-group-size", help="Filas por row group."),
+    sort_by: Optional[List[str]] = typer.Option(
+        None, "--sort-by", help="Clave de clustering (repetible; en orden: provincia, anio, ...)."
+    ),
+    reset: bool = typer.Option(False, "--reset", help="Volver a los defaults de DuckDB."),
+):
+    """Ver o fijar (reemplaza entera) la política de escritura Parquet de las próximas versiones."""
+
+    def run():
+        orc = _orc()
+        if reset or any(v is not None for v in (codec, level, row_group_size)) or sort_by:
+            orc.set_write_policy(
+                dataset_id, codec=codec, level=level, row_group_size=row_group_size, sort_by=sort_by or None
+            )
+        policy = orc.get_dataset(dataset_id).write_policy
+        typer.echo(f"{dataset_id}: {_format_policy(policy) if policy else 'defaults de DuckDB'}")
+
+    _cli_guard(run)
+
+
+# ------------------------------------------------------------
+# version: info
+# ------------------------------------------------------------
+
+@version_app.command("info")
+def version_info(
+    dataset_version: str,
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Recalcular desde los footers Parquet (versiones sin metadata)."
+    ),
+):
+    """Esquema, filas, columnas, archivos y tamaño de una versión (guardados al crearla)."""
+
+    def run():
+        orc = _orc()
+        dv = _get_version(dataset_version)
+        if refresh:
+            dv = orc.refresh_version_info(dv)
+        info = orc.version_info(dv)
+        kind = " (virtual)" if info["virtual"] else ""
+        parent = f"  padre: {info['parent_version']}" if info["parent_version"] else ""
+        typer.echo(f"{info['dataset_id']}:{info['version']}{kind}{parent}")
+        typer.echo(f"path: {info['path']}")
+        typer.echo(_version_summary(dv))
+        if info["schema"]:
+            _print_columnar({"column": list(info["schema"]), "type": list(info["schema"].values())})
 
     _cli_guard(run)
 
 
+def _version_summary(v) -> str:
+    if v.schema is None:
+        return "sin metadata (versión anterior; `sara version info --refresh`)"
+    rows = "? (filtro virtual)" if v.num_rows is None else f"{v.num_rows:,}"
+    return f"{rows} filas x {v.num_columns} columnas, {v.num_files} archivo(s), {_fmt_bytes(v.size_bytes)}"
+
+
+def _fmt_bytes(n: int) -> str:
+    size = float(n)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} B" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _format_policy(policy: dict) -> str:
+    return ", ".join(f"{k}={','.join(v) if isinstance(v, list) else v}" for k, v in policy.items())
+
+
 # ------------------------------------------------------------
-# import: csv/xlsx
+# import: csv/xlsx/append
 # ------------------------------------------------------------
 
 @import_app.command("csv")
 def import_csv(
     dataset_id: str,
-    csv_path: Path,
+    csv_paths: List[str] = typer.Argument(..., help="CSV, directorio o glob (uno o varios)."),
     version: str = typer.Option("v1", help="Versión que se creará (inmutable)."),
+    partition_by: Optional[List[str]] = typer.Option(
+        None, "--partition-by", help="Columna de partición hive (repetible)."
+    ),
+    row_group_size: Optional[int] = typer.Option(None, "--row-group-size", help="Filas por row group Parquet."),
+    file_size: Optional[str] = typer.Option(
+        None, "--file-size", help="Tamaño objetivo por archivo (ej: 256MB). No combina con --partition-by."
+    ),
 ):
-    """Importar un CSV y crear la primera versión en Parquet."""
+    """Importar uno o varios CSV y crear la primera versión en Parquet."""
 
     def run():
-        version_obj = orc.import_csv(dataset_id=dataset_id, csv_path=csv_path, version=version)
+        version_obj = _orc().import_csv(
+            dataset_id=dataset_id,
+            csv_path=csv_paths,
+            version=version,
+            partition_by=partition_by or None,
+            row_group_size=row_group_size,
+            file_size_bytes=file_size,
+        )
         typer.echo(f"Versión creada: {version_obj.dataset_id}:{version_obj.version} -> {version_obj.path}")
 
     _cli_guard(run)
@@ -153,12 +288,29 @@ def import_xlsx(
     """Importar un Excel y crear la primera versión en Parquet."""
 
     def run():
-        version_obj = orc.import_xlsx(dataset_id=dataset_id, xlsx_path=xlsx_path, version=version, sheet=sheet)
+        version_obj = _orc().import_xlsx(dataset_id=dataset_id, xlsx_path=xlsx_path, version=version, sheet=sheet)
         typer.echo(f"Versión creada: {version_obj.dataset_id}:{version_obj.version} -> {version_obj.path}")
 
     _cli_guard(run)
 
 
+@import_app.command("append")
+def import_append(
+    dataset_version: str,
+    csv_paths: List[str] = typer.Argument(..., help="CSV, directorio o glob con las filas nuevas."),
+    out_version: str = typer.Option(..., "--out-version", help="Versión nueva (padre + delta)."),
+    row_group_size: Optional[int] = typer.Option(None, "--row-group-size", help="Filas por row group Parquet."),
+):
+    """Sumar filas nuevas a una versión sin reescribir sus archivos (delta)."""
+
+    def run():
+        dv = _get_version(dataset_version)
+        version_obj = _orc().append(dv, csv_path=csv_paths, out_version=out_version, row_group_size=row_group_size)
+        _print_new_version(version_obj)
+
+    _cli_guard(run)
+
+
 # ------------------------------------------------------------
 # preview / profile (top-level)
 # ------------------------------------------------------------
@@ -166,18 +318,19 @@ def import_xlsx(
 @app.command("preview")
 def preview(
     dataset_version: str,
-    limit: int = typer.Option(100, "--limit", "-l", help="Filas a mostrar (<=100)."),
+    limit: int = typer.Option(100, "--limit", "-l", help="Filas a mostrar."),
+    offset: int = typer.Option(0, "--offset", "-o", help="Primera fila (salta row groups sin leerlos)."),
+    columns: Optional[List[str]] = typer.Option(None, "--col", help="Columna a mostrar (repetible)."),
 ):
-    """Preview controlado de una versión."""
-    if limit > 100:
-        raise typer.BadParameter("limit máximo es 100 (ajustar CLI si querés más).")
+    """Preview paginado de una versión (streaming por record batches)."""
 
     def run():
         dv = _get_version(dataset_version)
-        rows = orc.preview(dv, limit=limit)
-        typer.echo(f"Preview de {dataset_version} (primeras {limit} filas):")
-        for row in rows:
-            typer.echo(str(row))
+        typer.echo(f"Preview de {dataset_version} (filas {offset}..{offset + limit - 1}):")
+        # Las filas se convierten a dict batch a batch, recién al imprimir.
+        for batch in _orc().scan(dv, columns=columns or None, offset=offset, limit=limit):
+            for row in batch.to_pylist():
+                typer.echo(str(row))
 
     _cli_guard(run)
 
@@ -188,8 +341,11 @@ def profile(dataset_version: str):
 
     def run():
         dv = _get_version(dataset_version)
-        profile_data = orc.profile(dv)
-        typer.echo(profile_data)
+        profile_data = _orc().profile(dv)
+        typer.echo(f"Perfil de {dataset_version}: {profile_data['rows']} filas")
+        for name, info in profile_data["columns"].items():
+            stats = ", ".join(f"{k}={v}" for k, v in info.items() if k not in ("type", "stats_from_footer"))
+            typer.echo(f"- {name} ({info['type']}): {stats}")
 
     _cli_guard(run)
 
@@ -203,12 +359,30 @@ def transform_filter(
     dataset_version: str,
     where: str = typer.Option(..., "--where", help="Condición SQL-ish."),
     out_version: str = typer.Option(..., "--out-version", help="Nueva versión (ej: v2)."),
+    virtual: bool = typer.Option(False, "--virtual", help="No escribir Parquet: la versión es una vista."),
 ):
     """Filtrar filas y generar nueva versión."""
 
     def run():
         dv = _get_version(dataset_version)
-        new_version = orc.filter(dataset_version=dv, where=where, out_version=out_version)
+        new_version = _orc().filter(dataset_version=dv, where=where, out_version=out_version, virtual=virtual)
+        _print_new_version(new_version)
+
+    _cli_guard(run)
+
+
+@transform_app.command("select")
+def transform_select(
+    dataset_version: str,
+    columns: List[str] = typer.Option(..., "--col", help="Columna a conservar (repetible, en orden)."),
+    out_version: str = typer.Option(..., "--out-version", help="Nueva versión (ej: v2)."),
+    virtual: bool = typer.Option(False, "--virtual", help="No escribir Parquet: la versión es una vista."),
+):
+    """Quedarse con un subconjunto de columnas y generar nueva versión."""
+
+    def run():
+        dv = _get_version(dataset_version)
+        new_version = _orc().select(dataset_version=dv, columns=columns, out_version=out_version, virtual=virtual)
         _print_new_version(new_version)
 
     _cli_guard(run)
@@ -217,23 +391,31 @@ def transform_filter(
 @transform_app.command("winsorize")
 def transform_winsorize(
     dataset_version: str,
-    column: str = typer.Option(..., "--col", help="Columna a winsorizar."),
+    columns: List[str] = typer.Option(..., "--col", help="Columna a winsorizar (repetible)."),
     p_low: float = typer.Option(0.01, "--p-low", help="Percentil inferior."),
     p_high: float = typer.Option(0.99, "--p-high", help="Percentil superior."),
-    out_column: Optional[str] = typer.Option(None, "--out-col", help="Columna de salida (default: reemplaza)."),
+    out_columns: Optional[List[str]] = typer.Option(
+        None, "--out-col", help="Columna de salida, una por --col (default: reemplaza)."
+    ),
+    group_by: Optional[List[str]] = typer.Option(None, "--by", help="Winsorizar dentro de grupos (repetible)."),
+    approx: bool = typer.Option(False, "--approx", help="Cuantiles aproximados (sketch, memoria acotada)."),
     out_version: str = typer.Option(..., "--out-version", help="Nueva versión (ej: v2)."),
 ):
-    """Winsorizar columna y generar nueva versión."""
+    """Winsorizar una o varias columnas y generar nueva versión (una sola reescritura)."""
+    if out_columns and len(out_columns) != len(columns):
+        raise typer.BadParameter("--out-col debe repetirse tantas veces como --col.")
 
     def run():
         dv = _get_version(dataset_version)
-        new_version = orc.winsorize(
+        new_version = _orc().winsorize(
             dataset_version=dv,
-            column=column,
+            columns=columns,
             p_low=p_low,
             p_high=p_high,
-            out_column=out_column,
+            out_columns=out_columns or None,
             out_version=out_version,
+            group_by=group_by or None,
+            approx=approx,
         )
         _print_new_version(new_version)
 
@@ -243,23 +425,35 @@ def transform_winsorize(
 @transform_app.command("recode")
 def transform_recode(
     dataset_version: str,
-    column: str = typer.Option(..., "--col", help="Columna a recodificar."),
-    mapping: str = typer.Option(..., "--map", help="JSON mapping ej: '{\"M\":1,\"F\":0}'."),
-    out_column: Optional[str] = typer.Option(None, "--out-col", help="Columna de salida (default: reemplaza)."),
+    columns: List[str] = typer.Option(..., "--col", help="Columna a recodificar (repetible)."),
+    mappings: List[str] = typer.Option(
+        ...,
+        "--map",
+        help="Mapping por --col: JSON inline (ej: '{\"M\":1,\"F\":0}') o path a .csv/.parquet/.json.",
+    ),
+    out_columns: Optional[List[str]] = typer.Option(
+        None, "--out-col", help="Columna de salida, una por --col (default: reemplaza)."
+    ),
     out_version: str = typer.Option(..., "--out-version", help="Nueva versión (ej: v2)."),
 ):
-    """Recodificar columna con mapping JSON y generar nueva versión."""
+    """Recodificar columnas con mappings (JSON o archivo) y generar nueva versión."""
+    if len(mappings) != len(columns):
+        raise typer.BadParameter("--map debe repetirse tantas veces como --col.")
+    if out_columns and len(out_columns) != len(columns):
+        raise typer.BadParameter("--out-col debe repetirse tantas veces como --col.")
 
     def run():
         import json
 
-        mapping_dict = json.loads(mapping)
+        parsed: dict = {}
+        for col, raw in zip(columns, mappings):
+            # JSON inline si parece un objeto; si no, se interpreta como path.
+            parsed[col] = json.loads(raw) if raw.lstrip().startswith("{") else raw
         dv = _get_version(dataset_version)
-        new_version = orc.recode(
+        new_version = _orc().recode(
             dataset_version=dv,
-            column=column,
-            mapping=mapping_dict,
-            out_column=out_column,
+            mappings=parsed,
+            out_columns=dict(zip(columns, out_columns)) if out_columns else None,
             out_version=out_version,
         )
         _print_new_version(new_version)
@@ -288,23 +482,300 @@ def stats_mean(
 
     def run():
         dv = _get_version(dataset_version)
-        result = orc.mean(dataset_version=dv, column=column, where=where)
+        result = _orc().mean(dataset_version=dv, column=column, where=where)
         typer.echo(f"Mean({column}) = {result}")
 
     _cli_guard(run)
 
 
+@stats_app.command("describe")
+def stats_describe(
+    dataset_version: str,
+    columns: Optional[List[str]] = typer.Option(
+        None, "--col", help="Columna a describir (repetible; default: todas las numéricas)."
+    ),
+    stats: Optional[List[str]] = typer.Option(
+        None, "--stat", help="n, missing, mean, sd, min, max, percentiles (repetible; default: todos)."
+    ),
+    group_by: Optional[List[str]] = typer.Option(None, "--by", help="Agrupar por columna (repetible)."),
+    percentiles: Optional[List[float]] = typer.Option(
+        None, "--pct", help="Percentil en [0, 1] (repetible; default: 0.25, 0.5, 0.75)."
+    ),
+    where: Optional[str] = typer.Option(None, "--where", help="Filtro opcional."),
+    approx: bool = typer.Option(False, "--approx", help="Percentiles aproximados (sketch)."),
+):
+    """Estadística descriptiva de varias columnas (y grupos) en un solo scan."""
+
+    def run():
+        dv = _get_version(dataset_version)
+        result = _orc().describe(
+            dataset_version=dv,
+            columns=columns or None,
+            stats=stats or None,
+            group_by=group_by or None,
+            percentiles=percentiles or (0.25, 0.5, 0.75),
+            where=where,
+            approx=approx,
+        )
+        _print_columnar(result)
+
+    _cli_guard(run)
+
+
+@stats_app.command("ols")
+def stats_ols(
+    dataset_version: str,
+    y: str = typer.Option(..., "--y", help="Variable dependiente."),
+    x: List[str] = typer.Option(..., "--x", help="Regresor (repetible)."),
+    weights: Optional[str] = typer.Option(None, "--weights", help="Columna de pesos (WLS)."),
+    where: Optional[str] = typer.Option(None, "--where", help="Filtro opcional."),
+    constant: bool = typer.Option(True, "--constant/--no-constant", help="Incluir constante."),
+    se: str = typer.Option("classical", "--se", help="classical, hc0, hc1, hc2 o hc3."),
+    cluster: Optional[List[str]] = typer.Option(
+        None, "--cluster", help="Errores por cluster (repetible: hasta dos vías)."
+    ),
+    fe: Optional[List[str]] = typer.Option(
+        None, "--fe", help="Efecto fijo a absorber (repetible: unidad, año, ...)."
+    ),
+):
+    """Regresión lineal OLS/WLS en un scan (X'X y X'y en DuckDB, sin cargar datos)."""
+
+    def run():
+        dv = _get_version(dataset_version)
+        result = _orc().ols(
+            dv, y=y, x=x, weights=weights, where=where, add_constant=constant, se=se, cluster=cluster or None, fe=fe or None
+        )
+        _print_regression(result)
+
+    _cli_guard(run)
+
+
+@stats_app.command("bootstrap")
+def stats_bootstrap(
+    dataset_version: str,
+    stat: str = typer.Option("mean", "--stat", help="mean u ols."),
+    column: Optional[str] = typer.Option(None, "--col", help="Columna (mean)."),
+    y: Optional[str] = typer.Option(None, "--y", help="Variable dependiente (ols)."),
+    x: Optional[List[str]] = typer.Option(None, "--x", help="Regresor (ols; repetible)."),
+    weights: Optional[str] = typer.Option(None, "--weights", help="Columna de pesos (ols: WLS)."),
+    constant: bool = typer.Option(True, "--constant/--no-constant", help="Incluir constante (ols)."),
+    where: Optional[str] = typer.Option(None, "--where", help="Filtro opcional."),
+    replicates: int = typer.Option(1000, "--reps", help="Cantidad de réplicas."),
+    seed: int = typer.Option(0, "--seed", help="Semilla (mismo seed -> mismas réplicas)."),
+    level: float = typer.Option(0.95, "--level", help="Nivel del intervalo percentil."),
+    batch_size: Optional[int] = typer.Option(None, "--batch-size", help="Réplicas por scan (default: settings)."),
+    workers: Optional[int] = typer.Option(None, "--workers", help="Procesos (0 = uno por core; default: settings)."),
+):
+    """Bootstrap (pesos Poisson en DuckDB, réplicas por lotes en un pool de procesos)."""
+
+    def run():
+        if stat == "mean":
+            if not column:
+                raise ValueError("--stat mean requiere --col.")
+            params = {"column": column, "where": where}
+        elif stat == "ols":
+            if not y or not x:
+                raise ValueError("--stat ols requiere --y y al menos un --x.")
+            params = {"y": y, "x": x, "weights": weights, "where": where, "add_constant": constant}
+        else:
+            raise ValueError(f"Estadístico sin bootstrap: {stat!r} (válidos: mean, ols).")
+        dv = _get_version(dataset_version)
+        result = _orc().bootstrap(
+            dv, stat=stat, replicates=replicates, seed=seed, level=level, batch_size=batch_size, workers=workers, **params
+        )
+        typer.echo(
+            f"Bootstrap {stat}: {result['replicates']} réplicas, seed={result['seed']}"
+            f" ({result['batches']} scans, {result['workers']} procesos; IC percentil {result['level']:g})"
+        )
+        _print_columnar(result["estimates"])
+        if "run_id" in result:
+            typer.echo(f"Run: {result['run_id']}")
+
+    _cli_guard(run)
+
+
+def _print_regression(result: dict) -> None:
+    typer.echo(
+        f"{result['method'].upper()} {result['y']} ~ {' + '.join(result['coefficients']['term'])}"
+        f"  (n={result['n']}, R²={_fmt_cell(result['r2'])}, R² adj={_fmt_cell(result['adj_r2'])},"
+        f" se={result['se_type']})"
+    )
+    if "fe" in result:
+        levels = ", ".join(f"{f}={n}" for f, n in zip(result["fe"], result["fe_levels"]))
+        converged = "" if result["fe_converged"] else " SIN CONVERGER"
+        typer.echo(f"Efectos fijos: {levels} (R² within; {result['fe_iterations']} iteraciones{converged})")
+    _print_columnar(result["coefficients"])
+    if "run_id" in result:
+        typer.echo(f"Run: {result['run_id']}")
+
+
+# ------------------------------------------------------------
+# ops / runs: telemetría
+# ------------------------------------------------------------
+
+# Métricas que se muestran en los listados (el detalle completo: show).
+_METRIC_COLUMNS = ("seconds", "rows_scanned", "rows_written", "bytes_read", "bytes_written", "peak_memory_bytes")
+
+
+def _metrics_table(records, label: str, ref) -> dict:
+    table: dict = {"id": [], label: [], "ref": []}
+    table.update({m: [] for m in _METRIC_COLUMNS})
+    for rec in records:
+        metrics = rec.metrics or {}
+        table["id"].append(getattr(rec, "operation_id", None) or rec.run_id)
+        table[label].append(getattr(rec, label))
+        table["ref"].append(ref(rec))
+        for m in _METRIC_COLUMNS:
+            table[m].append(metrics.get(m))
+    return table
+
+
+def _sort_slowest(records):
+    return sorted(records, key=lambda r: (r.metrics or {}).get("seconds") or 0.0, reverse=True)
+
+
+def _print_record(record) -> None:
+    import json
+    from dataclasses import asdict
+
+    typer.echo(json.dumps(asdict(record), indent=2, default=str))
+
+
+@ops_app.command("list")
+def ops_list(
+    kind: Optional[str] = typer.Option(None, "--kind", help="Solo operaciones de este tipo (ej: winsorize)."),
+    limit: int = typer.Option(20, "--limit", help="Cantidad máxima (más recientes primero)."),
+    slowest: bool = typer.Option(False, "--slowest", help="Ordenar por tiempo (más lentas primero)."),
+):
+    """Listar operaciones con su telemetría (tiempo, filas, bytes, memoria)."""
+
+    def run():
+        ops = _orc().list_operations(kind=kind, limit=limit)
+        if slowest:
+            ops = _sort_slowest(ops)
+        _print_columnar(_metrics_table(ops, "kind", lambda op: op.params.get("output") or op.params.get("input")))
+
+    _cli_guard(run)
+
+
+@ops_app.command("show")
+def ops_show(operation_id: str):
+    """Detalle de una operación (params + métricas completas, incluido el profile)."""
+
+    def run():
+        _print_record(_orc().get_operation(operation_id))
+
+    _cli_guard(run)
+
+
+@runs_app.command("list")
+def runs_list(
+    dataset_version: Optional[str] = typer.Option(None, "--version", help="Filtrar por <dataset_id>:<version>."),
+    method: Optional[str] = typer.Option(None, "--method", help="Filtrar por método (mean, describe, ...)."),
+    limit: int = typer.Option(20, "--limit", help="Cantidad máxima (más recientes primero)."),
+    slowest: bool = typer.Option(False, "--slowest", help="Ordenar por tiempo (más lentos primero)."),
+):
+    """Listar runs de estadística con su telemetría."""
+
+    def run():
+        dv = _get_version(dataset_version) if dataset_version else None
+        runs = _orc().list_runs(dataset_version=dv, method=method, limit=limit)
+        if slowest:
+            runs = _sort_slowest(runs)
+        _print_columnar(_metrics_table(runs, "method", lambda r: r.dataset_version))
+
+    _cli_guard(run)
+
+
+@runs_app.command("show")
+def runs_show(run_id: str):
+    """Detalle de un run (params + métricas completas)."""
+
+    def run():
+        _print_record(_orc().get_run(run_id))
+
+    _cli_guard(run)
+
+
 # ------------------------------------------------------------
 # Extras: run/debug-state (skeleton)
 # ------------------------------------------------------------
 
 @app.command("run")
-def run_from_spec(spec_path: Path):
-    """Ejecutar una spec JSON/YAML (placeholder)."""
+def run_from_spec(
+    spec_path: Path,
+    max_workers: Optional[int] = typer.Option(
+        None, "--max-workers", "-j", help="Pasos independientes en paralelo (default: spec/settings)."
+    ),
+):
+    """Ejecutar una spec JSON/YAML (DAG de imports, transformaciones y stats)."""
 
     def run():
-        typer.echo(f"Leer spec: {spec_path} (pendiente de implementación)")
-        _catch_not_implemented()
+        results = _orc().run_spec(spec_path, max_workers=max_workers)
+        for r in results:
+            line = f"[{r.status}] {r.step_id}"
+            if r.output:
+                line += f" -> {r.output}"
+            if isinstance(r.value, dict) and "run_id" in r.value:
+                line += f" = run {r.value['run_id']}"
+            elif r.value is not None:
+                line += f" = {r.value}"
+            if r.error:
+                line += f" ({r.error})"
+            if r.status in ("ok", "failed"):
+                line += f" [{r.seconds:.2f}s]"
+            typer.echo(line)
+        return any(r.status in ("failed", "blocked") for r in results)
+
+    # Exit fuera del guard: el guard atrapa Exception (y click.Exit lo es).
+    if _cli_guard(run):
+        raise typer.Exit(code=1)
+
+
+@app.command("materialize")
+def materialize(dataset_version: str):
+    """Escribir a Parquet una versión virtual (no-op si ya es física)."""
+
+    def run():
+        dv = _get_version(dataset_version)
+        _orc().materialize(dv)
+        typer.echo(f"Versión materializada: {dv.dataset_id}:{dv.version}")
+
+    _cli_guard(run)
+
+
+@app.command("serve")
+def serve(
+    socket_path: Optional[Path] = typer.Option(
+        None, "--socket", help="Socket Unix (default: settings.server_socket o data/sara.sock)."
+    ),
+):
+    """Server residente: Orchestrator, conexiones DuckDB y cachés vivos entre comandos.
+
+    Los comandos se le mandan con SARA_SOCKET=<socket> python -m sara.cli ...
+    """
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        typer.secho("`sara serve` necesita sockets Unix (no disponible en esta plataforma).", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    def run():
+        global _orchestrator
+        from sara.config.setting import SARASettings
+        from sara.orchestrator import Orchestrator
+
+        from .server import invoke_cli, server_settings
+        from .server import serve as serve_forever
+
+        settings = server_settings(SARASettings.load())
+        _orchestrator = Orchestrator(settings=settings)
+        path = Path(socket_path).resolve() if socket_path else settings.server_socket
+        try:
+            serve_forever(path, lambda argv: invoke_cli(app, argv))
+        finally:
+            _orchestrator.close()
+            _orchestrator = None
 
     _cli_guard(run)
 
@@ -314,10 +785,16 @@ def debug_state():
     """Imprimir estado en memoria del repositorio (útil en skeleton)."""
 
     def run():
-        typer.echo(orc.repository.as_debug_dict())
+        typer.echo(_orc().repository.as_debug_dict())
+        typer.echo({"result_cache": _orc().cache_stats()})
 
     _cli_guard(run)
 
 
 if __name__ == "__main__":
+    import sys
+
+    from sara.cli.client import forward_from_env
+
+    forward_from_env(sys.argv[1:])
     app()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Sequence
+
+# Si está seteada, el CLI reenvía cada comando al server de `sara serve`
+# que escucha en ese socket (en vez de correrlo en un proceso nuevo).
+SOCKET_ENV = "SARA_SOCKET"
+
+
+def forward(argv: Sequence[str], socket_path: Path) -> int:
+    """
+    Manda un comando al server y replica su salida; devuelve el exit code.
+
+    Cliente mínimo a propósito: solo stdlib, sin typer ni DuckDB. El costo
+    de un comando reenviado es el arranque del intérprete + la query.
+    """
+    request = {"argv": list(argv), "cwd": os.getcwd()}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError as exc:
+            sys.stderr.write(f"No hay server SARA en {socket_path} ({exc}). Levantarlo con `sara serve`.\n")
+            return 1
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as fh:
+            line = fh.readline()
+    if not line:
+        sys.stderr.write("El server SARA cerró la conexión sin responder.\n")
+        return 1
+
+    response = json.loads(line)
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return int(response["exit_code"])
+
+
+def forward_from_env(argv: Sequence[str]) -> None:
+    """Si SARA_SOCKET está seteada, reenvía `argv` y termina el proceso."""
+    socket_path = os.environ.get(SOCKET_ENV)
+    if socket_path and list(argv[:1]) != ["serve"]:
+        sys.exit(forward(argv, Path(socket_path)))
+
+
+def main() -> None:
+    """Entry point de `python -m sara.cli`: reenvía al server o corre local."""
+    forward_from_env(sys.argv[1:])
+
+    from .app import app
+
+    app(prog_name="sara")
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+
+# ---------------------------
+# Protocolo
+# ---------------------------
+# Una conexión = un comando. El cliente manda UNA línea JSON y el server
+# responde UNA línea JSON y cierra:
+#
+#   -> {"argv": ["stats", "mean", "hogares:v1", "-c", "ingreso"], "cwd": "/home/x"}
+#   <- {"exit_code": 0, "stdout": "...", "stderr": "..."}
+#
+# argv es exactamente lo que iría después de `sara` en la línea de comandos.
+
+
+def _read_message(fh: Any) -> Dict[str, Any] | None:
+    line = fh.readline()
+    # Conexión sin mensaje: el chequeo de "¿hay server vivo?" de _claim_socket.
+    return json.loads(line) if line else None
+
+
+def _write_message(fh: Any, message: Dict[str, Any]) -> None:
+    fh.write((json.dumps(message) + "\n").encode("utf-8"))
+    fh.flush()
+
+
+@contextmanager
+def _chdir(path: str | None) -> Iterator[None]:
+    """Corre el comando desde el cwd del cliente (paths relativos de CSV/spec)."""
+    if not path:
+        yield
+        return
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+# ---------------------------
+# Server
+# ---------------------------
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "SaraServer"
+
+    def handle(self) -> None:
+        try:
+            request = _read_message(self.rfile)
+            if request is None:
+                return
+            response = self.server.execute(request)
+        except (ValueError, KeyError, TypeError) as exc:
+            response = {"exit_code": 2, "stdout": "", "stderr": f"Request inválido: {exc}\n"}
+        try:
+            _write_message(self.wfile, response)
+        except BrokenPipeError:
+            pass  # el cliente se fue (Ctrl-C) antes de la respuesta
+
+
+class SaraServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Server residente de `sara serve` sobre un socket Unix local.
+
+    - `invoke(argv) -> exit_code` corre un comando del CLI en este proceso
+      (mismo Orchestrator, conexiones DuckDB y cachés entre comandos).
+    - Un hilo por conexión, pero los comandos corren de a uno: stdout/stderr
+      y el cwd son del proceso, y se capturan por comando. Cada query de
+      DuckDB ya usa todos los cores, así que serializar cuesta poco.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, socket_path: Path, invoke: Callable[[List[str]], int]) -> None:
+        self.socket_path = Path(socket_path)
+        self.invoke = invoke
+        self._lock = threading.Lock()
+        _claim_socket(self.socket_path)
+        super().__init__(str(self.socket_path), _Handler)
+        # Solo el usuario dueño puede mandar comandos.
+        os.chmod(self.socket_path, 0o600)
+
+    def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        argv = [str(a) for a in request["argv"]]
+        if argv[:1] == ["serve"]:
+            return {"exit_code": 2, "stdout": "", "stderr": "`serve` no se puede reenviar al server.\n"}
+
+        out, err = io.StringIO(), io.StringIO()
+        with self._lock, _chdir(request.get("cwd")), redirect_stdout(out), redirect_stderr(err):
+            try:
+                code = self.invoke(argv)
+            except Exception:  # noqa: BLE001 - el server no se cae por un comando
+                traceback.print_exc()
+                code = 1
+        return {"exit_code": code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+def _claim_socket(path: Path) -> None:
+    """Borra un socket huérfano (server muerto); falla si hay uno vivo."""
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except OSError:
+        path.unlink()
+    else:
+        raise RuntimeError(f"Ya hay un server SARA escuchando en {path}.")
+    finally:
+        probe.close()
+
+
+def invoke_cli(app: Any, argv: List[str]) -> int:
+    """
+    Corre el CLI de Typer en este proceso y devuelve el exit code.
+
+    Modo standalone (como desde la terminal): typer formatea errores de uso,
+    --help, typer.Exit, y termina con SystemExit, que acá se atrapa.
+    """
+    try:
+        app(args=argv, prog_name="sara")
+    except SystemExit as exc:
+        if exc.code is None:
+            return 0
+        return exc.code if isinstance(exc.code, int) else 1
+    return 0
+
+
+def server_settings(settings: Any) -> Any:
+    """
+    Settings del server a partir de los del CLI.
+
+    - Paths absolutos: cada comando corre con el cwd de SU cliente, pero el
+      data_dir/catálogo tienen que ser siempre los del server.
+    - Pool de cursores DuckDB (server_pool_size): conexiones calientes.
+    """
+    from dataclasses import replace
+
+    from sara.storage.layaout import StorageLayout
+
+    data_dir = Path(settings.data_dir).resolve()
+    database = settings.duckdb_database
+    if database != ":memory:":
+        database = str(Path(database).resolve())
+    catalog = Path(settings.catalog_path).resolve() if settings.catalog_path else None
+    socket_path = Path(settings.server_socket).resolve() if settings.server_socket else StorageLayout(data_dir).socket_path()
+    return replace(
+        settings,
+        data_dir=data_dir,
+        duckdb_database=database,
+        catalog_path=catalog,
+        server_socket=socket_path,
+        duckdb_pool_size=settings.server_pool_size,
+    )
+
+
+def serve(socket_path: Path, invoke: Callable[[List[str]], int]) -> None:
+    """Atiende comandos hasta Ctrl-C / SIGTERM; borra el socket al salir."""
+    import signal
+
+    def _stop(*_: Any) -> None:
+        raise KeyboardInterrupt
+
+    with SaraServer(socket_path, invoke) as server:
+        # SIGTERM (systemd, kill) sale igual que Ctrl-C: limpia el socket.
+        signal.signal(signal.SIGTERM, _stop)
+        sys.stderr.write(f"SARA escuchando en {server.socket_path} (SARA_SOCKET={server.socket_path}); Ctrl-C para salir.\n")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
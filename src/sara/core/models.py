@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 
 @dataclass
@@ -9,6 +9,9 @@ class Dataset:
     name: str
     description: str | None = None
     created_at: datetime | None = None
+    # Cómo se escriben sus versiones (engine.write_policy.WritePolicy.to_dict):
+    # codec, level, row_group_size, sort_by. None = defaults de DuckDB.
+    write_policy: Dict[str, Any] | None = None
 
 
 @dataclass
@@ -18,6 +21,20 @@ class DatasetVersion:
     path: str
     created_at: datetime | None = None
     operation_id: str | None = None
+    # Versión de origen dentro del mismo dataset (None para imports).
+    parent_version: str | None = None
+    # Metadata calculada al registrar la versión (footers Parquet + tamaño de
+    # archivos), para responder sin volver a abrir datos:
+    # - schema: columna -> tipo DuckDB (en orden)
+    # - num_files / size_bytes: lo que lee una consulta sobre la versión
+    #   (en append/virtual incluye archivos compartidos con el padre)
+    # None = versión registrada antes de tener metadata, o num_rows de una
+    # versión virtual con filtro (contarla exige un scan).
+    schema: Dict[str, str] | None = None
+    num_rows: int | None = None
+    num_columns: int | None = None
+    num_files: int | None = None
+    size_bytes: int | None = None
 
 
 @dataclass
@@ -26,6 +43,9 @@ class Operation:
     kind: str
     params: Dict[str, str]
     created_at: datetime | None = None
+    # Telemetría de la ejecución: seconds, rows_scanned, rows_written,
+    # bytes_read/bytes_written, peak_memory_bytes, ... (y "profile" opcional).
+    metrics: Dict[str, Any] | None = None
 
 
 @dataclass
@@ -35,3 +55,8 @@ class Run:
     method: str
     params: Dict[str, str]
     created_at: datetime | None = None
+    # Misma telemetría que Operation.metrics.
+    metrics: Dict[str, Any] | None = None
+    # Resultado del método (JSON-able) cuando vale la pena guardarlo
+    # (regresiones: coeficientes, errores estándar, vcov, ajuste).
+    result: Dict[str, Any] | None = None
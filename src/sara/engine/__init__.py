@@ -1,5 +1,19 @@
 """Analytical engine entrypoints (DuckDB)."""
 
-from .duck import DuckDBEngine
+from .cache import ResultCache
+from .duck import CsvSource, DuckDBEngine, RecodeMapping, TransformStep
+from .pool import ConnectionPool
+from .resources import AdmissionControl, Resources
+from .write_policy import WritePolicy
 
-__all__ = ["DuckDBEngine"]
+__all__ = [
+    "AdmissionControl",
+    "ConnectionPool",
+    "CsvSource",
+    "DuckDBEngine",
+    "RecodeMapping",
+    "Resources",
+    "ResultCache",
+    "TransformStep",
+    "WritePolicy",
+]
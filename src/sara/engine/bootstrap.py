@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import math
+import os
+from typing import Any, Sequence
+
+# Columnas internas del query de réplicas (evitan choques con columnas del usuario).
+REPLICATE = "__sara_b"
+_FILE = "__sara_f"
+_UNIFORM = "__sara_u"
+
+# Poisson(1) por inversión de la CDF; más allá de este k la masa es < 1e-9.
+_POISSON_MAX = 12
+
+
+# ---------------------------
+# Pesos de remuestreo (en SQL)
+# ---------------------------
+
+
+def replicate_relation(relation: str, files_param: str, seed: int, first: int, last: int) -> str:
+    """
+    `relation` x réplicas [first, last): una fila por (fila, réplica) con su
+    uniforme en [0, 1).
+
+    El uniforme sale de hash(archivo, fila del archivo, réplica, semilla):
+    determinístico, sin estado y sin materializar nada. Cada réplica se
+    puede recalcular sola (o en otro proceso) y da lo mismo. `relation`
+    tiene que exponer `filename` y `file_row_number` (ver _Source.relation
+    con row_ids=True); `files_param` es el placeholder de la lista de
+    archivos: el archivo entra por su posición en la versión, no por su
+    path (relativo/absoluto, data_dir movido: mismas réplicas).
+
+    Nota: el CROSS JOIN es por fila del scan (streaming): un lote de B
+    réplicas es UN scan del Parquet, no B. El costo que queda es O(filas x B)
+    de CPU (un hash por par), que es lo que se reparte entre procesos.
+
+    Importante: hashear la fila una vez y combinar después con la réplica
+    (hash(h, b)) sale más barato pero correlaciona las réplicas entre sí
+    (infla/achica el error estándar). Hash completo por par.
+    """
+    rows = f"(SELECT *, list_position({files_param}, filename) AS {_FILE} FROM {relation})"
+    return (
+        f"(SELECT *, hash({_FILE}, file_row_number, {REPLICATE}, {int(seed)}) / 18446744073709551616.0 AS {_UNIFORM}"
+        f" FROM {rows} CROSS JOIN range({int(first)}, {int(last)}) AS __sara_boot({REPLICATE}))"
+    )
+
+
+def poisson_weight() -> str:
+    """
+    Peso Poisson(1) de la fila en la réplica (bootstrap "Poisson").
+
+    Aproxima al multinomial clásico (n extracciones con reposición) sin
+    conocer n de antemano ni coordinar filas entre sí: cada fila decide su
+    peso sola, que es lo que permite evaluarlo dentro de un scan.
+    """
+    cases, cdf = [], 0.0
+    for k in range(_POISSON_MAX):
+        cdf += math.exp(-1.0) / math.factorial(k)
+        cases.append(f"WHEN {_UNIFORM} < {cdf!r} THEN {k}")
+    return f"CAST(CASE {' '.join(cases)} ELSE {_POISSON_MAX} END AS DOUBLE)"
+
+
+def batches(replicates: int, batch_size: int) -> list[tuple[int, int]]:
+    """Rangos [first, last) de réplicas por lote (un scan cada uno)."""
+    if replicates < 1:
+        raise ValueError(f"replicates debe ser >= 1 (recibido: {replicates}).")
+    if batch_size < 1:
+        raise ValueError(f"batch_size debe ser >= 1 (recibido: {batch_size}).")
+    return [(first, min(first + batch_size, replicates)) for first in range(0, replicates, batch_size)]
+
+
+# ---------------------------
+# Pool de procesos
+# ---------------------------
+
+
+def run_batch(sql: str, params: list[Any], resources: Any) -> list[tuple[Any, ...]]:
+    """
+    Corre un lote en un proceso del pool (función top-level: se picklea).
+
+    Conexión propia en memoria: los lotes solo leen Parquet. `resources`
+    (engine.resources.Resources) trae los hilos que le tocan a este proceso
+    (si no, cada DuckDB querría todos los cores) y el tope de memoria/spill.
+    """
+    import duckdb
+
+    with duckdb.connect() as con:
+        resources.apply(con)
+        return [tuple(row) for row in con.execute(sql, params).fetchall()]
+
+
+def resolve_workers(workers: int, n_batches: int) -> int:
+    """workers = 0 -> un proceso por core; nunca más procesos que lotes."""
+    if workers < 0:
+        raise ValueError(f"workers debe ser >= 0 (recibido: {workers}).")
+    return max(1, min(workers or os.cpu_count() or 1, n_batches))
+
+
+# ---------------------------
+# Resumen de réplicas
+# ---------------------------
+
+
+def summarize(names: Sequence[str], estimate: Sequence[float], draws: Any, level: float) -> dict[str, Any]:
+    """
+    Error estándar (desvío de las réplicas) e intervalo percentil.
+
+    draws: matriz (réplicas x términos); las réplicas degeneradas (NaN, p. ej.
+    una réplica sin filas o con X'X singular) se descartan por término.
+    """
+    import numpy as np
+
+    if not 0.0 < level < 1.0:
+        raise ValueError(f"level debe estar en (0, 1) (recibido: {level}).")
+    draws = np.asarray(draws, dtype=float)
+    alpha = (1.0 - level) / 2.0
+    out: dict[str, list[Any]] = {"term": list(names), "estimate": [], "se": [], "ci_low": [], "ci_high": []}
+    for j, value in enumerate(estimate):
+        column = draws[:, j][~np.isnan(draws[:, j])]
+        ok = column.size > 1
+        out["estimate"].append(float(value))
+        out["se"].append(float(column.std(ddof=1)) if ok else float("nan"))
+        out["ci_low"].append(float(np.quantile(column, alpha)) if ok else float("nan"))
+        out["ci_high"].append(float(np.quantile(column, 1.0 - alpha)) if ok else float("nan"))
+    return out
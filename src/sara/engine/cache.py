@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+def version_fingerprint(files: Iterable[str | Path]) -> str:
+    """
+    Huella barata de una versión: (path, tamaño, mtime) de cada archivo.
+
+    Las versiones son inmutables, así que esto identifica los datos sin leerlos
+    (un par de stat() por archivo). Si alguien reescribe un archivo a mano, el
+    mtime cambia y la entrada vieja simplemente deja de usarse.
+    """
+    digest = hashlib.sha256()
+    for f in sorted(str(f) for f in files):
+        st = os.stat(f)
+        digest.update(f"{os.path.abspath(f)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def normalize_sql(sql: str) -> str:
+    """Colapsa espacios: el mismo query con distinto formateo es la misma key."""
+    return re.sub(r"\s+", " ", sql).strip().rstrip(";").strip()
+
+
+class ResultCache:
+    """
+    Memoización de resultados de stats, keyed por (huella de versión, SQL).
+
+    Dos niveles:
+      1) LRU en proceso (OrderedDict), acotado por cantidad de entradas.
+      2) Store en disco (SQLite bajo data_dir/cache), acotado por bytes y
+         compartido entre procesos: 60 alumnos pidiendo la misma media sobre
+         la misma versión pagan UN scan.
+
+    Nota:
+      - En disco van solo filas (lista de tuplas, lo que devuelve un query),
+        como Arrow IPC: leer el store nunca ejecuta código, aunque otro
+        usuario del server pueda escribir el archivo. Lo que no se puede
+        representar en Arrow queda solo en el LRU.
+      - Contadores hits/misses para observabilidad (ver stats()).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        directory: Path | None = None,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory is not None else None
+        self._lru: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self._db() as db:
+                # Tabla de versiones anteriores (valores en pickle): no se lee nunca.
+                db.execute("DROP TABLE IF EXISTS results")
+                db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS rows_ipc (
+                        key TEXT PRIMARY KEY,
+                        value BLOB NOT NULL,
+                        size INTEGER NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                    """
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS rows_ipc_last_access ON rows_ipc (last_access)")
+
+    # ---------------------------
+    # API
+    # ---------------------------
+
+    @staticmethod
+    def make_key(fingerprint: str, sql: str, params: Iterable[Any] = ()) -> str:
+        raw = f"{fingerprint}\0{normalize_sql(sql)}\0{list(params)!r}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get_or_compute(self, key: str, compute: Callable[[], T]) -> T:
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def get(self, key: str) -> Any:
+        """Devuelve el valor cacheado o el sentinel _MISSING."""
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return self._lru[key]
+
+        value = self._disk_get(key)
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._remember(key, value)
+        self._disk_put(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+        if self.directory is not None:
+            with self._db() as db:
+                db.execute("DELETE FROM rows_ipc")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._lru)}
+
+    # ---------------------------
+    # Internos
+    # ---------------------------
+
+    def _remember(self, key: str, value: Any) -> None:
+        # Llamar con self._lock tomado.
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    @contextmanager
+    def _db(self) -> Iterator[sqlite3.Connection]:
+        # Conexión corta por operación: segura entre hilos y procesos.
+        assert self.directory is not None
+        db = sqlite3.connect(self.directory / "results.sqlite", timeout=30)
+        try:
+            with db:  # commit / rollback
+                yield db
+        finally:
+            db.close()
+
+    def _disk_get(self, key: str) -> Any:
+        if self.directory is None:
+            return _MISSING
+        with self._db() as db:
+            row = db.execute("SELECT value FROM rows_ipc WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return _MISSING
+            db.execute("UPDATE rows_ipc SET last_access = ? WHERE key = ?", (time.time(), key))
+        try:
+            return _decode_rows(row[0])
+        except Exception:  # noqa: BLE001 - entrada corrupta = miss
+            return _MISSING
+
+    def _disk_put(self, key: str, value: Any) -> None:
+        if self.directory is None:
+            return
+        blob = _encode_rows(value)
+        if blob is None or len(blob) > self.max_bytes:
+            return  # no vale la pena: desalojaría todo el store
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO rows_ipc (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM rows_ipc").fetchone()
+            # Desalojo por tamaño: primero lo menos usado recientemente.
+            while total > self.max_bytes:
+                row = db.execute("SELECT key, size FROM rows_ipc ORDER BY last_access LIMIT 1").fetchone()
+                if row is None:
+                    break
+                db.execute("DELETE FROM rows_ipc WHERE key = ?", (row[0],))
+                total -= row[1]
+
+
+# ---------------------------
+# Serialización (Arrow IPC)
+# ---------------------------
+
+
+def _encode_rows(value: Any) -> bytes | None:
+    """Filas -> stream Arrow IPC (una columna por posición); None si no se puede."""
+    import pyarrow as pa
+
+    if not isinstance(value, list) or not all(isinstance(row, tuple) for row in value):
+        return None
+    widths = {len(row) for row in value}
+    if len(widths) > 1 or widths == {0}:
+        return None
+    width = widths.pop() if widths else 0
+    try:
+        table = pa.table({f"c{i}": pa.array([row[i] for row in value]) for i in range(width)})
+    except (pa.ArrowException, TypeError, ValueError, OverflowError):
+        return None  # tipos que Arrow no infiere (ints enormes, objetos): solo LRU
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _decode_rows(blob: bytes) -> list[tuple[Any, ...]]:
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(blob).read_all()
+    return list(zip(*(column.to_pylist() for column in table.columns)))
@@ -1,10 +1,265 @@
 from __future__ import annotations
 
+import glob
+import json
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Dict, Iterable, Iterator, Sequence, Union
 
 import duckdb
 
+from sara.storage.manifest import is_manifest, is_virtual, manifest_files, read_manifest, virtual_parent
+
+from .cache import _MISSING, ResultCache, version_fingerprint
+from . import bootstrap, regression
+from .pool import ConnectionPool
+from .resources import AdmissionControl, Resources
+from .sql import quote_ident, quote_literal
+from .telemetry import Telemetry, output_bytes
+from .write_policy import WritePolicy
+
+
+# Fuente(s) CSV de import: archivo, directorio, glob o lista de ellos.
+CsvSource = Union[str, Path, Sequence[Union[str, Path]]]
+
+
+def _expand_csv_sources(source: CsvSource) -> list[str]:
+    """Expande archivo/directorio/glob (o lista) a paths CSV concretos."""
+    items = [source] if isinstance(source, (str, Path)) else list(source)
+    files: list[str] = []
+    for item in items:
+        path = Path(item)
+        if path.is_file():
+            files.append(str(path))
+        elif path.is_dir():
+            files.extend(sorted(str(p) for p in path.rglob("*.csv")))
+        else:
+            files.extend(sorted(glob.glob(str(item), recursive=True)))
+    if not files:
+        raise FileNotFoundError(f"CSV no encontrado: {source}")
+    return files
+
+
+def _read_parquet(param: str, row_ids: bool = False, hive: bool = False) -> str:
+    """
+    Expresión de lectura de una versión (uno o varios archivos Parquet).
+
+    - hive: columnas de partición salen de los dirs key=value. Explícito en
+      los dos sentidos: DuckDB lo autodetecta si no se dice nada, y un
+      data_dir bajo /proyectos/anio=2024/ no es una partición.
+    - union_by_name: archivos con esquemas que difieren se unifican por nombre.
+    - row_ids: agrega `filename` y `file_row_number` (identidad estable de
+      cada fila; la usa el bootstrap para sortear pesos).
+    """
+    extra = ", filename = true, file_row_number = true" if row_ids else ""
+    return f"read_parquet({param}, hive_partitioning = {str(hive).lower()}, union_by_name = true{extra})"
+
+
+def _hive_keys(path: Path | str) -> list[str]:
+    """Claves de los dirs key=value de un path, en orden."""
+    return [part.split("=", 1)[0] for part in Path(path).parent.parts if "=" in part]
+
+
+def _as_list(value: str | Sequence[str] | None) -> list[str]:
+    """Normaliza "col" | ["a", "b"] | None a lista."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+_NUMERIC_TYPES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "DOUBLE", "DECIMAL",
+)
+
+
+def _is_numeric(col_type: str) -> bool:
+    # DECIMAL viene con precisión: "DECIMAL(10,2)".
+    return col_type.split("(", 1)[0].upper() in _NUMERIC_TYPES
+
+
+# Posición de cada fila en la entrada de un recode (ver _recode_select).
+_ROW_POS = "__sara_pos"
+
+
+# Un mapping de recode: dict inline {old: new} o path a CSV/Parquet/JSON.
+RecodeMapping = Union[Dict[str, Any], str, Path]
+
+
+def _load_mapping(mapping: RecodeMapping) -> Any:
+    """
+    Normaliza un mapping a una tabla Arrow con columnas (key, value).
+
+    - dict: {"M": 1, "F": 0}
+    - .json: mismo formato que el dict
+    - .csv / .parquet: columnas "key"/"value" si existen; si no, las dos
+      primeras columnas del archivo.
+    """
+    import pyarrow as pa
+
+    if isinstance(mapping, dict):
+        try:
+            return pa.table({"key": [str(k) for k in mapping], "value": list(mapping.values())})
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+            raise ValueError(f"Mapping inválido (valores de tipos mezclados?): {exc}") from exc
+
+    path = Path(mapping)
+    if not path.is_file():
+        raise FileNotFoundError(f"Mapping no encontrado: {path}")
+
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        with path.open(encoding="utf-8") as fh:
+            return _load_mapping(json.load(fh))
+    if suffix == ".csv":
+        from pyarrow import csv as pa_csv
+
+        table = pa_csv.read_csv(path)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+    else:
+        raise ValueError(f"Formato de mapping no soportado: {path.name} (usar .csv, .parquet o .json)")
+
+    if table.num_columns < 2:
+        raise ValueError(f"El mapping {path.name} necesita al menos dos columnas (key, value).")
+    if "key" in table.column_names and "value" in table.column_names:
+        table = table.select(["key", "value"])
+    else:
+        table = table.select([0, 1]).rename_columns(["key", "value"])
+
+    # Keys duplicadas multiplicarían filas en el join.
+    if len(set(table.column("key").to_pylist())) != table.num_rows:
+        raise ValueError(f"El mapping {path.name} tiene keys duplicadas.")
+    return table
+
+
+@dataclass(frozen=True)
+class _Source:
+    """
+    Lo que el engine lee para una versión.
+
+    - files: los Parquet físicos de la base de la cadena.
+    - layers: capas virtuales (where, columns), de la más interna a la
+      más externa. Sin capas, la relación es el read_parquet de siempre.
+    - partitions: claves hive de la versión (escrita con partition_by);
+      vacío = sin hive. path_keys: otros dirs key=value de los paths (por
+      encima de la versión), que hive también leería y se descartan.
+
+    Siempre hay UN solo parámetro (la lista de archivos): los queries siguen
+    la convención de _query_rows aunque la versión sea virtual.
+    """
+
+    files: list[str]
+    layers: tuple[tuple[str | None, tuple[str, ...] | None], ...] = ()
+    partitions: tuple[str, ...] = ()
+    path_keys: tuple[str, ...] = ()
+
+    @property
+    def virtual(self) -> bool:
+        return bool(self.layers)
+
+    def with_layer(self, where: str | None, columns: Sequence[str] | None) -> "_Source":
+        return replace(self, layers=self.layers + ((where, tuple(columns) if columns else None),))
+
+    def relation(self, param: str, row_ids: bool = False) -> str:
+        """Expresión FROM-able; `param` es el placeholder de la lista de archivos."""
+        rel = _read_parquet(param, row_ids, hive=bool(self.partitions))
+        if self.path_keys:
+            rel = f"(SELECT * EXCLUDE ({', '.join(quote_ident(k) for k in self.path_keys)}) FROM {rel})"
+        for where, columns in self.layers:
+            cols = ", ".join(quote_ident(c) for c in columns) if columns else "*"
+            if columns and row_ids:
+                cols += ", filename, file_row_number"
+            where_clause = f" WHERE {where}" if where else ""
+            rel = f"(SELECT {cols} FROM {rel}{where_clause})"
+        return rel
+
+
+class _StepContext:
+    """
+    Estado compartido mientras se compila un pipeline sobre UNA conexión.
+
+    - ctes: CTEs armadas hasta ahora (s0, s1, ...), todas NOT MATERIALIZED:
+      DuckDB materializa por su cuenta una CTE que se lee dos veces (winsorize
+      lee s{i-1} para los bounds y para las filas) y ese buffer, llenado en
+      paralelo, pierde el orden de las filas. Inlineada son dos scans
+      streaming y el orden se conserva.
+    - register(): registra tablas Arrow auxiliares (mappings) con nombre único;
+      release() las desregistra al terminar.
+    - column_types(rel): esquema de un paso intermedio vía DESCRIBE (no lee datos).
+    """
+
+    def __init__(self, con: duckdb.DuckDBPyConnection, source: _Source) -> None:
+        self.con = con
+        self.source = source.files
+        self.ctes = [f"s0 AS NOT MATERIALIZED (SELECT * FROM {source.relation('$1')})"]
+        self._tables: list[str] = []
+
+    def register(self, table: Any) -> str:
+        name = f"__sara_tbl_{uuid.uuid4().hex}"
+        self.con.register(name, table)
+        self._tables.append(name)
+        return name
+
+    def column_types(self, rel: str) -> dict[str, str]:
+        query = "WITH " + ", ".join(self.ctes) + f" SELECT * FROM {rel}"
+        rows = self.con.execute(f"DESCRIBE {query}", [self.source]).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def scalar(self, select: str) -> Any:
+        """Primer valor de un SELECT sobre los pasos armados hasta ahora."""
+        query = "WITH " + ", ".join(self.ctes) + f" {select}"
+        return self.con.execute(query, [self.source]).fetchone()[0]
+
+    def release(self) -> None:
+        for name in self._tables:
+            self.con.unregister(name)
+        self._tables.clear()
+
+
+# Estadísticos soportados por DuckDBEngine.describe (en orden de salida).
+DESCRIBE_STATS = ("n", "missing", "mean", "sd", "min", "max", "percentiles")
+
+# Estadísticos con bootstrap (DuckDBEngine.bootstrap).
+BOOTSTRAP_STATS = ("mean", "ols")
+
+
+def _conform_batch(batch: Any, schema: Any) -> Any:
+    """Alinea un RecordBatch al esquema unificado (orden, tipos, NULLs faltantes)."""
+    import pyarrow as pa
+
+    arrays = []
+    for field_ in schema:
+        if field_.name in batch.schema.names:
+            arr = batch.column(field_.name)
+            arrays.append(arr if arr.type == field_.type else arr.cast(field_.type))
+        else:
+            arrays.append(pa.nulls(batch.num_rows, type=field_.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+@dataclass(frozen=True)
+class TransformStep:
+    """
+    Un paso de transformación, todavía SIN ejecutar.
+
+    `kind` es el nombre de la transformación ("filter", "winsorize", "recode")
+    y `params` los argumentos del builder SQL correspondiente en el engine.
+    """
+
+    kind: str
+    params: dict[str, Any] = field(default_factory=dict)
+
 
 class DuckDBEngine:
     """
@@ -13,59 +268,371 @@ class DuckDBEngine:
     Cambios importantes vs tu versión actual:
       1) NO construye rutas "out_dir" por su cuenta.
          El path destino lo resuelve StorageLayout (o quien lo llame).
-      2) SIEMPRE cierra conexiones (with duckdb.connect()).
+      2) SIEMPRE cierra conexiones (with duckdb.connect()), salvo en modo pool:
+         ahí los cursores se reutilizan y se liberan con close().
       3) Evita f-strings con paths en SQL (mejor robustez).
       4) Implementa preview / filter / mean para que el CLI funcione.
     """
 
-    def __init__(self, database: str = ":memory:") -> None:
+    def __init__(
+        self,
+        database: str = ":memory:",
+        pool_size: int = 0,
+        cache: ResultCache | None = None,
+        resources: Resources | None = None,
+        admission: AdmissionControl | None = None,
+    ) -> None:
         # database puede ser ":memory:" o una ruta a un archivo .duckdb
         self.database = database
 
+        # Hilos / memoria / spill de cada conexión (None = defaults de DuckDB).
+        self.resources = resources or Resources()
+
+        # Límite de operaciones pesadas simultáneas (None = sin límite).
+        self.admission = admission
+
+        # pool_size = 0 -> conexión efímera por llamada (modo CLI, sin estado).
+        # pool_size > 0 -> sesiones largas: cursores calientes compartiendo
+        #                  caché de metadata Parquet y buffers entre llamadas.
+        self.pool_size = pool_size
+        self._pool = (
+            ConnectionPool(database, size=pool_size, configure=self.resources.apply) if pool_size > 0 else None
+        )
+
+        # Caché de resultados (opcional): las versiones son inmutables, así que
+        # el mismo SQL sobre los mismos archivos siempre da lo mismo.
+        self.cache = cache
+
+        # Métricas por llamada (ver track()).
+        self.telemetry = Telemetry()
+
+    # ---------------------------
+    # Conexiones / ciclo de vida
+    # ---------------------------
+
+    @contextmanager
+    def _connect(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Punto ÚNICO de obtención de conexiones.
+
+        - Sin pool: duckdb.connect() efímero (se cierra al salir).
+        - Con pool: presta un cursor caliente y lo devuelve al salir.
+
+        En los dos casos la conexión sale con los límites de self.resources
+        (el pool los aplica una vez, en la raíz) y dentro de un slot de
+        admisión: por acá pasan TODOS los métodos del engine. La única lectura
+        sin DuckDB (scan_batches sobre archivos físicos, con pyarrow) toma el
+        slot directo con _admitted().
+        """
+        with self._admitted():
+            if self._pool is None:
+                with duckdb.connect(self.database) as con:
+                    self.resources.apply(con)
+                    with self.telemetry.profiling(con):
+                        yield con
+            else:
+                with self._pool.connection() as con, self.telemetry.profiling(con):
+                    yield con
+
+    @contextmanager
+    def _admitted(self) -> Iterator[None]:
+        """Slot de AdmissionControl (no-op sin límite); la espera va a telemetría."""
+        if self.admission is None:
+            yield
+            return
+        with self.admission.slot() as waited:
+            if waited:
+                self.telemetry.add(admission_wait_seconds=waited)
+            yield
+
+    def track(self, profile: bool = False) -> Any:
+        """
+        Context manager: métricas de las llamadas al engine dentro del bloque
+        (tiempos, filas, bytes, memoria pico; ver engine.telemetry.Telemetry).
+        """
+        return self.telemetry.track(profile=profile)
+
+    def _query_rows(self, files: list[str], sql: str, params: Sequence[Any] = ()) -> list[tuple[Any, ...]]:
+        """
+        Ejecuta un query de stats sobre `files`, vía caché si hay.
+
+        Convención: el primer parámetro del SQL ("?") es la lista de archivos;
+        `params` son los restantes. La key del caché es (huella de archivos,
+        SQL normalizado, params).
+        """
+
+        computed = False
+
+        def compute() -> list[tuple[Any, ...]]:
+            nonlocal computed
+            computed = True
+            with self._connect() as con:
+                return [tuple(row) for row in con.execute(sql, [files, *params]).fetchall()]
+
+        if self.cache is None:
+            return compute()
+        key = self.cache.make_key(version_fingerprint(files), sql, params)
+        rows = self.cache.get_or_compute(key, compute)
+        if not computed:
+            self.telemetry.add(cache_hits=1)
+        return rows
+
+    def _query_one(self, files: list[str], sql: str, params: Sequence[Any] = ()) -> tuple[Any, ...]:
+        """Como _query_rows, para queries de una sola fila (agregados globales)."""
+        return self._query_rows(files, sql, params)[0]
+
+    def close(self) -> None:
+        """Libera el pool (si existe). En modo efímero no hace nada."""
+        if self._pool is not None:
+            self._pool.close()
+
+    def __enter__(self) -> "DuckDBEngine":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _write_parquet(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        query: str,
+        source_param: Any,
+        out_path: Path,
+        policy: WritePolicy | None = None,
+        options: Sequence[str] = (),
+    ) -> int:
+        """
+        Punto ÚNICO de escritura de versiones: COPY (query) TO out_path.
+
+        - query lee de $1 (= source_param); la salida es $2. $1/$2 y no "?":
+          DuckDB bindea el "TO ?" del COPY antes que los "?" de la subquery.
+        - policy (WritePolicy del dataset): codec, nivel, row groups y ORDER BY
+          por las claves de clustering que tenga la salida.
+        - options: extras del caller (PARTITION_BY, FILE_SIZE_BYTES, ...).
+
+        Devuelve las filas escritas.
+        """
+        policy = policy or WritePolicy()
+        order = ""
+        if policy.sort_by:
+            columns = [row[0] for row in con.execute(f"DESCRIBE {query}", [source_param]).fetchall()]
+            order = policy.order_by(columns)
+        copy_options = ", ".join(["FORMAT PARQUET", *policy.copy_options(), *options])
+        (rows_written,) = con.execute(
+            f"COPY ({query}{order}) TO $2 ({copy_options});",
+            [source_param, str(out_path)],
+        ).fetchone()
+        return rows_written
+
+    # ---------------------------
+    # Resolución de versiones
+    # ---------------------------
+
+    def _parquet_files(self, dataset_version_path: Path) -> list[str]:
+        """
+        Archivos Parquet que componen una versión.
+
+        - archivo .parquet -> [archivo]
+        - directorio (particionado hive o rotado por tamaño) -> todos sus
+          *.parquet, recursivo y en orden estable.
+        - manifest.json -> los archivos que lista (layout por contenido).
+        """
+        dataset_version_path = Path(dataset_version_path)
+        if is_manifest(dataset_version_path):
+            files = [str(f) for f in manifest_files(dataset_version_path)]
+            missing = [f for f in files if not Path(f).is_file()]
+            if missing:
+                raise FileNotFoundError(f"Parquet no encontrado (manifest {dataset_version_path}): {missing[0]}")
+            return files
+        if dataset_version_path.is_file():
+            return [str(dataset_version_path)]
+        if dataset_version_path.is_dir():
+            files = sorted(str(p) for p in dataset_version_path.rglob("*.parquet"))
+            if files:
+                return files
+        raise FileNotFoundError(f"Parquet no encontrado: {dataset_version_path}")
+
+    def _source(self, dataset_version_path: Path) -> _Source:
+        """
+        Resuelve una versión (física o virtual) a archivos + capas.
+
+        Una versión virtual es "padre + where/columns": se resuelve el padre
+        (recursivo: puede ser virtual a su vez) y se le suma una capa.
+        """
+        dataset_version_path = Path(dataset_version_path)
+        if is_manifest(dataset_version_path):
+            payload = read_manifest(dataset_version_path)
+            if payload.get("kind") == "virtual":
+                parent = self._source(virtual_parent(dataset_version_path))
+                return parent.with_layer(payload.get("where"), payload.get("columns"))
+        files = self._parquet_files(dataset_version_path)
+        partitions = self._partition_keys(dataset_version_path, files)
+        path_keys: set[str] = set()
+        if partitions:
+            path_keys = {k for f in files for k in _hive_keys(f)} - set(partitions)
+        return _Source(files, partitions=tuple(partitions), path_keys=tuple(sorted(path_keys)))
+
+    def _partition_keys(self, dataset_version_path: Path, files: list[str]) -> list[str]:
+        """
+        Claves hive de una versión física.
+
+        Solo cuentan los dirs key=value por debajo de la versión; lo de
+        arriba (data_dir incluido) no es una partición.
+        - directorio: paths relativos al directorio de la versión.
+        - manifest: los paths que guarda, que ya son relativos al manifest
+          (un append apunta a ../v1/data/anio=2023/..., nunca más arriba
+          del data_dir).
+        - archivo suelto: ninguna.
+        """
+        if is_manifest(dataset_version_path):
+            relative = read_manifest(dataset_version_path)["files"]
+        elif dataset_version_path.is_dir():
+            relative = [Path(f).relative_to(dataset_version_path) for f in files]
+        else:
+            return []
+        keys: list[str] | None = None
+        for f in relative:
+            file_keys = _hive_keys(f)
+            if keys is None:
+                keys = file_keys
+            elif file_keys != keys:
+                raise ValueError(f"Particiones inconsistentes en {dataset_version_path}: {keys} vs {file_keys}")
+        return keys or []
+
+    def version_files(self, dataset_version_path: Path) -> list[str]:
+        """Archivos Parquet de una versión (para armar versiones derivadas, ej: append)."""
+        if is_virtual(dataset_version_path):
+            raise ValueError(f"{dataset_version_path} es una versión virtual: materializala primero.")
+        return self._parquet_files(dataset_version_path)
+
+    def columns(self, dataset_version_path: Path) -> dict[str, str]:
+        """Esquema (columna -> tipo DuckDB) de una versión, vía DESCRIBE (no lee datos)."""
+        return self._source_columns(self._source(dataset_version_path))
+
+    def version_info(self, dataset_version_path: Path) -> dict[str, Any]:
+        """
+        Metadata de una versión SIN leer datos: esquema (DESCRIBE), filas de
+        los footers Parquet (parquet_file_metadata) y tamaño de los archivos.
+
+        num_rows queda None si alguna capa virtual filtra (contar = scan).
+        """
+        source = self._source(dataset_version_path)
+        schema = self._source_columns(source)
+        num_rows = None
+        if not any(where for where, _ in source.layers):
+            with self._connect() as con:
+                (num_rows,) = con.execute(
+                    "SELECT COALESCE(SUM(num_rows), 0) FROM parquet_file_metadata(?);", [source.files]
+                ).fetchone()
+        return {
+            "schema": schema,
+            "num_rows": None if num_rows is None else int(num_rows),
+            "num_columns": len(schema),
+            "num_files": len(source.files),
+            "size_bytes": sum(os.path.getsize(f) for f in source.files),
+        }
+
+    def _source_columns(self, source: _Source) -> dict[str, str]:
+        with self._connect() as con:
+            rows = con.execute(f"DESCRIBE SELECT * FROM {source.relation('?')};", [source.files]).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def partition_columns(self, dataset_version_path: Path) -> list[str]:
+        """
+        Claves hive de una versión, en orden (ver _partition_keys).
+
+        read_parquet(hive_partitioning = true) exige que TODOS los archivos
+        tengan las mismas claves: un delta que se suma a una versión
+        particionada tiene que escribirse con las mismas.
+        """
+        return list(self._source(dataset_version_path).partitions)
+
     # ---------------------------
     # Importación
     # ---------------------------
 
-    def import_csv(self, csv_path: Path, out_path: Path) -> Path:
+    def import_csv(
+        self,
+        csv_path: CsvSource,
+        out_path: Path,
+        partition_by: Sequence[str] | None = None,
+        row_group_size: int | None = None,
+        file_size_bytes: int | str | None = None,
+        write_policy: WritePolicy | None = None,
+    ) -> Path:
         """
-        Importa CSV a Parquet.
+        Importa uno o varios CSV a Parquet.
+
+        `csv_path` puede ser:
+          - un archivo,
+          - un directorio (todos los *.csv, recursivo),
+          - un glob ("raw/2023-*.csv"),
+          - o una lista de cualquiera de los anteriores.
+
+        Todos los archivos van a UN solo read_csv_auto: DuckDB los lee en
+        paralelo y union_by_name unifica esquemas (columnas que faltan en
+        algún extracto quedan NULL).
+
+        Salida:
+          - sin partition_by ni file_size_bytes: out_path es un .parquet.
+          - con partition_by: out_path es un directorio hive (col=valor/...).
+          - con file_size_bytes: out_path es un directorio con archivos rotados
+            por tamaño (ej: "256MB").
+          DuckDB no permite combinar partition_by con rotación por tamaño.
+        write_policy: codec/orden del dataset (row_group_size explícito la pisa).
 
         NOTA (seguridad/robustez):
           - no usamos f-string con paths para evitar problemas con comillas.
-          - validamos existencia del CSV.
-          - creamos directorio del out_path.
+          - validamos que haya al menos un CSV.
+          - creamos el directorio padre del out_path.
 
         Contrato:
-          - devuelve out_path (parquet generado)
+          - devuelve out_path (parquet o directorio generado)
         """
-        csv_path = Path(csv_path)
+        csv_files = _expand_csv_sources(csv_path)
         out_path = Path(out_path)
 
-        if not csv_path.is_file():
-            raise FileNotFoundError(f"CSV no encontrado: {csv_path}")
+        if partition_by and file_size_bytes is not None:
+            raise ValueError("No se puede combinar partition_by con file_size_bytes (limitación de DuckDB).")
+
+        options = []
+        if partition_by:
+            options.append(f"PARTITION_BY ({', '.join(quote_ident(c) for c in partition_by)})")
+            # Las columnas de partición también dentro de cada archivo: cada
+            # Parquet se autodescribe aunque se mueva fuera del árbol hive
+            # (ej: layout por contenido).
+            options.append("WRITE_PARTITION_COLUMNS true")
+        policy = write_policy or WritePolicy()
+        if row_group_size is not None:
+            policy = replace(policy, row_group_size=int(row_group_size))
+        if file_size_bytes is not None:
+            size = int(file_size_bytes) if isinstance(file_size_bytes, int) else quote_literal(file_size_bytes)
+            options.append(f"FILE_SIZE_BYTES {size}")
 
         out_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Usamos una conexión efímera. Para alto rendimiento podrías mantener
-        # una conexión viva, pero para CLI simple es mejor evitar estado oculto.
-        with duckdb.connect(self.database) as con:
-            # DuckDB permite bind de parámetros para valores.
-            # read_csv_auto(?) acepta el path como parámetro.
-            con.execute(
-                """
-                COPY (
-                    SELECT *
-                    FROM read_csv_auto(?)
-                )
-                TO ?
-                (FORMAT PARQUET);
-                """,
-                [str(csv_path), str(out_path)],
+        # Conexión efímera o cursor del pool, según cómo se construyó el engine.
+        with self._connect() as con:
+            # read_csv_auto($1) acepta el path (o lista de paths) como parámetro.
+            rows_written = self._write_parquet(
+                con,
+                "SELECT * FROM read_csv_auto($1, union_by_name = true)",
+                csv_files,
+                out_path,
+                policy,
+                options,
             )
 
+        self.telemetry.add(rows_written=rows_written, bytes_written=output_bytes(out_path))
         return out_path
 
-    def import_xlsx(self, xlsx_path: Path, out_path: Path, sheet: str | None = None) -> Path:
+    def import_xlsx(
+        self,
+        xlsx_path: Path,
+        out_path: Path,
+        sheet: str | None = None,
+        write_policy: WritePolicy | None = None,
+    ) -> Path:
         """
         Importa Excel a Parquet usando read_excel.
 
@@ -95,49 +662,156 @@ class DuckDBEngine:
         else:
             sheet_clause = ""
 
-        with duckdb.connect(self.database) as con:
-            con.execute(
-                f"""
-                COPY (
-                    SELECT *
-                    FROM read_excel(?{sheet_clause})
-                )
-                TO ?
-                (FORMAT PARQUET);
-                """,
-                [str(xlsx_path), str(out_path)],
+        with self._connect() as con:
+            rows_written = self._write_parquet(
+                con, f"SELECT * FROM read_excel($1{sheet_clause})", str(xlsx_path), out_path, write_policy
             )
 
+        self.telemetry.add(rows_written=rows_written, bytes_written=output_bytes(out_path))
         return out_path
 
     # ---------------------------
     # Consultas básicas
     # ---------------------------
 
-    def preview(self, dataset_version_path: Path, limit: int = 100) -> Iterable[dict[str, Any]]:
+    def preview(
+        self,
+        dataset_version_path: Path,
+        limit: int = 100,
+        offset: int = 0,
+        columns: Sequence[str] | None = None,
+    ) -> Iterable[dict[str, Any]]:
         """
         Preview simple: devuelve filas como dict (col -> valor).
 
         Comentario:
-          - Para CLI, dict es más cómodo.
-          - Limitamos en SQL con LIMIT ? (bind param).
+          - Para CLI, dict es más cómodo; la conversión a dict se hace acá, en
+            el borde, sobre los record batches de scan_batches.
+          - offset/columns: ver scan_batches.
         """
-        dataset_version_path = Path(dataset_version_path)
-        if not dataset_version_path.is_file():
-            raise FileNotFoundError(f"Parquet no encontrado: {dataset_version_path}")
-
         if limit <= 0:
             return []
+        rows: list[dict[str, Any]] = []
+        for batch in self.scan_batches(dataset_version_path, columns=columns, offset=offset, limit=limit):
+            rows.extend(batch.to_pylist())
+        return rows
 
-        with duckdb.connect(self.database) as con:
-            cur = con.execute(
-                "SELECT * FROM read_parquet(?) LIMIT ?;",
-                [str(dataset_version_path), int(limit)],
-            )
-            rows = cur.fetchall()
-            cols = [d[0] for d in cur.description]  # nombres columnas
+    def scan_batches(
+        self,
+        dataset_version_path: Path,
+        columns: Sequence[str] | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        batch_size: int = 1024,
+    ) -> Iterator[Any]:
+        """
+        Scan streaming de una versión como pyarrow.RecordBatch.
+
+        Paginación por offset SIN leer desde el principio:
+          - los conteos de filas por archivo y por row group salen del footer;
+          - se saltean archivos/row groups completos antes de `offset` y solo se
+            decodifica desde el row group que contiene la fila `offset`.
+        Ver la fila 10.000.000 cuesta lo mismo que ver la fila 0.
+
+        - columns: proyección (solo se decodifican esas columnas).
+        - Archivos con esquemas distintos (union_by_name) se alinean al esquema
+          unificado; columnas ausentes en un archivo salen NULL.
+
+        Como toda lectura del engine, ocupa un slot de admisión mientras se
+        consume el iterador.
+        """
+        if offset < 0:
+            raise ValueError(f"offset inválido: {offset}")
+        if limit is not None and limit <= 0:
+            return
+
+        source = self._source(dataset_version_path)
+        if source.virtual or source.partitions:
+            # Sin footers que reflejen el filtro (o las columnas de partición,
+            # que no están en los archivos): DuckDB resuelve la versión.
+            yield from self._scan_relation(source, columns, offset, limit, batch_size)
+            return
+        # pyarrow, no DuckDB: no pasa por _connect, pero cuenta como job igual.
+        with self._admitted():
+            yield from self._scan_files(source, columns, offset, limit, batch_size)
+
+    def _scan_files(
+        self,
+        source: _Source,
+        columns: Sequence[str] | None,
+        offset: int,
+        limit: int | None,
+        batch_size: int,
+    ) -> Iterator[Any]:
+        """Scan streaming con pyarrow (versiones físicas): salta por footers hasta `offset`."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parquet_files = [pq.ParquetFile(f) for f in source.files]
+        schema = pa.unify_schemas([pf.schema_arrow for pf in parquet_files], promote_options="permissive")
+        if columns:
+            missing = [c for c in columns if c not in schema.names]
+            if missing:
+                raise ValueError(f"Columnas inexistentes: {missing}")
+            schema = pa.schema([schema.field(c) for c in columns])
 
-        return [dict(zip(cols, row)) for row in rows]
+        skip = offset
+        remaining = limit
+        for pf in parquet_files:
+            meta = pf.metadata
+            if skip >= meta.num_rows:
+                skip -= meta.num_rows  # archivo completo antes del offset
+                continue
+
+            # Primer row group que contiene la fila `skip` dentro del archivo.
+            first_rg = 0
+            while skip >= meta.row_group(first_rg).num_rows:
+                skip -= meta.row_group(first_rg).num_rows
+                first_rg += 1
+
+            file_columns = [c for c in schema.names if c in pf.schema_arrow.names]
+            for batch in pf.iter_batches(
+                batch_size=batch_size,
+                row_groups=range(first_rg, meta.num_row_groups),
+                columns=file_columns,
+            ):
+                if skip:
+                    cut = min(skip, batch.num_rows)
+                    batch = batch.slice(cut)
+                    skip -= cut
+                if remaining is not None:
+                    batch = batch.slice(0, remaining)
+                    remaining -= batch.num_rows
+                if batch.num_rows:
+                    yield _conform_batch(batch, schema)
+                if remaining == 0:
+                    return
+
+    def _scan_relation(
+        self,
+        source: _Source,
+        columns: Sequence[str] | None,
+        offset: int,
+        limit: int | None,
+        batch_size: int,
+    ) -> Iterator[Any]:
+        """Scan streaming vía DuckDB (versiones virtuales): LIMIT/OFFSET + record batches."""
+        if columns:
+            missing = [c for c in columns if c not in self._source_columns(source)]
+            if missing:
+                raise ValueError(f"Columnas inexistentes: {missing}")
+        cols = ", ".join(quote_ident(c) for c in columns) if columns else "*"
+        sql = f"SELECT {cols} FROM {source.relation('$1')}"
+        params: list[Any] = [source.files]
+        if limit is not None:
+            sql += " LIMIT $2"
+            params.append(int(limit))
+        sql += f" OFFSET {int(offset)}"
+        with self._connect() as con:
+            reader = con.execute(sql, params).fetch_record_batch(batch_size)
+            for batch in reader:
+                if batch.num_rows:
+                    yield batch
 
     def filter(self, dataset_version_path: Path, where: str, out_version_path: Path) -> Path:
         """
@@ -152,36 +826,13 @@ class DuckDBEngine:
               (b) o construir expresiones seguras
             Pero para un CLI tipo data-tool, suele aceptarse SQL.
 
-        También:
-          - Aseguramos directorio del out_version_path.
+        Es un pipeline de un solo paso (ver apply_steps).
         """
-        dataset_version_path = Path(dataset_version_path)
-        out_version_path = Path(out_version_path)
-
-        if not dataset_version_path.is_file():
-            raise FileNotFoundError(f"Parquet no encontrado: {dataset_version_path}")
-
-        out_version_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Escapamos comillas simples en where? NO sirve: where es expresión SQL.
-        # Lo correcto es tratarlo como "SQL user input" y documentarlo.
-        with duckdb.connect(self.database) as con:
-            # read_parquet(path) sí lo pasamos como parámetro
-            # pero el WHERE se interpolará.
-            con.execute(
-                f"""
-                COPY (
-                    SELECT *
-                    FROM read_parquet(?)
-                    WHERE {where}
-                )
-                TO ?
-                (FORMAT PARQUET);
-                """,
-                [str(dataset_version_path), str(out_version_path)],
-            )
-
-        return out_version_path
+        return self.apply_steps(
+            dataset_version_path,
+            [TransformStep("filter", {"where": where})],
+            out_version_path,
+        )
 
     def mean(self, dataset_version_path: Path, column: str, where: str | None = None) -> float:
         """
@@ -195,9 +846,7 @@ class DuckDBEngine:
         En un CLI interno, con columnas reales, alcanza validar:
           - column debe ser alfanumérico + underscore (snake_case) o similar.
         """
-        dataset_version_path = Path(dataset_version_path)
-        if not dataset_version_path.is_file():
-            raise FileNotFoundError(f"Parquet no encontrado: {dataset_version_path}")
+        source = self._source(dataset_version_path)
 
         # Validación mínima de identificador.
         # Si querés permitir columnas con espacios, habría que quotearlas con "..."
@@ -206,16 +855,12 @@ class DuckDBEngine:
 
         where_clause = f"WHERE {where}" if where else ""
 
-        with duckdb.connect(self.database) as con:
-            cur = con.execute(
-                f"""
-                SELECT AVG({column}) AS mean_value
-                FROM read_parquet(?)
-                {where_clause};
-                """,
-                [str(dataset_version_path)],
-            )
-            (value,) = cur.fetchone()
+        sql = f"""
+            SELECT AVG({column}) AS mean_value
+            FROM {source.relation('?')}
+            {where_clause};
+        """
+        (value,) = self._query_one(source.files, sql)
 
         # DuckDB puede devolver None si no hay filas o todo es NULL.
         if value is None:
@@ -223,30 +868,768 @@ class DuckDBEngine:
 
         return float(value)
 
+    def describe(
+        self,
+        dataset_version_path: Path,
+        columns: Sequence[str] | None = None,
+        stats: Sequence[str] | None = None,
+        group_by: Sequence[str] | None = None,
+        percentiles: Sequence[float] = (0.25, 0.5, 0.75),
+        where: str | None = None,
+        approx: bool = False,
+    ) -> dict[str, list[Any]]:
+        """
+        Estadística descriptiva de muchas columnas (y grupos) en UN query.
+
+        Todas las combinaciones (columna x estadístico) van en el mismo SELECT,
+        con GROUP BY opcional: DuckDB hace un solo scan, sin loops en Python.
+
+        - columns: default = todas las columnas numéricas.
+        - stats: subconjunto de DESCRIBE_STATS (default: todos).
+        - percentiles: en [0, 1]; salen como columnas "p25", "p50", ...
+        - stats / percentiles repetidos (o percentiles con la misma etiqueta,
+          0.5 y 0.50) se cuentan una vez, en el orden en que aparecen.
+        - approx: approx_quantile (sketch) en vez de quantile_cont (exacto).
+
+        Devuelve un resultado COLUMNAR en formato largo (una fila por grupo x
+        variable), listo para pyarrow.table(...) / pandas.DataFrame(...):
+
+            {"grupo": [...], "variable": [...], "n": [...], "mean": [...], ...}
+        """
+        source = self._source(dataset_version_path)
+        group_by = _as_list(group_by)
+        stats = list(dict.fromkeys(stats)) if stats else list(DESCRIBE_STATS)
+        unknown = [st for st in stats if st not in DESCRIBE_STATS]
+        if unknown:
+            raise ValueError(f"Estadísticos desconocidos: {unknown} (válidos: {', '.join(DESCRIBE_STATS)})")
+        # Etiqueta -> percentil: una columna de salida por etiqueta.
+        by_name: dict[str, float] = {}
+        for q in percentiles:
+            if not 0.0 <= q <= 1.0:
+                raise ValueError(f"Percentil fuera de [0, 1]: {q}")
+            by_name.setdefault(f"p{q * 100:g}", float(q))
+        pct_names, percentiles = list(by_name), list(by_name.values())
+
+        if not columns:
+            schema = self._source_columns(source)
+            columns = [name for name, col_type in schema.items() if _is_numeric(col_type) and name not in group_by]
+            if not columns:
+                raise ValueError("La versión no tiene columnas numéricas para describir.")
+        columns = _as_list(columns)
+
+        quantile_fn = "approx_quantile" if approx else "quantile_cont"
+        pct_list = "[" + ", ".join(repr(float(q)) for q in percentiles) + "]"
+        exprs: dict[str, str] = {
+            "n": "COUNT({c})",
+            "missing": "COUNT(*) - COUNT({c})",
+            "mean": "AVG({c})",
+            "sd": "STDDEV_SAMP({c})",
+            "min": "MIN({c})",
+            "max": "MAX({c})",
+            "percentiles": f"{quantile_fn}({{c}}, {pct_list})",
+        }
+        active = [st for st in stats if st != "percentiles" or percentiles]
+
+        groups = [quote_ident(g) for g in group_by]
+        select = list(groups)
+        for col in columns:
+            c = quote_ident(col)
+            select += [exprs[st].format(c=c) for st in active]
+
+        where_clause = f"WHERE {where}" if where else ""
+        group_clause = f"GROUP BY {', '.join(groups)} ORDER BY {', '.join(groups)}" if groups else ""
+        sql = f"""
+            SELECT {', '.join(select)}
+            FROM {source.relation('?')}
+            {where_clause}
+            {group_clause};
+        """
+        rows = self._query_rows(source.files, sql)
+
+        # Reshape a formato largo columnar: (grupo, variable) x estadísticos.
+        out_names = [n for st in active for n in (pct_names if st == "percentiles" else [st])]
+        result: dict[str, list[Any]] = {name: [] for name in [*group_by, "variable", *out_names]}
+        width = len(active)
+        for row in rows:
+            keys, values = row[: len(groups)], row[len(groups) :]
+            for j, col in enumerate(columns):
+                for g, key in zip(group_by, keys):
+                    result[g].append(key)
+                result["variable"].append(col)
+                for st, value in zip(active, values[j * width : (j + 1) * width]):
+                    if st == "percentiles":
+                        for name, pv in zip(pct_names, value or [None] * len(pct_names)):
+                            result[name].append(pv)
+                    else:
+                        result[st].append(value)
+        return result
+
+    # ---------------------------
+    # Regresión lineal
+    # ---------------------------
+
+    def ols(
+        self,
+        dataset_version_path: Path,
+        y: str,
+        x: Sequence[str],
+        weights: str | None = None,
+        where: str | None = None,
+        add_constant: bool = True,
+        se: str = "classical",
+        cluster: str | Sequence[str] | None = None,
+        fe: str | Sequence[str] | None = None,
+        fe_tol: float = 1e-8,
+        fe_max_iter: int = 1000,
+    ) -> dict[str, Any]:
+        """
+        OLS (o WLS con `weights`) por estadísticos suficientes.
+
+        Un scan agrega X'WX, X'Wy e y'Wy dentro de DuckDB; NumPy resuelve
+        el sistema k x k. Con constante, antes va un scan de medias y la
+        regresión corre sobre y/x centrados (regression.center): sumas crudas
+        de años o epochs pierden la varianza por cancelación. La matriz de diseño no existe nunca en
+        memoria: el costo en RAM es O(k²), no O(n·k), y el scan es el mismo
+        streaming de siempre (funciona con versiones más grandes que la RAM).
+
+        Errores estándar:
+          - se: "classical" | "hc0" | "hc1" | "hc2" | "hc3"
+          - cluster: una o dos columnas (una vía / dos vías); excluyente con se.
+        Los robustos cuestan UN scan más (residuos y leverage evaluados en
+        SQL, agregados por cluster con GROUPING SETS); nunca se traen los
+        residuos a Python.
+
+        Efectos fijos (fe = "unidad" o ["unidad", "anio"], sin dummies): y/x
+        se demeanean por grupo en DuckDB (regression.absorb; varias
+        dimensiones por proyecciones alternadas hasta fe_tol) y la regresión
+        corre sobre lo demeaneado, sin constante. r2 es el R² within.
+        HC2/HC3 suman la leverage del grupo (solo una vía de fe).
+
+        Casos completos: filas con NULL en y, x, pesos, cluster o fe se descartan.
+        Devuelve el dict de regression.solve (coeficientes columnar + ajuste).
+        """
+        cluster, fe = _as_list(cluster), _as_list(fe)
+        if cluster and se != "classical":
+            raise ValueError("se y cluster son excluyentes (cluster ya define el error estándar).")
+        if se not in regression.SE_TYPES:
+            raise ValueError(f"Tipo de error estándar desconocido: {se!r} (válidos: {', '.join(regression.SE_TYPES)})")
+        if len(fe) > 1 and se in ("hc2", "hc3"):
+            # La leverage del bloque absorbido solo tiene forma cerrada con una vía.
+            raise ValueError(f"{se} con efectos fijos de varias vías no está soportado: usar hc1 o cluster.")
+        d = regression.design(y, x, weights=weights, add_constant=add_constant and not fe, cluster=cluster)
+        source = self._source(dataset_version_path)
+        self._check_columns(source, [y, *x, *_as_list(weights), *cluster, *fe])
+        if fe:
+            return self._ols_fe(source, d, fe, where, se, fe_tol, fe_max_iter)
+        d = self._center(source, d, where)
+        relation = source.relation("?")
+        m = regression.Moments.from_row(d, self._query_one(source.files, regression.moments_sql(d, relation, where)))
+        result = regression.solve(d, m)
+        if se == "classical" and not cluster:
+            return result
+        return regression.robust(
+            d, m, result, se, relation, where, query=lambda sql: self._query_rows(source.files, sql)
+        )
+
+    def _center(self, source: _Source, d: regression.Design, where: str | None) -> regression.Design:
+        """Design centrado en sus medias (un scan de agregación; ver regression.center)."""
+        sql = regression.means_sql(d, source.relation("?"), where)
+        if sql is None:
+            return d
+        return regression.center(d, self._query_one(source.files, sql))
+
+    def _ols_fe(
+        self,
+        source: _Source,
+        d: regression.Design,
+        fe: list[str],
+        where: str | None,
+        se: str,
+        tol: float,
+        max_iter: int,
+    ) -> dict[str, Any]:
+        """OLS con efectos fijos: todo sobre UNA conexión (la tabla demeaneada es TEMP)."""
+        table = quote_ident(f"__sara_fe_{uuid.uuid4().hex}")
+        with self._connect() as con:
+
+            def execute(sql: str, params: Sequence[Any] = ()) -> list[tuple[Any, ...]]:
+                return con.execute(sql, list(params)).fetchall()
+
+            try:
+                td, info = regression.absorb(
+                    execute, d, fe, source.relation("?"), where, table, [source.files], tol=tol, max_iter=max_iter
+                )
+                m = regression.Moments.from_row(td, execute(regression.moments_sql(td, table))[0])
+                result = {**regression.solve(td, m), **info}
+                if se in ("hc2", "hc3"):
+                    sql, td = regression.fe_leverage_sql(td, table)
+                    execute(sql)
+                if se != "classical" or td.clusters:
+                    result = regression.robust(td, m, result, se, table, None, query=execute)
+            finally:
+                con.execute(f"DROP TABLE IF EXISTS {table}")
+        return result
+
+    # ---------------------------
+    # Bootstrap
+    # ---------------------------
+
+    def bootstrap(
+        self,
+        dataset_version_path: Path,
+        stat: str = "mean",
+        replicates: int = 1000,
+        seed: int = 0,
+        level: float = 0.95,
+        batch_size: int = 100,
+        workers: int = 1,
+        **params: Any,
+    ) -> dict[str, Any]:
+        """
+        Bootstrap de un estadístico (stat = "mean" | "ols") con pesos Poisson(1).
+
+        Los pesos de cada (fila, réplica) se sortean DENTRO del query (hash
+        de la fila + réplica + seed; ver engine.bootstrap) y las réplicas se
+        evalúan de a `batch_size` por scan, agrupando por réplica: 1000
+        réplicas con batch_size=100 son 10 lecturas del Parquet, no 1000.
+        Los lotes se reparten en `workers` procesos (0 = uno por core).
+        Las réplicas dependen solo de (versión, fila, réplica, seed).
+
+        - mean: params column, where.
+        - ols: params y, x, weights, where, add_constant (errores clásicos;
+          cada réplica es un X'WX agregado en SQL y resuelto en NumPy).
+
+        Mismo seed -> mismas réplicas (el resultado es cacheable por lote).
+        Devuelve estimaciones columnar {"term", "estimate", "se", "ci_low",
+        "ci_high"} (IC percentil al `level`) y las réplicas en "draws".
+        """
+        import numpy as np
+
+        if stat not in BOOTSTRAP_STATS:
+            raise ValueError(f"Estadístico sin bootstrap: {stat!r} (válidos: {', '.join(BOOTSTRAP_STATS)})")
+        plan = bootstrap.batches(replicates, batch_size)
+        source = self._source(dataset_version_path)
+        build = self._bootstrap_mean if stat == "mean" else self._bootstrap_ols
+        names, estimate, batch_sql, parse = build(dataset_version_path, source, int(seed), **params)
+
+        workers = bootstrap.resolve_workers(workers, len(plan))
+        sqls = [batch_sql(first, last) for first, last in plan]
+        draws = np.full((replicates, len(names)), np.nan)
+        for rows in self._query_batches(source.files, sqls, workers):
+            for row in rows:
+                draws[int(row[0])] = parse(row[1:])
+
+        return {
+            "method": "bootstrap",
+            "stat": stat,
+            "replicates": replicates,
+            "seed": int(seed),
+            "level": level,
+            "batches": len(plan),
+            "workers": workers,
+            "estimates": bootstrap.summarize(names, estimate, draws, level),
+            "draws": draws.tolist(),
+        }
+
+    def _bootstrap_mean(
+        self, path: Path, source: _Source, seed: int, column: str, where: str | None = None
+    ) -> tuple[list[str], list[float], Any, Any]:
+        estimate = self.mean(path, column, where=where)
+        c = f"CAST({quote_ident(column)} AS DOUBLE)"
+        w = bootstrap.poisson_weight()
+        where_clause = f" AND ({where})" if where else ""
+
+        def batch_sql(first: int, last: int) -> str:
+            rel = bootstrap.replicate_relation(source.relation("?", row_ids=True), "?", seed, first, last)
+            b = bootstrap.REPLICATE
+            return (
+                f"SELECT {b}, SUM({w} * {c}) / NULLIF(SUM({w}), 0) FROM {rel}"
+                f" WHERE {c} IS NOT NULL{where_clause} GROUP BY {b} ORDER BY {b}"
+            )
+
+        def parse(values: Sequence[Any]) -> list[float]:
+            return [float("nan") if values[0] is None else float(values[0])]
+
+        return [column], [estimate], batch_sql, parse
+
+    def _bootstrap_ols(
+        self,
+        path: Path,
+        source: _Source,
+        seed: int,
+        y: str,
+        x: Sequence[str],
+        weights: str | None = None,
+        where: str | None = None,
+        add_constant: bool = True,
+    ) -> tuple[list[str], list[float], Any, Any]:
+        fit = self.ols(path, y, x, weights=weights, where=where, add_constant=add_constant)
+        d = self._center(source, regression.design(y, x, weights=weights, add_constant=add_constant), where)
+        # WLS: el peso de la réplica multiplica al peso de diseño.
+        w = bootstrap.poisson_weight()
+        rd = replace(d, weight=f"{w} * {d.weight}" if d.weight else w)
+
+        def batch_sql(first: int, last: int) -> str:
+            rel = bootstrap.replicate_relation(source.relation("?", row_ids=True), "?", seed, first, last)
+            return regression.moments_sql(rd, rel, where, group_by=bootstrap.REPLICATE)
+
+        def parse(values: Sequence[Any]) -> Any:
+            return regression.coefficients(rd, regression.Moments.from_row(rd, values))
+
+        return list(d.names), fit["coefficients"]["coef"], batch_sql, parse
+
+    def _query_batches(self, files: list[str], sqls: list[str], workers: int) -> list[list[tuple[Any, ...]]]:
+        """
+        Varios queries independientes sobre `files` (lotes de bootstrap).
+
+        Los lotes usan la lista de archivos dos veces (read_parquet y la
+        posición del archivo de cada fila): params = (files,).
+
+        workers = 1: en este proceso, vía _query_rows (caché incluida).
+        workers > 1: pool de procesos, cada uno con su DuckDB y su parte de
+        los cores. Los lotes ya cacheados no se recalculan.
+        """
+        params = (files,)
+        if workers <= 1:
+            return [self._query_rows(files, sql, params) for sql in sqls]
+
+        results: list[Any] = [None] * len(sqls)
+        keys: dict[int, str] = {}
+        pending = []
+        for i, sql in enumerate(sqls):
+            if self.cache is not None:
+                keys[i] = self.cache.make_key(version_fingerprint(files), sql, params)
+                cached = self.cache.get(keys[i])
+                if cached is not _MISSING:
+                    self.telemetry.add(cache_hits=1)
+                    results[i] = cached
+                    continue
+            pending.append(i)
+        if not pending:
+            return results
+
+        # Los procesos se reparten el presupuesto de hilos (resources.threads
+        # o todos los cores) y ocupan UN slot de admisión: es un solo job.
+        threads = max(1, (self.resources.threads or os.cpu_count() or 1) // workers)
+        resources = replace(self.resources, threads=threads)
+        # spawn, no fork: este proceso puede tener hilos de DuckDB vivos.
+        context = multiprocessing.get_context("spawn")
+        with self._admitted(), ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context) as pool:
+            futures = {i: pool.submit(bootstrap.run_batch, sqls[i], [files, *params], resources) for i in pending}
+            for i, future in futures.items():
+                results[i] = future.result()
+                if self.cache is not None:
+                    self.cache.put(keys[i], results[i])
+        return results
+
+    def _check_columns(self, source: _Source, columns: Sequence[str]) -> None:
+        available = self._source_columns(source)
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise ValueError(f"Columnas inexistentes en la versión: {missing}")
+
+    # ---------------------------
+    # Perfilado
+    # ---------------------------
+
+    def profile(self, dataset_version_path: Path, top_k: int = 5) -> dict[str, Any]:
+        """
+        Perfil de TODAS las columnas con a lo sumo un scan de datos.
+
+        Dos fuentes:
+          1) Footer Parquet (parquet_metadata / parquet_file_metadata):
+             filas, min/max y nulos salen de las estadísticas por row group,
+             sin leer datos.
+          2) UNA query agregada para todo el resto (media, desvío, cuantiles
+             aproximados, distintos aproximados, top values), con todas las
+             columnas en el mismo SELECT: DuckDB lo resuelve en un solo scan
+             vectorizado, no uno por columna.
+
+        Si algún row group no trae estadísticas para una columna, su
+        min/max/nulos se agregan a esa misma query (fallback, sin scan extra).
+        Lo mismo en versiones virtuales (los footers describen la base, no el
+        resultado filtrado): filas, min/max y nulos salen del scan.
+
+        Devuelve:
+          {"rows": n, "columns": {col: {"type", "nulls", "min", "max", ...}}}
+        """
+        # Lista de archivos: parquet_metadata / read_parquet aceptan varios.
+        source = self._source(dataset_version_path)
+        path = source.files
+        schema = list(self._source_columns(source).items())
+
+        with self._connect() as con:
+            n_rows = 0
+            footer_row: tuple[Any, ...] = (None, None, None, None) * len(schema)
+            if not source.virtual:
+                (n_rows,) = con.execute(
+                    "SELECT COALESCE(SUM(num_rows), 0) FROM parquet_file_metadata(?);",
+                    [path],
+                ).fetchone()
+
+            # --- 1) Footer: min/max/nulos tipados, una sola query sobre metadata ---
+            footer_exprs: list[str] = []
+            for name, col_type in schema if not source.virtual else ():
+                lit = quote_literal(name)
+                where = f"FILTER (WHERE path_in_schema = {lit})"
+                footer_exprs += [
+                    # complete = todos los row groups traen stats para la columna
+                    f"bool_and(stats_min_value IS NOT NULL AND stats_max_value IS NOT NULL"
+                    f" AND stats_null_count IS NOT NULL) {where}",
+                    f"MIN(TRY_CAST(stats_min_value AS {col_type})) {where}",
+                    f"MAX(TRY_CAST(stats_max_value AS {col_type})) {where}",
+                    f"SUM(stats_null_count) {where}",
+                ]
+            if footer_exprs:
+                footer_row = con.execute(
+                    f"SELECT {', '.join(footer_exprs)} FROM parquet_metadata(?);",
+                    [path],
+                ).fetchone()
+
+            columns: dict[str, dict[str, Any]] = {}
+            needs_scan: set[str] = set()
+            for i, (name, col_type) in enumerate(schema):
+                complete, min_value, max_value, nulls = footer_row[4 * i : 4 * i + 4]
+                if source.virtual or (n_rows and not complete):
+                    needs_scan.add(name)
+                columns[name] = {
+                    "type": col_type,
+                    "nulls": int(nulls or 0),
+                    "min": min_value,
+                    "max": max_value,
+                    "stats_from_footer": name not in needs_scan,
+                }
+
+            # --- 2) Un único scan vectorizado para el resto ---
+            scan_exprs: list[str] = []
+            slots: list[tuple[str, str]] = []  # (columna, stat) en orden de SELECT
+
+            def add(name: str, stat: str, expr: str) -> None:
+                scan_exprs.append(expr)
+                slots.append((name, stat))
+
+            if source.virtual:
+                add("", "rows", "COUNT(*)")
+            for name, col_type in schema:
+                col = quote_ident(name)
+                add(name, "distinct_approx", f"approx_count_distinct({col})")
+                add(name, "top_values", f"approx_top_k({col}, {int(top_k)})")
+                if _is_numeric(col_type):
+                    add(name, "mean", f"AVG({col})")
+                    add(name, "std", f"STDDEV_SAMP({col})")
+                    add(name, "quantiles", f"approx_quantile({col}, [0.25, 0.5, 0.75])")
+                if name in needs_scan:
+                    add(name, "min", f"MIN({col})")
+                    add(name, "max", f"MAX({col})")
+                    add(name, "nulls", f"COUNT(*) - COUNT({col})")
+
+            # fetchall (no fetchone): el profiler cierra la query recién al
+            # consumir el resultado entero; con fetchone reporta ceros.
+            scan_row = (
+                con.execute(
+                    f"SELECT {', '.join(scan_exprs)} FROM {source.relation('?')};",
+                    [path],
+                ).fetchall()[0]
+                if scan_exprs
+                else ()
+            )
+
+        for (name, stat), value in zip(slots, scan_row):
+            if stat == "rows":
+                n_rows = value
+                continue
+            info = columns[name]
+            if stat == "quantiles":
+                info["q25"], info["median"], info["q75"] = value if value is not None else (None, None, None)
+            elif stat == "nulls":
+                info["nulls"] = int(value)
+            else:
+                info[stat] = value
+
+        return {"rows": int(n_rows), "columns": columns}
+
+    # ---------------------------
+    # Pipelines de transformaciones
+    # ---------------------------
+
+    def apply_steps(
+        self,
+        dataset_version_path: Path,
+        steps: Sequence[TransformStep],
+        out_version_path: Path,
+        write_policy: WritePolicy | None = None,
+    ) -> Path:
+        """
+        Aplica una cadena de transformaciones y escribe UN solo parquet.
+
+        Cada paso se traduce a un SELECT sobre el paso anterior y todo se arma
+        como CTEs encadenadas:
+
+            COPY (
+                WITH s0 AS NOT MATERIALIZED (SELECT * FROM read_parquet($1)),
+                     s1 AS NOT MATERIALIZED (SELECT * FROM s0 WHERE ...),
+                     s2 AS NOT MATERIALIZED (...)
+                SELECT * FROM s2
+            ) TO $2 (FORMAT PARQUET);
+
+        DuckDB planifica la cadena completa: una lectura del parquet de entrada
+        y una escritura, en vez de leer/reescribir el dataset por cada paso.
+        """
+        source = self._source(dataset_version_path)
+        out_version_path = Path(out_version_path)
+
+        if not steps:
+            raise ValueError("El pipeline no tiene pasos.")
+
+        with self._connect() as con:
+            ctx = _StepContext(con, source=source)
+            try:
+                # Armamos el SQL antes de tocar disco: un paso no implementado
+                # o inválido falla sin dejar directorios a medias.
+                for i, step in enumerate(steps, start=1):
+                    ctx.ctes.append(f"s{i} AS NOT MATERIALIZED ({self._step_select(ctx, step, f's{i - 1}')})")
+                query = "WITH " + ",\n".join(ctx.ctes) + f"\nSELECT * FROM s{len(steps)}"
+
+                out_version_path.parent.mkdir(parents=True, exist_ok=True)
+                rows_written = self._write_parquet(con, query, ctx.source, out_version_path, write_policy)
+            finally:
+                ctx.release()
+
+        self.telemetry.add(rows_written=rows_written, bytes_written=output_bytes(out_version_path))
+        return out_version_path
+
+    def _step_select(self, ctx: _StepContext, step: TransformStep, rel: str) -> str:
+        """Traduce un paso a un SELECT que lee de la relación `rel`."""
+        builder = getattr(self, f"_{step.kind}_select", None)
+        if builder is None:
+            raise ValueError(f"Transformación desconocida: {step.kind!r}")
+        return builder(ctx, rel, **step.params)
+
+    def _select_select(self, ctx: _StepContext, rel: str, columns: Sequence[str]) -> str:
+        """Proyección: se queda solo con `columns` (en ese orden)."""
+        columns = _as_list(columns)
+        if not columns:
+            raise ValueError("Select requiere al menos una columna.")
+        return f"SELECT {', '.join(quote_ident(c) for c in columns)} FROM {rel}"
+
+    def _filter_select(self, ctx: _StepContext, rel: str, where: str) -> str:
+        # `where` es SQL del usuario (ver filter).
+        return f"SELECT * FROM {rel} WHERE {where}"
+
+    def _winsorize_select(
+        self,
+        ctx: _StepContext,
+        rel: str,
+        columns: str | Sequence[str],
+        p_low: float,
+        p_high: float,
+        out_columns: Sequence[str | None] | None = None,
+        group_by: Sequence[str] | None = None,
+        approx: bool = False,
+    ) -> str:
+        """
+        Winsoriza varias columnas (opcionalmente dentro de grupos) en UN paso.
+
+        Plan (dos pasadas streaming como máximo):
+          1) `bounds`: una agregación con los cuantiles [p_low, p_high] de
+             TODAS las columnas a la vez (GROUP BY group_by si hay grupos).
+             - exacto: quantile_cont (DuckDB debe bufferear/ordenar valores).
+             - approx: approx_quantile (sketch T-Digest, memoria acotada).
+          2) un único SELECT que recorta cada columna contra sus bounds
+             (CROSS JOIN sin grupos, LEFT JOIN por grupo si los hay).
+
+        Con varias columnas el dataset se reescribe UNA vez, no una por columna.
+
+        - En el lugar (out_col None o == col), la columna conserva su tipo: los
+          bounds son DOUBLE y una columna BIGINT no debe volverse DOUBLE.
+        - Con grupos, el LEFT JOIN no respeta el orden de entrada: igual que
+          en _recode_select, cada fila lleva su posición y se reordena.
+        """
+        columns = _as_list(columns)
+        group_by = _as_list(group_by)
+        out_columns = list(out_columns) if out_columns else [None] * len(columns)
+
+        if not columns:
+            raise ValueError("Winsorize requiere al menos una columna.")
+        if len(out_columns) != len(columns):
+            raise ValueError("out_columns debe tener el mismo largo que columns.")
+        if not 0.0 <= p_low < p_high <= 1.0:
+            raise ValueError(f"Percentiles inválidos: p_low={p_low}, p_high={p_high} (0 <= p_low < p_high <= 1).")
+
+        quantile_fn = "approx_quantile" if approx else "quantile_cont"
+        probs = f"[{float(p_low)!r}, {float(p_high)!r}]"
+        groups = [quote_ident(g) for g in group_by]
+
+        bound_exprs = [f"{quantile_fn}({quote_ident(c)}, {probs}) AS __sara_b{i}" for i, c in enumerate(columns)]
+        bounds_sql = f"SELECT {', '.join(groups + bound_exprs)} FROM {rel}"
+        if groups:
+            bounds_sql += f" GROUP BY {', '.join(groups)}"
+            on = " AND ".join(f"r.{g} IS NOT DISTINCT FROM b.{g}" for g in groups)
+            join = f"LEFT JOIN bounds AS b ON {on}"
+        else:
+            join = "CROSS JOIN bounds AS b"
+
+        types = ctx.column_types(rel)
+        unknown = [c for c in columns if c not in types]
+        if unknown:
+            raise ValueError(f"Columnas inexistentes para winsorize: {unknown}")
+        replaced: list[str] = []
+        added: list[str] = []
+        for i, (col, out_col) in enumerate(zip(columns, out_columns)):
+            c = f"r.{quote_ident(col)}"
+            lo, hi = f"b.__sara_b{i}[1]", f"b.__sara_b{i}[2]"
+            clipped = f"CASE WHEN {c} < {lo} THEN {lo} WHEN {c} > {hi} THEN {hi} ELSE {c} END"
+            if out_col is None or out_col == col:
+                replaced.append(f"CAST({clipped} AS {types[col]}) AS {quote_ident(col)}")
+            else:
+                added.append(f"{clipped} AS {quote_ident(out_col)}")
+
+        star = "r.*"
+        rows, order = rel, ""
+        if groups:
+            star = f"r.* EXCLUDE ({_ROW_POS})"
+            rows = f"(SELECT *, row_number() OVER () AS {_ROW_POS} FROM {rel})"
+            order = f" ORDER BY r.{_ROW_POS}"
+        if replaced:
+            star += f" REPLACE ({', '.join(replaced)})"
+        return (
+            f"WITH bounds AS ({bounds_sql}) "
+            f"SELECT {', '.join([star] + added)} FROM {rows} AS r {join}{order}"
+        )
+
+    def _recode_select(
+        self,
+        ctx: _StepContext,
+        rel: str,
+        mappings: dict[str, RecodeMapping],
+        out_columns: dict[str, str] | None = None,
+    ) -> str:
+        """
+        Recodifica una o varias columnas con hash joins contra tablas de mapping.
+
+        En vez de un CASE WHEN con miles de ramas (que se evalúa fila a fila),
+        cada mapping se registra en DuckDB como tabla Arrow (key, value) y se
+        hace un LEFT JOIN por columna: DuckDB arma una hash table por mapping
+        y recodifica todas las columnas en la misma pasada.
+
+        - La key se castea al tipo de la columna de origen (join tipado).
+        - Recode en el lugar (out_col == col): los valores sin entrada en el
+          mapping se conservan (un mapping parcial no borra datos). Si el tipo
+          de los valores nuevos no admite los viejos (p. ej. texto -> número)
+          y hay valores sin mapear, falla con cuántos son.
+        - Columna nueva (out_col != col): sin entrada en el mapping -> NULL.
+
+        Importante: el hash join no respeta el orden de entrada (DuckDB puede
+        emitir las filas sin match al final). Cada fila lleva su posición y
+        la salida se reordena por ella: recodificar no mueve filas.
+        """
+        out_columns = out_columns or {}
+        if not mappings:
+            raise ValueError("Recode requiere al menos un mapping.")
+        unknown = set(out_columns) - set(mappings)
+        if unknown:
+            raise ValueError(f"out_columns refiere columnas sin mapping: {sorted(unknown)}")
+
+        types = ctx.column_types(rel)
+        replaced: list[str] = []
+        added: list[str] = []
+        joins: list[str] = []
+        for i, (col, mapping) in enumerate(mappings.items()):
+            if col not in types:
+                raise ValueError(f"Columna inexistente para recode: {col!r}")
+            table_name = ctx.register(_load_mapping(mapping))
+            alias = f"m{i}"
+            lookup = f"(SELECT TRY_CAST(key AS {types[col]}) AS key, value FROM {table_name})"
+            joins.append(f"LEFT JOIN {lookup} AS {alias} ON r.{quote_ident(col)} = {alias}.key")
+            out_col = out_columns.get(col, col)
+            if out_col != col:
+                added.append(f"{alias}.value AS {quote_ident(out_col)}")
+                continue
+
+            value_type = ctx.con.execute(f"DESCRIBE SELECT value FROM {table_name}").fetchone()[1]
+            old = f"r.{quote_ident(col)}"
+            if value_type == types[col] or (_is_numeric(value_type) and _is_numeric(types[col])):
+                # Numérico con numérico: COALESCE sube al supertipo (INTEGER + DOUBLE
+                # -> DOUBLE) en vez de truncar los valores sin mapear.
+                expr = f"COALESCE({alias}.value, {old})"
+            elif value_type == "VARCHAR":
+                expr = f"COALESCE({alias}.value, CAST({old} AS VARCHAR))"
+            else:
+                unmatched = ctx.scalar(
+                    f"SELECT count(*) FROM {rel} AS r ANTI JOIN {lookup} AS {alias}"
+                    f" ON {old} = {alias}.key WHERE {old} IS NOT NULL"
+                )
+                if unmatched:
+                    raise ValueError(
+                        f"Recode de {col!r}: {unmatched} filas con valores sin entrada en el mapping y los"
+                        f" valores nuevos ({value_type}) no admiten los viejos ({types[col]}). Completar el"
+                        " mapping o usar out_columns."
+                    )
+                expr = f"{alias}.value"
+            replaced.append(f"{expr} AS {quote_ident(col)}")
+
+        star = f"r.* EXCLUDE ({_ROW_POS})"
+        if replaced:
+            star += f" REPLACE ({', '.join(replaced)})"
+        rows = f"(SELECT *, row_number() OVER () AS {_ROW_POS} FROM {rel})"
+        return f"SELECT {', '.join([star] + added)} FROM {rows} AS r {' '.join(joins)} ORDER BY r.{_ROW_POS}"
+
     # ---------------------------
-    # Stubs pendientes (tu roadmap)
+    # Transformaciones de un paso
     # ---------------------------
 
-    def profile(self, dataset_version_path: Path) -> dict[str, Any]:
-        raise NotImplementedError("Profile not implemented yet.")
+    def materialize(
+        self,
+        dataset_version_path: Path,
+        out_version_path: Path,
+        write_policy: WritePolicy | None = None,
+    ) -> Path:
+        """
+        Escribe a Parquet los datos de una versión (típicamente virtual:
+        la cadena de vistas se resuelve en un solo COPY).
+        """
+        source = self._source(dataset_version_path)
+        out_version_path = Path(out_version_path)
+        out_version_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as con:
+            rows_written = self._write_parquet(
+                con, f"SELECT * FROM {source.relation('$1')}", source.files, out_version_path, write_policy
+            )
+        self.telemetry.add(rows_written=rows_written, bytes_written=output_bytes(out_version_path))
+        return out_version_path
 
     def winsorize(
         self,
         dataset_version_path: Path,
-        column: str,
+        columns: str | Sequence[str],
         p_low: float,
         p_high: float,
-        out_column: str | None,
+        out_columns: Sequence[str | None] | None,
         out_version_path: Path,
+        group_by: Sequence[str] | None = None,
+        approx: bool = False,
     ) -> Path:
-        raise NotImplementedError("Winsorize not implemented yet.")
+        """Winsoriza una o varias columnas (ver _winsorize_select)."""
+        step = TransformStep(
+            "winsorize",
+            {
+                "columns": _as_list(columns),
+                "p_low": p_low,
+                "p_high": p_high,
+                "out_columns": list(out_columns) if out_columns else None,
+                "group_by": _as_list(group_by) or None,
+                "approx": approx,
+            },
+        )
+        return self.apply_steps(dataset_version_path, [step], out_version_path)
 
     def recode(
         self,
         dataset_version_path: Path,
-        column: str,
-        mapping: dict[str, Any],
-        out_column: str | None,
+        mappings: dict[str, RecodeMapping],
+        out_columns: dict[str, str] | None,
         out_version_path: Path,
     ) -> Path:
-        raise NotImplementedError("Recode not implemented yet.")
\ No newline at end of file
+        """Recodifica una o varias columnas (ver _recode_select)."""
+        step = TransformStep("recode", {"mappings": mappings, "out_columns": out_columns})
+        return self.apply_steps(dataset_version_path, [step], out_version_path)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+import duckdb
+
+
+class ConnectionPool:
+    """
+    Pool thread-safe de cursores DuckDB sobre UNA sola base.
+
+    Idea:
+      - Abrimos una conexión "raíz" (duckdb.connect) una única vez.
+      - Cada slot del pool es un cursor de esa raíz (con.cursor()): comparte
+        buffer manager, caché de metadata Parquet y extensiones cargadas.
+      - Los cursores se crean bajo demanda hasta `size` y se reutilizan (LIFO,
+        así el más "caliente" vuelve a salir primero).
+
+    Nota:
+      - Con ":memory:" esto es importante: dos duckdb.connect(":memory:") son
+        bases distintas, pero los cursores de la raíz ven el mismo estado.
+      - Un cursor DuckDB NO es seguro para usar desde dos hilos a la vez; el
+        pool garantiza que cada cursor tenga un solo dueño mientras está prestado.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        size: int,
+        configure: Callable[[duckdb.DuckDBPyConnection], None] | None = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError(f"El tamaño del pool debe ser >= 1 (recibido: {size}).")
+        self.database = database
+        self.size = size
+        self._configure = configure
+        self._root: duckdb.DuckDBPyConnection | None = None
+        self._idle: queue.LifoQueue[duckdb.DuckDBPyConnection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    # ---------------------------
+    # Ciclo de vida
+    # ---------------------------
+
+    def _open_root(self) -> duckdb.DuckDBPyConnection:
+        # Llamar con self._lock tomado.
+        if self._root is None:
+            root = duckdb.connect(self.database)
+            # Cachear footers Parquet entre queries: es justamente lo que
+            # perdemos con conexiones efímeras.
+            try:
+                root.execute("SET parquet_metadata_cache = true;")
+            except duckdb.Error:
+                # Versiones viejas de DuckDB usan el nombre anterior.
+                root.execute("SET enable_object_cache = true;")
+            if self._configure is not None:
+                self._configure(root)
+            self._root = root
+        return self._root
+
+    def close(self) -> None:
+        """Cierra cursores ociosos y la conexión raíz. Idempotente."""
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            if self._root is not None:
+                self._root.close()
+                self._root = None
+            self._created = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    # ---------------------------
+    # Préstamo de cursores
+    # ---------------------------
+
+    def _acquire(self, timeout: float | None) -> duckdb.DuckDBPyConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El pool de conexiones está cerrado.")
+            if self._created < self.size:
+                cursor = self._open_root().cursor()
+                self._created += 1
+                return cursor
+
+        # Pool lleno: esperamos a que alguien devuelva un cursor.
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty as exc:
+            raise TimeoutError("No hay conexiones DuckDB libres en el pool.") from exc
+
+    def _release(self, cursor: duckdb.DuckDBPyConnection) -> None:
+        if self._closed:
+            cursor.close()
+            return
+        self._idle.put(cursor)
+
+    @contextmanager
+    def connection(self, timeout: float | None = None) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Presta un cursor del pool y lo devuelve al salir del bloque."""
+        cursor = self._acquire(timeout)
+        try:
+            yield cursor
+        finally:
+            self._release(cursor)
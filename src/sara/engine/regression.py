@@ -0,0 +1,657 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, replace
+from typing import Any, Sequence
+
+from .sql import quote_ident
+
+
+# Nombre del término constante en los resultados.
+CONSTANT = "const"
+
+
+@dataclass(frozen=True)
+class Design:
+    """
+    Especificación de una regresión lineal, lista para armar SQL.
+
+    - y / terms: expresiones SQL (ya quoteadas y casteadas a DOUBLE).
+    - names: nombres de los términos en el resultado (mismo orden que terms).
+    - weight: expresión SQL del peso (WLS) o None (OLS).
+    - clusters: columnas de cluster (quoteadas) para errores agrupados; entran
+      al filtro de casos completos para que las dos pasadas usen la misma muestra.
+      cluster_names: los nombres originales (para el resultado).
+    - absorbed: niveles de efectos fijos absorbidos (se restan de df_resid).
+    - center: (media de y, medias de los términos) si y/x entran centrados
+      (ver center()); () = sin centrar.
+    - fe_leverage: columna con la leverage del bloque absorbido (efectos
+      fijos de una vía; ver fe_leverage_sql), que se suma a la de X en HC2/HC3.
+
+    El diseño NO se materializa nunca: cada query lo evalúa fila a fila
+    dentro de DuckDB y solo vuelven agregados de tamaño k x k.
+    """
+
+    y_name: str
+    y: str
+    names: tuple[str, ...]
+    terms: tuple[str, ...]
+    weight: str | None = None
+    clusters: tuple[str, ...] = ()
+    cluster_names: tuple[str, ...] = ()
+    # Grados de libertad absorbidos por efectos fijos (niveles demeaneados).
+    absorbed: int = 0
+    center: tuple[float, ...] = ()
+    fe_leverage: str | None = None
+
+    @property
+    def k(self) -> int:
+        return len(self.terms)
+
+    def complete_cases(self) -> str:
+        """Filtro de casos completos (listwise deletion, como lm/statsmodels)."""
+        exprs = [self.y, *(t for t in self.terms if t != "1.0"), *self.clusters]
+        if self.weight is not None:
+            exprs.append(self.weight)
+        return " AND ".join(f"{e} IS NOT NULL" for e in exprs)
+
+    def filters(self, where: str | None) -> str:
+        """WHERE completo: casos completos + filtro del usuario."""
+        return self.complete_cases() + (f" AND ({where})" if where else "")
+
+
+def design(
+    y: str,
+    x: Sequence[str],
+    weights: str | None = None,
+    add_constant: bool = True,
+    cluster: Sequence[str] = (),
+) -> Design:
+    """Arma el Design a partir de nombres de columnas."""
+    x = list(x)
+    cluster = list(cluster)
+    if len(cluster) > 2:
+        raise ValueError(f"Clustering de a lo sumo dos vías (recibido: {cluster}).")
+    if not x and not add_constant:
+        raise ValueError("La regresión necesita al menos un regresor (o la constante).")
+    if len(set(x)) != len(x):
+        raise ValueError(f"Regresores repetidos: {x}")
+    if y in x:
+        raise ValueError(f"La variable dependiente {y!r} no puede ser también regresor.")
+
+    def col(name: str) -> str:
+        return f"CAST({quote_ident(name)} AS DOUBLE)"
+
+    names = ([CONSTANT] if add_constant else []) + x
+    terms = (["1.0"] if add_constant else []) + [col(c) for c in x]
+    return Design(
+        y_name=y,
+        y=col(y),
+        names=tuple(names),
+        terms=tuple(terms),
+        weight=col(weights) if weights else None,
+        clusters=tuple(quote_ident(c) for c in cluster),
+        cluster_names=tuple(cluster),
+    )
+
+
+# ---------------------------
+# Centrado (pre-pasada de medias)
+# ---------------------------
+# X'X con sumas crudas mezcla escalas: una constante junto a un año (~2010) o
+# un epoch en segundos (~1e9) da sumas de 1e6-1e18 por fila, y la varianza
+# que importa queda enterrada en los últimos dígitos (cancelación). Con
+# constante, la regresión se corre sobre y - ȳ y x - x̄: es una
+# reparametrización exacta (mismas pendientes y residuos; la constante se
+# recupera de las medias, ver uncenter). Sin constante no hay centrado.
+
+
+def means_sql(d: Design, relation: str, where: str | None = None) -> str | None:
+    """Medias (ponderadas si hay pesos) de y y de cada término; None si no hay qué centrar."""
+    if "1.0" not in d.terms or d.k < 2:
+        return None
+
+    def mean(expr: str) -> str:
+        return f"SUM({d.weight} * {expr}) / SUM({d.weight})" if d.weight else f"AVG({expr})"
+
+    exprs = [mean(d.y)] + [mean(t) for t in d.terms if t != "1.0"]
+    return f"SELECT {', '.join(exprs)} FROM {relation} WHERE {d.filters(where)}"
+
+
+def center(d: Design, row: Sequence[Any]) -> Design:
+    """
+    El Design sobre y - ȳ y x - x̄ (`row`: salida de means_sql).
+
+    Las medias no necesitan ser exactas (cualquier corrimiento es una
+    reparametrización válida): las réplicas de bootstrap usan las de la
+    muestra completa.
+    """
+    values = iter(float(v or 0.0) for v in row)
+    mu_y = next(values)
+    mus = [0.0 if t == "1.0" else next(values) for t in d.terms]
+    terms = tuple(t if t == "1.0" else f"({t} - {_literal(mu)})" for t, mu in zip(d.terms, mus))
+    return replace(d, y=f"({d.y} - {_literal(mu_y)})", terms=terms, center=(mu_y, *mus))
+
+
+def uncenter(d: Design, coef: Any, vcov: Any = None) -> Any:
+    """
+    Coeficientes (y vcov) del modelo original a partir de los del centrado.
+
+    Pendientes iguales; constante = ȳ + c - Σ x̄_j b_j. vcov = T V T' con T
+    la identidad salvo la fila de la constante (-x̄).
+    """
+    import numpy as np
+
+    if not d.center:
+        return coef if vcov is None else (coef, vcov)
+    c = d.terms.index("1.0")
+    mus = np.array(d.center[1:])
+    coef = np.array(coef, dtype=float)
+    coef[c] = d.center[0] + coef[c] - float(mus @ coef)
+    if vcov is None:
+        return coef
+    t = np.eye(d.k)
+    t[c] -= mus
+    t[c, c] = 1.0
+    return coef, t @ vcov @ t.T
+
+
+# ---------------------------
+# Pasada 1: estadísticos suficientes
+# ---------------------------
+
+
+def _pairs(k: int) -> list[tuple[int, int]]:
+    """Triángulo superior de X'X (i <= j): X'X es simétrica."""
+    return [(i, j) for i in range(k) for j in range(i, k)]
+
+
+def _product(*factors: str) -> str:
+    """Producto SQL de factores, salteando la constante (1.0)."""
+    kept = [f for f in factors if f != "1.0"]
+    return " * ".join(kept) if kept else "1.0"
+
+
+def moments_sql(d: Design, relation: str, where: str | None = None, group_by: str | None = None) -> str:
+    """
+    UN query de agregación con todo lo que necesita el solver.
+
+    Devuelve una fila:
+        n, sum_w, min_w, X'WX (triángulo superior), X'Wy, y'Wy, 1'Wy
+
+    Sin pesos, w = 1 (las expresiones no multiplican por nada).
+    Con group_by, una fila por grupo (la clave primero): varias regresiones
+    en el mismo scan (p. ej. réplicas de bootstrap).
+    """
+    w = d.weight
+
+    def wsum(expr: str) -> str:
+        return f"SUM({w} * {expr})" if w else f"SUM({expr})"
+
+    exprs = [
+        f"COUNT(*) FILTER (WHERE {w} > 0)" if w else "COUNT(*)",
+        f"SUM({w})" if w else "CAST(COUNT(*) AS DOUBLE)",
+        f"MIN({w})" if w else "1.0",
+    ]
+    exprs += [wsum(_product(d.terms[i], d.terms[j])) for i, j in _pairs(d.k)]
+    exprs += [wsum(_product(t, d.y)) for t in d.terms]
+    exprs += [wsum(f"{d.y} * {d.y}"), wsum(d.y)]
+    if group_by is None:
+        return f"SELECT {', '.join(exprs)} FROM {relation} WHERE {d.filters(where)}"
+    return f"SELECT {group_by}, {', '.join(exprs)} FROM {relation} WHERE {d.filters(where)} GROUP BY {group_by} ORDER BY {group_by}"
+
+
+@dataclass(frozen=True)
+class Moments:
+    """Estadísticos suficientes de una regresión (salida de moments_sql)."""
+
+    n: int
+    sum_w: float
+    xtx: Any  # np.ndarray (k, k)
+    xty: Any  # np.ndarray (k,)
+    yty: float
+    sum_y: float
+
+    @classmethod
+    def from_row(cls, d: Design, row: Sequence[Any]) -> "Moments":
+        import numpy as np
+
+        n, sum_w, min_w = int(row[0] or 0), float(row[1] or 0.0), row[2]
+        if min_w is not None and min_w < 0:
+            raise ValueError(f"Pesos negativos en la columna de pesos (mínimo: {min_w}).")
+        k = d.k
+        xtx = np.zeros((k, k))
+        values = iter(row[3:])
+        for i, j in _pairs(k):
+            xtx[i, j] = xtx[j, i] = float(next(values) or 0.0)
+        xty = np.array([float(next(values) or 0.0) for _ in range(k)])
+        yty, sum_y = float(next(values) or 0.0), float(next(values) or 0.0)
+        return cls(n=n, sum_w=sum_w, xtx=xtx, xty=xty, yty=yty, sum_y=sum_y)
+
+
+# ---------------------------
+# Solver (k x k, en NumPy)
+# ---------------------------
+
+
+# Rango numérico de X'WX equilibrada: autovalores por debajo de esto
+# (relativo al mayor) cuentan como colinealidad.
+_RANK_TOL = 1e-12
+
+
+def _inverse(xtx: Any) -> Any:
+    """
+    (X'WX)⁻¹, o None si es singular.
+
+    Antes del test de rango se equilibra (D^-1/2 X'WX D^-1/2, D = diagonal):
+    las escalas de las columnas (pesos vs proporciones) no cuentan como
+    colinealidad.
+    """
+    import numpy as np
+
+    diag = np.diag(xtx)
+    if np.any(diag <= 0):
+        return None  # columna idénticamente 0
+    scale = 1.0 / np.sqrt(diag)
+    eq = xtx * np.outer(scale, scale)
+    eig = np.linalg.eigvalsh(eq)
+    if eig[0] <= _RANK_TOL * eig[-1]:
+        return None
+    return np.linalg.solve(eq, np.diag(scale)) * scale[:, None]
+
+
+def coefficients(d: Design, m: Moments) -> Any:
+    """Solo los coeficientes (X'WX)⁻¹X'Wy; NaN si X'WX es singular (réplicas de bootstrap)."""
+    import numpy as np
+
+    xtx_inv = _inverse(m.xtx)
+    if xtx_inv is None:
+        return np.full(d.k, np.nan)
+    return uncenter(d, xtx_inv @ m.xty)
+
+
+def solve(d: Design, m: Moments) -> dict[str, Any]:
+    """
+    Resuelve (X'WX) b = X'Wy y arma el resultado con errores estándar clásicos.
+
+    Devuelve:
+        {"coefficients": {"term", "coef", "se", "t", "p"},   # columnar
+         "n", "df_resid", "r2", "adj_r2", "rss", "sigma", "vcov", "se_type", ...}
+    """
+    k = d.k
+    df_resid = m.n - k - d.absorbed
+    if df_resid <= 0:
+        raise ValueError(f"Observaciones insuficientes: n={m.n} para {k + d.absorbed} parámetros.")
+    xtx_inv = _inverse(m.xtx)
+    if xtx_inv is None:
+        raise ValueError(f"X'X singular: hay regresores colineales entre {list(d.names)}.")
+
+    coef = xtx_inv @ m.xty
+    # RSS = y'Wy - b'X'Wy (sin pasar por los residuos).
+    rss = max(m.yty - float(coef @ m.xty), 0.0)
+    sigma2 = rss / df_resid
+
+    has_constant = CONSTANT in d.names
+    tss = m.yty - m.sum_y**2 / m.sum_w if has_constant else m.yty
+    r2 = 1.0 - rss / tss if tss > 0 else float("nan")
+    df_model = k - 1 if has_constant else k
+    adj_r2 = 1.0 - (1.0 - r2) * (m.n - (1 if has_constant or d.absorbed else 0)) / df_resid
+
+    result = {
+        "method": "wls" if d.weight else "ols",
+        "y": d.y_name,
+        "n": m.n,
+        "df_model": df_model,
+        "df_resid": df_resid,
+        "r2": r2,
+        "adj_r2": adj_r2,
+        "rss": rss,
+        "sigma": math.sqrt(sigma2),
+    }
+    coef, vcov = uncenter(d, coef, sigma2 * xtx_inv)
+    return with_vcov(result, d.names, coef, vcov, "classical", df_resid)
+
+
+def with_vcov(
+    result: dict[str, Any],
+    names: Sequence[str],
+    coef: Any,
+    vcov: Any,
+    se_type: str,
+    df: int,
+) -> dict[str, Any]:
+    """Agrega tabla de coeficientes (se, t, p) y vcov al resultado."""
+    import numpy as np
+
+    se = np.sqrt(np.clip(np.diag(vcov), 0.0, None))
+    t = np.divide(coef, se, out=np.full_like(coef, np.nan), where=se > 0)
+    result = dict(result)
+    result["coefficients"] = {
+        "term": list(names),
+        "coef": [float(v) for v in coef],
+        "se": [float(v) for v in se],
+        "t": [float(v) for v in t],
+        "p": [t_pvalue(float(v), df) for v in t],
+    }
+    result["vcov"] = [[float(v) for v in row] for row in vcov]
+    result["se_type"] = se_type
+    return result
+
+
+# ---------------------------
+# Efectos fijos: within-transformation en DuckDB
+# ---------------------------
+# En vez de dummies (k + G columnas), se demeanean y y x por grupo dentro de
+# DuckDB y se corre la regresión sin constante sobre lo demeaneado
+# (Frisch-Waugh-Lovell). Una dimensión: un demean exacto. Varias: proyecciones
+# alternadas (demean por g1, por g2, ... hasta que las medias por grupo den 0).
+# Las variables demeaneadas viven en una tabla TEMP de la conexión: DuckDB la
+# baja a disco si no entra en memoria, y nunca pasa por Python.
+
+
+def _fe_design(d: Design) -> Design:
+    """El mismo Design, pero sobre las columnas canónicas de la tabla temporal."""
+    return Design(
+        y_name=d.y_name,
+        y='"__y"',
+        names=d.names,
+        terms=tuple(f'"__x{i}"' for i in range(d.k)),
+        weight='"__w"' if d.weight else None,
+        clusters=tuple(f'"__c{i}"' for i in range(len(d.clusters))),
+        cluster_names=d.cluster_names,
+    )
+
+
+def _fe_table_sql(d: Design, fe: Sequence[str], relation: str, where: str | None, table: str) -> str:
+    fe_cols = [quote_ident(f) for f in fe]
+    cols = [f'{d.y} AS "__y"']
+    cols += [f'{t} AS "__x{i}"' for i, t in enumerate(d.terms)]
+    cols += [f'{c} AS "__c{i}"' for i, c in enumerate(d.clusters)]
+    cols += [f'{f} AS "__fe{i}"' for i, f in enumerate(fe_cols)]
+    if d.weight:
+        cols.append(f'{d.weight} AS "__w"')
+    not_null = " AND ".join(f"{f} IS NOT NULL" for f in fe_cols)
+    return (
+        f"CREATE TEMP TABLE {table} AS SELECT {', '.join(cols)} "
+        f"FROM {relation} WHERE {d.filters(where)} AND {not_null}"
+    )
+
+
+def _group_mean(v: str, weight: str | None, window: str = "") -> str:
+    if weight:
+        return f"SUM({weight} * {v}){window} / SUM({weight}){window}"
+    return f"AVG({v}){window}"
+
+
+def _demean_sql(td: Design, table: str, fe_col: str) -> str:
+    over = f" OVER (PARTITION BY {fe_col})"
+    replaced = [f"{v} - {_group_mean(v, td.weight, over)} AS {v}" for v in (td.y, *td.terms)]
+    return f"CREATE OR REPLACE TEMP TABLE {table} AS SELECT * REPLACE ({', '.join(replaced)}) FROM {table}"
+
+
+def _gap_sql(td: Design, table: str, fe_col: str, scales: Sequence[float]) -> str:
+    """Máxima |media por grupo| / desvío inicial: 0 = convergió para esa dimensión."""
+    means = [f"ABS({_group_mean(v, td.weight)}) / {_literal(sd)}" for v, sd in zip((td.y, *td.terms), scales)]
+    return f"SELECT MAX(gap) FROM (SELECT GREATEST({', '.join(means)}) AS gap FROM {table} GROUP BY {fe_col})"
+
+
+def absorb(
+    execute: Any,
+    d: Design,
+    fe: Sequence[str],
+    relation: str,
+    where: str | None,
+    table: str,
+    params: Sequence[Any] = (),
+    tol: float = 1e-8,
+    max_iter: int = 1000,
+) -> tuple[Design, dict[str, Any]]:
+    """
+    Crea `table` con y/x demeaneados por los efectos fijos `fe`.
+
+    `execute(sql, params=()) -> filas` corre sobre UNA conexión (la tabla es
+    TEMP); `params` son los de `relation` (solo los usa el CREATE inicial).
+    Devuelve el Design sobre la tabla (sin constante, con `absorbed`) y
+    info para el resultado: niveles por dimensión, iteraciones, convergencia.
+
+    Grados de libertad: Σ niveles - (dimensiones - 1). Es exacto con una
+    dimensión; con dos o más asume un único componente conexo (lo usual en
+    paneles unidad x año).
+    """
+    if not fe:
+        raise ValueError("Efectos fijos: falta al menos una columna (fe).")
+    if len(set(fe)) != len(fe):
+        raise ValueError(f"Efectos fijos repetidos: {list(fe)}")
+
+    execute(_fe_table_sql(d, fe, relation, where, table), params)
+    td = _fe_design(d)
+    fe_cols = [f'"__fe{i}"' for i in range(len(fe))]
+    distinct = ", ".join(f"COUNT(DISTINCT {c})" for c in fe_cols)
+    levels = [int(v) for v in execute(f"SELECT {distinct} FROM {table}")[0]]
+
+    # Desvíos iniciales: una columna en pesos y otra en proporciones
+    # convergen con la misma tolerancia (relativa).
+    scales: list[float] = []
+    if len(fe) > 1:
+        row = execute(f"SELECT {', '.join(f'STDDEV_POP({v})' for v in (td.y, *td.terms))} FROM {table}")[0]
+        scales = [float(v) if v else 1.0 for v in row]
+
+    iterations, converged = 0, len(fe) == 1
+    while True:
+        iterations += 1
+        for col in fe_cols:
+            execute(_demean_sql(td, table, col))
+        if converged or iterations >= max_iter:
+            break
+        # La última dimensión quedó exacta; alcanza con mirar las demás.
+        gap = max(float(execute(_gap_sql(td, table, col, scales))[0][0] or 0.0) for col in fe_cols[:-1])
+        if gap < tol:
+            converged = True
+            break
+
+    absorbed = sum(levels) - (len(fe) - 1)
+    info = {"fe": list(fe), "fe_levels": levels, "fe_iterations": iterations, "fe_converged": converged}
+    return replace(td, absorbed=absorbed), info
+
+
+def fe_leverage_sql(td: Design, table: str) -> tuple[str, Design]:
+    """
+    Agrega a `table` la leverage del bloque de efectos fijos (una vía).
+
+    Con dummies D, la hat matrix de [D, X] es P_D + P_(M_D X): la leverage
+    de una fila es la de X demeaneada más la de su grupo, w_i / Σ_g w (1/n_g
+    sin pesos). Sin ese término HC2/HC3 salen chicos. Con dos o más vías no
+    hay forma cerrada (ver DuckDBEngine.ols).
+    """
+    share = f"{td.weight} / SUM({td.weight}) OVER w" if td.weight else "1.0 / COUNT(*) OVER w"
+    sql = (
+        f'CREATE OR REPLACE TEMP TABLE {table} AS SELECT *, {share} AS "__h" '
+        f'FROM {table} WINDOW w AS (PARTITION BY "__fe0")'
+    )
+    return sql, replace(td, fe_leverage='"__h"')
+
+
+# ---------------------------
+# Pasada 2: errores estándar robustos (HC0-HC3) y por cluster
+# ---------------------------
+# Sandwich: V = A · meat · A, con A = (X'WX)^-1 y scores u_i = w_i e_i x_i.
+# Los residuos e_i = y_i - x_i'b se evalúan en SQL con b como literales: el
+# vector de residuos nunca sale de DuckDB, solo vuelve "meat" (k x k).
+
+SE_TYPES = ("classical", "hc0", "hc1", "hc2", "hc3")
+
+
+def _literal(value: float) -> str:
+    # repr de float es exacto (round-trip): el SQL usa el mismo b que NumPy.
+    return f"CAST({float(value)!r} AS DOUBLE)"
+
+
+def _residual(d: Design, coef: Sequence[float]) -> str:
+    fitted = " + ".join(_product(_literal(b), t) for b, t in zip(coef, d.terms))
+    return f"({d.y} - ({fitted}))"
+
+
+def _leverage(d: Design, xtx_inv: Any) -> str:
+    """h_i = w_i x_i' A x_i (diagonal de la hat matrix), como expresión SQL."""
+    parts = []
+    for i, j in _pairs(d.k):
+        factor = xtx_inv[i, j] * (1.0 if i == j else 2.0)
+        parts.append(_product(_literal(factor), d.terms[i], d.terms[j]))
+    h = " + ".join(parts)
+    h = _product(d.weight, f"({h})") if d.weight else f"({h})"
+    return f"({h} + {d.fe_leverage})" if d.fe_leverage else h
+
+
+def hc_sql(d: Design, coef: Sequence[float], xtx_inv: Any, kind: str, relation: str, where: str | None) -> str:
+    """
+    Meat de HC0-HC3 en un scan: SUM(w² e² x_i x_j / (1 - h)^p), triángulo superior.
+
+    HC2 (p=1) y HC3 (p=2) necesitan la leverage h de cada fila, que sale de
+    A (k x k, literal) y la fila misma: tampoco requiere la matriz de diseño.
+    """
+    e = _residual(d, coef)
+    scale = f"{d.weight} * {d.weight} * {e} * {e}" if d.weight else f"{e} * {e}"
+    power = {"hc0": 0, "hc1": 0, "hc2": 1, "hc3": 2}[kind]
+    if power:
+        scale = f"{scale} / POWER(1.0 - {_leverage(d, xtx_inv)}, {power})"
+    exprs = [f"SUM({_product(f'({scale})', d.terms[i], d.terms[j])})" for i, j in _pairs(d.k)]
+    return f"SELECT {', '.join(exprs)} FROM {relation} WHERE {d.filters(where)}"
+
+
+def cluster_sql(d: Design, coef: Sequence[float], relation: str, where: str | None) -> str:
+    """
+    Meat por cluster: scores sumados por cluster y luego Σ_g S_g S_g'.
+
+    Una sola pasada para una o dos vías: GROUPING SETS arma a la vez los
+    scores por c1, por c2 y por la intersección (c1, c2). Devuelve una fila
+    por grouping set: (gid, G, meat triángulo superior).
+    """
+    e = _residual(d, coef)
+    score = f"{d.weight} * {e}" if d.weight else e
+    sums = [f"SUM({_product(score, t)}) AS s{i}" for i, t in enumerate(d.terms)]
+    cols = ", ".join(d.clusters)
+    sets = ", ".join(f"({s})" for s in _cluster_sets(d))
+    meat = [f"SUM(s{i} * s{j})" for i, j in _pairs(d.k)]
+    return f"""
+        WITH scores AS (
+            SELECT GROUPING({cols}) AS gid, {', '.join(sums)}
+            FROM {relation}
+            WHERE {d.filters(where)}
+            GROUP BY GROUPING SETS ({sets})
+        )
+        SELECT gid, COUNT(*), {', '.join(meat)} FROM scores GROUP BY gid ORDER BY gid
+    """
+
+
+def _cluster_sets(d: Design) -> list[str]:
+    if len(d.clusters) == 1:
+        return [d.clusters[0]]
+    c1, c2 = d.clusters
+    return [c1, c2, f"{c1}, {c2}"]
+
+
+def _sym(k: int, values: Sequence[Any]) -> Any:
+    import numpy as np
+
+    out = np.zeros((k, k))
+    for (i, j), v in zip(_pairs(k), values):
+        out[i, j] = out[j, i] = float(v or 0.0)
+    return out
+
+
+def robust(
+    d: Design,
+    m: Moments,
+    result: dict[str, Any],
+    se: str,
+    relation: str,
+    where: str | None,
+    query: Any,
+) -> dict[str, Any]:
+    """
+    Reemplaza los errores clásicos de `result` por HC0-HC3 o por cluster.
+
+    `query(sql) -> filas` corre la pasada 2 (el engine la pasa con su caché).
+    Correcciones de muestra chica como Stata: HC1 = n/(n-k) · HC0; cluster
+    G/(G-1) · (n-1)/(n-k) por componente (Cameron-Gelbach-Miller en dos
+    vías). Con efectos fijos, k incluye los niveles absorbidos.
+    Con cluster, los p-valores usan t con G-1 grados de libertad (G mínimo).
+    """
+    import numpy as np
+
+    k, n, df_resid = d.k, m.n, result["df_resid"]
+    # Residuos y leverage sobre el diseño tal cual se agregó (centrado o no).
+    xtx_inv = _inverse(m.xtx)
+    coef = xtx_inv @ m.xty
+
+    if d.clusters:
+        rows = query(cluster_sql(d, coef, relation, where))
+        # GROUPING(c1, c2): bit alto = c1 agregado. (c1) -> 1, (c2) -> 2, (c1, c2) -> 0.
+        by_gid = {row[0]: (int(row[1]), _sym(k, row[2:])) for row in rows}
+        if len(d.clusters) == 1:
+            parts = [(1.0, *by_gid[0])]
+        else:
+            parts = [(1.0, *by_gid[1]), (1.0, *by_gid[2]), (-1.0, *by_gid[0])]
+        meat = np.zeros((k, k))
+        for sign, g, part in parts:
+            if g < 2:
+                raise ValueError("Errores por cluster necesitan al menos 2 clusters por vía.")
+            meat += sign * g / (g - 1) * (n - 1) / df_resid * part
+        n_clusters = [g for _, g, _ in parts[:len(d.clusters)]]
+        names = ", ".join(d.cluster_names)
+        result = {**result, "n_clusters": n_clusters}
+        se_type, df = f"cluster({names})", min(n_clusters) - 1
+    else:
+        (row,) = query(hc_sql(d, coef, xtx_inv, se, relation, where))
+        meat = _sym(k, row)
+        if se == "hc1":
+            meat *= n / df_resid
+        se_type, df = se, df_resid
+
+    coef, vcov = uncenter(d, coef, xtx_inv @ meat @ xtx_inv)
+    return with_vcov(result, d.names, coef, vcov, se_type, df)
+
+
+# ---------------------------
+# p-valores (t de Student, sin scipy)
+# ---------------------------
+
+
+def t_pvalue(t: float, df: float) -> float:
+    """P(|T| > |t|) para T ~ t(df): 2 colas, vía beta incompleta regularizada."""
+    if math.isnan(t) or df <= 0:
+        return float("nan")
+    if math.isinf(t):
+        return 0.0
+    return _betainc(df / 2.0, 0.5, df / (df + t * t))
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """Beta incompleta regularizada I_x(a, b) (fracción continua de Lentz)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    # La fracción converge rápido para x < (a+1)/(a+b+2); si no, simetría.
+    if x > (a + 1.0) / (a + b + 2.0):
+        return 1.0 - _betainc(b, a, 1.0 - x)
+
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        for num in (
+            m * (b - m) * x / ((a + m2 - 1.0) * (a + m2)),
+            -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1.0)),
+        ):
+            d = 1.0 + num * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + num / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-15:
+            break
+    return math.exp(log_front) * h / a
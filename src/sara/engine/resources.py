@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from .sql import quote_literal
+
+
+@dataclass(frozen=True)
+class Resources:
+    """
+    Recursos de DuckDB por conexión (ver SARASettings.duckdb_*).
+
+    - threads: hilos por query (0 = default de DuckDB: todos los cores).
+    - memory_limit: tope del buffer manager ("8GB", "512MB"; None = default,
+      80% de la RAM). Pasado el tope, sorts/joins/aggregates spillean a
+      temp_directory en vez de morir por OOM.
+    - temp_directory: dónde spillear (None = default de DuckDB).
+
+    Importante: cada duckdb.connect(":memory:") es una base aparte con su
+    propio tope; el total de la máquina lo acota max_concurrent_jobs x
+    memory_limit (ver AdmissionControl).
+    """
+
+    threads: int = 0
+    memory_limit: str | None = None
+    temp_directory: str | None = None
+
+    def __post_init__(self) -> None:
+        if self.threads < 0:
+            raise ValueError(f"threads debe ser >= 0 (recibido: {self.threads}).")
+
+    def statements(self) -> list[str]:
+        """SETs a correr en cada conexión nueva (vacío = defaults de DuckDB)."""
+        # SET no acepta parámetros bindeados: literales quoteados.
+        stmts = []
+        if self.threads:
+            stmts.append(f"SET threads = {int(self.threads)}")
+        if self.memory_limit:
+            stmts.append(f"SET memory_limit = {quote_literal(str(self.memory_limit))}")
+        if self.temp_directory:
+            stmts.append(f"SET temp_directory = {quote_literal(str(self.temp_directory))}")
+        return stmts
+
+    def apply(self, con: Any) -> None:
+        if self.temp_directory:
+            Path(self.temp_directory).mkdir(parents=True, exist_ok=True)
+        for stmt in self.statements():
+            con.execute(stmt)
+
+
+# ---------------------------
+# Admisión (jobs pesados concurrentes)
+# ---------------------------
+
+
+class AdmissionControl:
+    """
+    Límite global de operaciones pesadas simultáneas (semáforo entre procesos).
+
+    Cada slot es un archivo en `slots_dir` tomado con flock(LOCK_EX | LOCK_NB):
+    - vale entre hilos, procesos y usuarios que compartan el directorio
+      (p. ej. /var/tmp/sara-slots en el server de análisis);
+    - si un proceso muere, el kernel libera su lock: no quedan slots colgados.
+
+    slot() es reentrante por hilo: una operación que abre otra conexión
+    adentro (o llama a otro método del engine) no se bloquea a sí misma.
+    Solo Unix (fcntl).
+    """
+
+    def __init__(self, slots_dir: Path, max_jobs: int, timeout: float | None = None, poll: float = 0.05) -> None:
+        if max_jobs < 1:
+            raise ValueError(f"max_jobs debe ser >= 1 (recibido: {max_jobs}).")
+        self.slots_dir = Path(slots_dir)
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.poll = poll
+        self._local = threading.local()
+
+    @contextmanager
+    def slot(self) -> Iterator[float]:
+        """Toma un slot (esperando si no hay); devuelve los segundos de espera."""
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            try:
+                yield 0.0
+            finally:
+                self._local.depth -= 1
+            return
+
+        start = time.perf_counter()
+        fd = self._acquire(start)
+        self._local.depth = 1
+        try:
+            yield time.perf_counter() - start
+        finally:
+            self._local.depth = 0
+            os.close(fd)  # cerrar el fd libera el flock
+
+    def _acquire(self, start: float) -> int:
+        import fcntl
+
+        self.slots_dir.mkdir(parents=True, exist_ok=True)
+        delay = self.poll
+        while True:
+            for i in range(self.max_jobs):
+                # 0o666: el directorio puede ser compartido entre usuarios (sujeto a umask).
+                fd = os.open(self.slots_dir / f"slot-{i}.lock", os.O_RDWR | os.O_CREAT, 0o666)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    os.close(fd)
+            if self.timeout is not None and time.perf_counter() - start >= self.timeout:
+                raise TimeoutError(
+                    f"Sin slot libre tras {self.timeout:g}s ({self.max_jobs} jobs pesados en curso; ver {self.slots_dir})."
+                )
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
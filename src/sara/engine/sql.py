@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+
+def quote_ident(name: str) -> str:
+    """Quotea un identificador SQL ("col", con comillas internas escapadas)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_literal(value: str) -> str:
+    """Literal de texto SQL ('...', con comillas simples escapadas)."""
+    return "'" + value.replace("'", "''") + "'"
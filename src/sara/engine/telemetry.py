@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+import duckdb
+
+# Métricas del profiler de DuckDB -> nombre en Operation/Run.metrics.
+# (ROWS_RETURNED queda afuera: en DuckDB 1.5 rompe el JSON del profiler.)
+_PROFILER_METRICS = {
+    "LATENCY": "query_seconds",
+    "CPU_TIME": "cpu_seconds",
+    "CUMULATIVE_ROWS_SCANNED": "rows_scanned",
+    "TOTAL_BYTES_READ": "bytes_read",
+    "SYSTEM_PEAK_BUFFER_MEMORY": "peak_memory_bytes",
+}
+
+# Métricas por operador: solo con profile=True (árbol tipo EXPLAIN ANALYZE).
+_OPERATOR_METRICS = ("OPERATOR_NAME", "OPERATOR_TYPE", "OPERATOR_TIMING", "OPERATOR_CARDINALITY")
+
+# Se combinan con max (picos), no sumando.
+_PEAK_METRICS = ("peak_memory_bytes",)
+
+
+def output_bytes(path: Path) -> int:
+    """Bytes en disco de lo escrito (archivo o directorio de Parquet)."""
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return 0
+
+
+class Telemetry:
+    """
+    Colector de métricas por hilo para las llamadas al engine.
+
+    Uso (lo hace el Orchestrator alrededor de cada operación):
+
+        with engine.track(profile=False) as metrics:
+            engine.apply_steps(...)
+        metrics  # {"query_seconds": ..., "rows_scanned": ..., ...}
+
+    - Las métricas salen del profiler de DuckDB (enable_profiling = 'no_output'):
+      sin queries extra ni EXPLAIN ANALYZE aparte. Se toma el último
+      statement de cada conexión (el COPY / SELECT principal de la llamada)
+      y se suman entre conexiones.
+    - profile=True guarda además el árbol de operadores (JSON del profiler,
+      lo mismo que EXPLAIN ANALYZE) en metrics["profile"].
+    - Fuera de track() el profiler no se activa: costo cero.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    @property
+    def current(self) -> Dict[str, Any] | None:
+        return getattr(self._local, "metrics", None)
+
+    @contextmanager
+    def track(self, profile: bool = False) -> Iterator[Dict[str, Any]]:
+        previous = self.current, getattr(self._local, "profile", False)
+        metrics: Dict[str, Any] = {}
+        self._local.metrics, self._local.profile = metrics, profile
+        try:
+            yield metrics
+        finally:
+            self._local.metrics, self._local.profile = previous
+
+    def add(self, **values: Any) -> None:
+        """Acumula valores en el colector activo (no-op si no hay)."""
+        metrics = self.current
+        if metrics is None:
+            return
+        for key, value in values.items():
+            if value is None:
+                continue
+            if key in _PEAK_METRICS:
+                metrics[key] = max(metrics.get(key, 0), value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                metrics[key] = metrics.get(key, 0) + value
+            else:
+                metrics[key] = value
+
+    @contextmanager
+    def profiling(self, con: duckdb.DuckDBPyConnection) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Activa el profiler en `con` mientras dure el bloque (si hay colector)."""
+        if self.current is None or not self._enable(con):
+            yield con
+            return
+        try:
+            yield con
+            self._harvest(con)
+        finally:
+            # Cursores del pool se reutilizan: no dejar el profiler prendido.
+            con.execute("PRAGMA disable_profiling")
+
+    def _enable(self, con: duckdb.DuckDBPyConnection) -> bool:
+        names = list(_PROFILER_METRICS)
+        if getattr(self._local, "profile", False):
+            names += _OPERATOR_METRICS
+        try:
+            con.execute("SET enable_profiling = 'no_output'")
+            settings = json.dumps({n: "true" for n in names})
+            con.execute(f"SET custom_profiling_settings = '{settings}'")
+        except duckdb.Error:
+            # DuckDB viejo (métricas con otros nombres): profiler con defaults.
+            try:
+                con.execute("SET enable_profiling = 'no_output'")
+            except duckdb.Error:
+                return False
+        return hasattr(con, "get_profiling_information")
+
+    def _harvest(self, con: duckdb.DuckDBPyConnection) -> None:
+        try:
+            info = json.loads(con.get_profiling_information(format="json"))
+        except (duckdb.Error, TypeError, ValueError):
+            return
+        values = {ours: info.get(name.lower()) for name, ours in _PROFILER_METRICS.items()}
+        self.add(statements=1, **values)
+        if getattr(self._local, "profile", False):
+            self.current.setdefault("profile", []).append(info)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Sequence
+
+from .sql import quote_ident
+
+# Codecs de COPY ... (FORMAT PARQUET, COMPRESSION ...) en DuckDB.
+CODECS = ("zstd", "snappy", "gzip", "lz4", "brotli", "uncompressed")
+
+
+@dataclass(frozen=True)
+class WritePolicy:
+    """
+    Cómo se escriben los Parquet de un dataset (Dataset.write_policy).
+
+    - codec / level: compresión (None = default de DuckDB, snappy). level
+      solo aplica a zstd (1-22; más alto = más chico y más lento al escribir).
+    - row_group_size: filas por row group (None = default, ~122k). Row
+      groups más chicos = más granularidad para saltear con min/max.
+    - sort_by: claves de clustering. Cada versión se escribe ORDENADA por
+      estas columnas: cada row group cubre un rango angosto de valores y los
+      filtros típicos (provincia = ..., anio BETWEEN ...) descartan casi
+      todos los row groups por estadísticas min/max sin leerlos.
+
+    Importante: ordenar es un sort completo al escribir (spillea a disco si
+    no entra en memoria; ver duckdb_temp_directory). Se paga una vez por
+    versión y lo recuperan todas las consultas filtradas.
+    """
+
+    codec: str | None = None
+    level: int | None = None
+    row_group_size: int | None = None
+    sort_by: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if self.codec is not None and self.codec not in CODECS:
+            raise ValueError(f"Codec desconocido: {self.codec!r} (válidos: {', '.join(CODECS)})")
+        if self.level is not None:
+            if self.codec != "zstd":
+                raise ValueError("level solo aplica al codec zstd.")
+            if not 1 <= self.level <= 22:
+                raise ValueError(f"level de zstd fuera de [1, 22]: {self.level}")
+        if self.row_group_size is not None and self.row_group_size < 1:
+            raise ValueError(f"row_group_size debe ser >= 1 (recibido: {self.row_group_size}).")
+        if len(set(self.sort_by)) != len(self.sort_by):
+            raise ValueError(f"Columnas de orden repetidas: {list(self.sort_by)}")
+
+    # ---------------------------
+    # Metadata (JSON-able)
+    # ---------------------------
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any] | None) -> "WritePolicy":
+        data = dict(data or {})
+        data["sort_by"] = tuple(data.get("sort_by") or ())
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Solo lo que difiere del default (política vacía = {})."""
+        data: Dict[str, Any] = {}
+        if self.codec is not None:
+            data["codec"] = self.codec
+        if self.level is not None:
+            data["level"] = self.level
+        if self.row_group_size is not None:
+            data["row_group_size"] = self.row_group_size
+        if self.sort_by:
+            data["sort_by"] = list(self.sort_by)
+        return data
+
+    # ---------------------------
+    # SQL
+    # ---------------------------
+
+    def copy_options(self) -> list[str]:
+        """Opciones de COPY ... TO (FORMAT PARQUET, ...) de esta política."""
+        options = []
+        if self.codec is not None:
+            options.append(f"COMPRESSION {self.codec}")
+        if self.level is not None:
+            options.append(f"COMPRESSION_LEVEL {int(self.level)}")
+        if self.row_group_size is not None:
+            options.append(f"ROW_GROUP_SIZE {int(self.row_group_size)}")
+        return options
+
+    def order_by(self, columns: Sequence[str]) -> str:
+        """
+        Cláusula ORDER BY para una salida con `columns`.
+
+        Las claves que la salida no tiene (p. ej. un select que las
+        descartó) se saltean: la política es del dataset, no de cada versión.
+        """
+        keys = [quote_ident(c) for c in self.sort_by if c in columns]
+        return f" ORDER BY {', '.join(keys)}" if keys else ""
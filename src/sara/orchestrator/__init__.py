@@ -1,5 +1,6 @@
 """High-level orchestration layer for CLI/API."""
 
+from .pipeline import Pipeline
 from .service import Orchestrator
 
-__all__ = ["Orchestrator"]
+__all__ = ["Orchestrator", "Pipeline"]
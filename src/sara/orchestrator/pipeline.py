@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Sequence
+
+from sara.core import DatasetVersion
+from sara.engine.duck import RecodeMapping, TransformStep
+
+if TYPE_CHECKING:
+    from .service import Orchestrator
+
+
+class Pipeline:
+    """
+    Cadena lazy de transformaciones sobre una versión.
+
+    Los métodos (filter/select/winsorize/recode) solo ACUMULAN pasos; nada se lee ni
+    se escribe hasta `materialize(out_version)`, que:
+      - compila todos los pasos en un único plan DuckDB (CTEs),
+      - escribe un solo parquet para la versión final,
+      - registra una Operation por paso (reproducibilidad intacta).
+
+    Uso:
+
+        v5 = (
+            orc.pipeline(v1)
+            .filter("edad >= 18")
+            .winsorize(columns=["ingreso", "gasto"], p_low=0.01, p_high=0.99)
+            .recode({"sexo": {"M": 1, "F": 0}, "ocupacion": "maps/ciuo.csv"})
+            .materialize("v5")
+        )
+    """
+
+    def __init__(self, orchestrator: "Orchestrator", dataset_version: DatasetVersion) -> None:
+        self._orc = orchestrator
+        self.source = dataset_version
+        self._steps: list[TransformStep] = []
+
+    @property
+    def steps(self) -> tuple[TransformStep, ...]:
+        return tuple(self._steps)
+
+    def _add(self, kind: str, params: Dict[str, Any]) -> "Pipeline":
+        self._steps.append(TransformStep(kind, params))
+        return self
+
+    def filter(self, where: str) -> "Pipeline":
+        return self._add("filter", {"where": where})
+
+    def select(self, columns: str | Sequence[str]) -> "Pipeline":
+        return self._add("select", {"columns": [columns] if isinstance(columns, str) else list(columns)})
+
+    def winsorize(
+        self,
+        columns: str | Sequence[str],
+        p_low: float = 0.01,
+        p_high: float = 0.99,
+        out_columns: Sequence[str | None] | None = None,
+        group_by: Sequence[str] | None = None,
+        approx: bool = False,
+    ) -> "Pipeline":
+        return self._add(
+            "winsorize",
+            {
+                "columns": [columns] if isinstance(columns, str) else list(columns),
+                "p_low": p_low,
+                "p_high": p_high,
+                "out_columns": list(out_columns) if out_columns else None,
+                "group_by": list(group_by) if group_by else None,
+                "approx": approx,
+            },
+        )
+
+    def recode(
+        self,
+        mappings: Dict[str, RecodeMapping],
+        out_columns: Dict[str, str] | None = None,
+    ) -> "Pipeline":
+        # Paths como str: los params terminan serializados en la Operation.
+        mappings = {col: str(m) if isinstance(m, Path) else m for col, m in mappings.items()}
+        return self._add("recode", {"mappings": mappings, "out_columns": out_columns or None})
+
+    def materialize(self, out_version: str) -> DatasetVersion:
+        """Ejecuta la cadena completa y registra la versión final."""
+        return self._orc.apply_steps(self.source, self._steps, out_version=out_version)
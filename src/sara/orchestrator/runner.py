@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+from sara.core import DatasetVersion
+
+if TYPE_CHECKING:
+    from .service import Orchestrator
+
+
+# ---------------------------
+# Spec
+# ---------------------------
+
+# Ops que producen una versión nueva (`dataset:version`).
+PRODUCING_OPS = ("import_csv", "import_xlsx", "append", "filter", "select", "winsorize", "recode", "pipeline")
+# Ops de estadística: leen una versión y devuelven un valor.
+STATS_OPS = ("mean", "describe", "ols", "bootstrap")
+
+
+@dataclass
+class SpecStep:
+    """
+    Un paso de la spec.
+
+    - op: una de PRODUCING_OPS o STATS_OPS.
+    - input: "dataset:version" que lee (no aplica a imports).
+    - dataset/version: versión que produce (imports: dataset obligatorio;
+      transforms: dataset por defecto = el del input).
+    - params: argumentos del método correspondiente del Orchestrator.
+    """
+
+    id: str
+    op: str
+    input: str | None = None
+    dataset: str | None = None
+    version: str | None = None
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def output(self) -> str | None:
+        if self.op not in PRODUCING_OPS:
+            return None
+        dataset = self.dataset or (self.input.split(":", 1)[0] if self.input else None)
+        return f"{dataset}:{self.version}"
+
+
+@dataclass
+class StepResult:
+    step_id: str
+    status: str  # "ok" | "exists" | "failed" | "blocked"
+    output: str | None = None
+    value: Any = None
+    error: str | None = None
+    seconds: float = 0.0
+
+
+def load_spec(path: Path) -> Dict[str, Any]:
+    """Lee una spec JSON o YAML (YAML requiere PyYAML instalado)."""
+    path = Path(path)
+    if not path.is_file():
+        raise FileNotFoundError(f"Spec no encontrada: {path}")
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as exc:  # pragma: no cover - depende del entorno
+            raise RuntimeError("Specs YAML requieren PyYAML (pip install pyyaml); o usar JSON.") from exc
+        return yaml.safe_load(text) or {}
+    return json.loads(text)
+
+
+def parse_steps(spec: Dict[str, Any]) -> List[SpecStep]:
+    steps: List[SpecStep] = []
+    seen: set[str] = set()
+    for i, raw in enumerate(spec.get("steps", [])):
+        step = SpecStep(
+            id=str(raw.get("id") or f"step{i + 1}"),
+            op=raw["op"],
+            input=raw.get("input"),
+            dataset=raw.get("dataset"),
+            version=raw.get("version"),
+            params=dict(raw.get("params") or {}),
+        )
+        if step.id in seen:
+            raise ValueError(f"Id de paso duplicado en la spec: {step.id!r}")
+        if step.op not in PRODUCING_OPS + STATS_OPS:
+            raise ValueError(f"Paso {step.id!r}: op desconocida {step.op!r}")
+        if step.op in PRODUCING_OPS and not step.version:
+            raise ValueError(f"Paso {step.id!r}: falta 'version' de salida.")
+        if step.op.startswith("import_") and not step.dataset:
+            raise ValueError(f"Paso {step.id!r}: los imports requieren 'dataset'.")
+        if not step.op.startswith("import_") and not step.input:
+            raise ValueError(f"Paso {step.id!r}: falta 'input' (dataset:version).")
+        seen.add(step.id)
+        steps.append(step)
+    return steps
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+
+
+class SpecRunner:
+    """
+    Ejecuta una spec como DAG sobre DatasetVersions.
+
+    - Dependencias: un paso depende del que produce su `input`.
+    - Ramas independientes corren en paralelo (ThreadPoolExecutor) con
+      límite `max_workers`; el trabajo pesado lo hace DuckDB, que libera el GIL.
+    - Pasos cuya versión de salida ya existe (en el repositorio o en disco,
+      ver _exists) se saltean (status "exists"), así un rebuild nocturno solo
+      recalcula lo que falta.
+    - Si un paso falla, sus descendientes quedan "blocked"; las demás ramas siguen.
+    """
+
+    def __init__(self, orchestrator: "Orchestrator", max_workers: int = 4, base_dir: Path | None = None) -> None:
+        if max_workers < 1:
+            raise ValueError(f"max_workers debe ser >= 1 (recibido: {max_workers}).")
+        self.orc = orchestrator
+        self.max_workers = max_workers
+        # Paths relativos de la spec (CSV/XLSX) se resuelven desde acá.
+        self.base_dir = Path(base_dir) if base_dir is not None else Path.cwd()
+        self._lock = threading.Lock()
+
+    def run(self, steps: List[SpecStep]) -> List[StepResult]:
+        deps = self._dependencies(steps)
+        by_id = {s.id: s for s in steps}
+        dependents: Dict[str, List[str]] = {s.id: [] for s in steps}
+        pending = {s.id: len(deps[s.id]) for s in steps}
+        for sid, parents in deps.items():
+            for parent in parents:
+                dependents[parent].append(sid)
+
+        results: Dict[str, StepResult] = {}
+
+        def block(sid: str, reason: str) -> None:
+            for child in dependents[sid]:
+                if child not in results:
+                    results[child] = StepResult(child, "blocked", by_id[child].output, error=reason)
+                    block(child, reason)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sara-run") as pool:
+            running: Dict[Future, str] = {}
+
+            def submit_ready() -> None:
+                for sid, count in pending.items():
+                    if count == 0 and sid not in results and sid not in running.values():
+                        running[pool.submit(self._execute, by_id[sid])] = sid
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    sid = running.pop(fut)
+                    result = fut.result()
+                    results[sid] = result
+                    if result.status == "failed":
+                        block(sid, f"depende de {sid!r}, que falló")
+                    for child in dependents[sid]:
+                        pending[child] -= 1
+                submit_ready()
+
+        return [results[s.id] for s in steps]
+
+    def _dependencies(self, steps: List[SpecStep]) -> Dict[str, List[str]]:
+        producers: Dict[str, str] = {}
+        for step in steps:
+            if step.output is not None:
+                if step.output in producers:
+                    raise ValueError(f"La versión {step.output} la producen dos pasos: {producers[step.output]!r} y {step.id!r}")
+                producers[step.output] = step.id
+
+        deps = {s.id: [producers[s.input]] if s.input in producers else [] for s in steps}
+
+        # Detección de ciclos (Kahn): una spec circular nunca terminaría.
+        indegree = {sid: len(parents) for sid, parents in deps.items()}
+        queue = [sid for sid, n in indegree.items() if n == 0]
+        visited = 0
+        while queue:
+            sid = queue.pop()
+            visited += 1
+            for other, parents in deps.items():
+                if sid in parents:
+                    indegree[other] -= 1
+                    if indegree[other] == 0:
+                        queue.append(other)
+        if visited != len(steps):
+            raise ValueError("La spec tiene dependencias circulares.")
+        return deps
+
+    # ---------------------------
+    # Ejecución de un paso
+    # ---------------------------
+
+    def _execute(self, step: SpecStep) -> StepResult:
+        start = time.perf_counter()
+        try:
+            if step.output is not None and self._exists(step.output):
+                return StepResult(step.id, "exists", step.output, seconds=time.perf_counter() - start)
+            value = _OPS[step.op](self, step)
+            output = step.output
+            if isinstance(value, DatasetVersion):
+                output, value = f"{value.dataset_id}:{value.version}", None
+            return StepResult(step.id, "ok", output, value=value, seconds=time.perf_counter() - start)
+        except Exception as exc:  # noqa: BLE001 - se reporta por paso
+            return StepResult(step.id, "failed", step.output, error=str(exc), seconds=time.perf_counter() - start)
+
+    def _exists(self, ref: str) -> bool:
+        # Catálogo primero; si no la tiene (repositorio en memoria, cada
+        # `sara run` arranca vacío), se busca en disco y se registra, así
+        # los pasos que la leen la encuentran sin reescribirla.
+        dataset_id, version = ref.split(":", 1)
+        try:
+            self.orc.get_version(dataset_id, version)
+            return True
+        except KeyError:
+            pass
+        if self.orc.layout.existing_version_path(dataset_id, version) is None:
+            return False
+        self._ensure_dataset(dataset_id)
+        return self.orc.adopt_version(dataset_id, version) is not None
+
+    def _input(self, step: SpecStep) -> DatasetVersion:
+        dataset_id, version = step.input.split(":", 1)
+        return self.orc.get_version(dataset_id, version)
+
+    def _resolve(self, raw: Any) -> Any:
+        if isinstance(raw, list):
+            return [self._resolve(r) for r in raw]
+        path = Path(raw)
+        return str(path if path.is_absolute() else self.base_dir / path)
+
+    def _resolve_mappings(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Mappings de recode: los que son archivo (.csv/.parquet/.json) se
+        # resuelven como cualquier path; los dict inline quedan como están.
+        mappings = params.get("mappings")
+        if not isinstance(mappings, dict):
+            return params
+        resolved = {
+            col: self._resolve(m) if isinstance(m, str) and Path(m).suffix.lower() in _MAPPING_SUFFIXES else m
+            for col, m in mappings.items()
+        }
+        return {**params, "mappings": resolved}
+
+    def _ensure_dataset(self, dataset_id: str) -> None:
+        # Dos imports del mismo dataset en paralelo no deben competir al crearlo.
+        with self._lock:
+            try:
+                self.orc.get_dataset(dataset_id)
+            except KeyError:
+                self.orc.create_dataset(dataset_id=dataset_id, name=dataset_id)
+
+    def _import_csv(self, step: SpecStep) -> DatasetVersion:
+        params = dict(step.params)
+        params["csv_path"] = self._resolve(params["csv_path"])
+        self._ensure_dataset(step.dataset)
+        return self.orc.import_csv(dataset_id=step.dataset, version=step.version, **params)
+
+    def _import_xlsx(self, step: SpecStep) -> DatasetVersion:
+        params = dict(step.params)
+        params["xlsx_path"] = Path(self._resolve(params["xlsx_path"]))
+        params.setdefault("sheet", None)
+        self._ensure_dataset(step.dataset)
+        return self.orc.import_xlsx(dataset_id=step.dataset, version=step.version, **params)
+
+    def _append(self, step: SpecStep) -> DatasetVersion:
+        params = dict(step.params)
+        params["csv_path"] = self._resolve(params["csv_path"])
+        return self.orc.append(self._input(step), out_version=step.version, **params)
+
+    def _view_or_transform(self, step: SpecStep) -> DatasetVersion:
+        # filter/select aceptan `virtual: true` (versión sin Parquet propio).
+        return getattr(self.orc, step.op)(self._input(step), out_version=step.version, **step.params)
+
+    def _transform(self, step: SpecStep) -> DatasetVersion:
+        pipe = self.orc.pipeline(self._input(step))
+        params = self._resolve_mappings(step.params) if step.op == "recode" else step.params
+        getattr(pipe, step.op)(**params)
+        return pipe.materialize(step.version)
+
+    def _pipeline(self, step: SpecStep) -> DatasetVersion:
+        pipe = self.orc.pipeline(self._input(step))
+        for sub in step.params.get("steps", []):
+            sub = dict(sub)
+            kind = sub.pop("op")
+            if kind not in ("filter", "select", "winsorize", "recode"):
+                raise ValueError(f"Paso {step.id!r}: transformación desconocida en pipeline: {kind!r}")
+            if kind == "recode":
+                sub = self._resolve_mappings(sub)
+            getattr(pipe, kind)(**sub)
+        return pipe.materialize(step.version)
+
+    def _stats(self, step: SpecStep) -> Any:
+        return getattr(self.orc, step.op)(self._input(step), **step.params)
+
+
+# Mappings de recode que son archivos (ver DuckDBEngine._load_mapping).
+_MAPPING_SUFFIXES = (".csv", ".parquet", ".json")
+
+
+_OPS: Dict[str, Callable[[SpecRunner, SpecStep], Any]] = {
+    "import_csv": SpecRunner._import_csv,
+    "import_xlsx": SpecRunner._import_xlsx,
+    "append": SpecRunner._append,
+    "filter": SpecRunner._view_or_transform,
+    "select": SpecRunner._view_or_transform,
+    "winsorize": SpecRunner._transform,
+    "recode": SpecRunner._transform,
+    "pipeline": SpecRunner._pipeline,
+    "mean": SpecRunner._stats,
+    "describe": SpecRunner._stats,
+    "ols": SpecRunner._stats,
+    "bootstrap": SpecRunner._stats,
+}
@@ -1,13 +1,36 @@
 from __future__ import annotations
 
+import json
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
-from typing import Any, Dict
-
-from sara.config.settings import SARASettings
-from sara.core import Dataset, DatasetVersion
-from sara.engine.duckdb_engine import DuckDBEngine
-from sara.storage.layout import StorageLayout
+from typing import Any, Dict, Iterator, Sequence
+
+from sara.config.setting import SARASettings
+from sara.core import Dataset, DatasetVersion, Operation, Run
+from sara.engine.cache import ResultCache
+from sara.engine.duck import CsvSource, DuckDBEngine, RecodeMapping, TransformStep
+from sara.engine.resources import AdmissionControl, Resources
+from sara.engine.write_policy import WritePolicy
+from sara.storage.layaout import StorageLayout
+from sara.storage.manifest import is_virtual, virtual_depth
 from sara.storage.repository import DatasetRepository
+from sara.storage.sqlite_repository import SQLiteDatasetRepository
+
+from .pipeline import Pipeline
+from .runner import SpecRunner, StepResult, load_spec, parse_steps
+
+
+def _stringify_params(params: Dict[str, Any]) -> Dict[str, str]:
+    """Operation.params es Dict[str, str]: serializamos lo que no sea texto (None se omite)."""
+    return {
+        k: v if isinstance(v, str) else json.dumps(v, sort_keys=True)
+        for k, v in params.items()
+        if v is not None
+    }
 
 
 class Orchestrator:
@@ -31,13 +54,96 @@ class Orchestrator:
         self.settings = settings or SARASettings()
 
         # Layout: dueño del filesystem layout
-        self.layout = layout or StorageLayout(data_dir=self.settings.data_dir)
+        if self.settings.storage_layout not in ("directory", "content"):
+            raise ValueError(f"storage_layout desconocido: {self.settings.storage_layout!r}")
+        self.layout = layout or StorageLayout(
+            data_dir=self.settings.data_dir,
+            content_addressed=self.settings.storage_layout == "content",
+        )
+
+        # Repository: memory o catálogo persistente, según settings.
+        # Igual que el engine: si viene inyectado, lo cierra el caller.
+        self._owns_repository = repository is None
+        self.repository = repository or self._build_repository()
+
+        # Engine: usa settings para DB duckdb (en memoria o archivo) y pool.
+        # Si el engine viene inyectado, su ciclo de vida es del caller.
+        self._owns_engine = engine is None
+        self.engine = engine or DuckDBEngine(
+            database=self.settings.duckdb_database,
+            pool_size=self.settings.duckdb_pool_size,
+            cache=self._build_cache(),
+            resources=self._build_resources(),
+            admission=self._build_admission(),
+        )
+
+    # ---------------------------
+    # Ciclo de vida
+    # ---------------------------
 
-        # Repository (por ahora in-memory)
-        self.repository = repository or DatasetRepository()
+    def _build_resources(self) -> Resources:
+        # Paths absolutos: `sara serve` corre cada comando con el cwd del cliente.
+        temp_dir = self.settings.duckdb_temp_directory or self.layout.temp_dir()
+        return Resources(
+            threads=self.settings.duckdb_threads,
+            memory_limit=self.settings.duckdb_memory_limit,
+            temp_directory=str(Path(temp_dir).resolve()),
+        )
 
-        # Engine: usa settings para DB duckdb (en memoria o archivo)
-        self.engine = engine or DuckDBEngine(database=self.settings.duckdb_database)
+    def _build_admission(self) -> AdmissionControl | None:
+        if self.settings.max_concurrent_jobs <= 0:
+            return None
+        slots_dir = self.settings.admission_dir or self.layout.slots_dir()
+        return AdmissionControl(
+            Path(slots_dir).resolve(),
+            max_jobs=self.settings.max_concurrent_jobs,
+            timeout=self.settings.admission_timeout,
+        )
+
+    def _build_repository(self) -> DatasetRepository | SQLiteDatasetRepository:
+        backend = self.settings.repository_backend
+        if backend == "memory":
+            return DatasetRepository()
+        if backend == "sqlite":
+            return SQLiteDatasetRepository(self.settings.catalog_path or self.layout.catalog_path())
+        # "postgres" también cae acá: no hay PostgresDatasetRepository todavía.
+        raise ValueError(f"repository_backend desconocido: {backend!r} (válidos: memory, sqlite)")
+
+    def _build_cache(self) -> ResultCache | None:
+        """Caché de stats según settings (LRU + store en data_dir/cache)."""
+        if self.settings.result_cache_entries <= 0:
+            return None
+        directory = self.layout.cache_dir() if self.settings.result_cache_max_bytes > 0 else None
+        return ResultCache(
+            max_entries=self.settings.result_cache_entries,
+            directory=directory,
+            max_bytes=self.settings.result_cache_max_bytes,
+        )
+
+    def cache_stats(self) -> Dict[str, int] | None:
+        """Contadores hit/miss del caché de resultados (None si está apagado)."""
+        return self.engine.cache.stats() if self.engine.cache is not None else None
+
+    def close(self) -> None:
+        """
+        Libera recursos del engine (pool de conexiones DuckDB) y del catálogo.
+
+        Uso típico en lotes:
+
+            with Orchestrator(settings=SARASettings(duckdb_pool_size=4)) as orc:
+                for col in cols:
+                    orc.mean(dv, column=col)
+        """
+        if self._owns_engine:
+            self.engine.close()
+        if self._owns_repository:
+            self.repository.close()
+
+    def __enter__(self) -> "Orchestrator":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     # ---------------------------
     # Dataset ops
@@ -56,6 +162,28 @@ class Orchestrator:
     # Version ops (nuevo: encapsula acceso a repository)
     # ---------------------------
 
+    def set_write_policy(
+        self,
+        dataset_id: str,
+        codec: str | None = None,
+        level: int | None = None,
+        row_group_size: int | None = None,
+        sort_by: Sequence[str] | None = None,
+    ) -> Dataset:
+        """
+        Fija cómo se escriben las PRÓXIMAS versiones del dataset (ver WritePolicy).
+
+        Reemplaza la política entera (sin argumentos = volver a los defaults).
+        Las versiones ya escritas no cambian: son inmutables.
+        """
+        policy = WritePolicy(codec=codec, level=level, row_group_size=row_group_size, sort_by=tuple(sort_by or ()))
+        dataset = replace(self.repository.get_dataset(dataset_id), write_policy=policy.to_dict() or None)
+        return self.repository.update_dataset(dataset)
+
+    def write_policy(self, dataset_id: str) -> WritePolicy:
+        """Política de escritura vigente del dataset (KeyError si no existe)."""
+        return WritePolicy.from_dict(self.repository.get_dataset(dataset_id).write_policy)
+
     def get_version(self, dataset_id: str, version: str) -> DatasetVersion:
         """
         Nuevo método para que CLI/API no acceda a `orc.repository` directamente.
@@ -73,127 +201,742 @@ class Orchestrator:
     # Import
     # ---------------------------
 
-    def import_csv(self, dataset_id: str, csv_path: Path, version: str = "v1") -> DatasetVersion:
-        _ = self.repository.get_dataset(dataset_id)  # asegura existencia
-
-        out_path = self.layout.version_path(dataset_id, version)
-        out_path = self.engine.import_csv(csv_path=csv_path, out_path=out_path)
+    def import_csv(
+        self,
+        dataset_id: str,
+        csv_path: CsvSource,
+        version: str = "v1",
+        partition_by: Sequence[str] | None = None,
+        row_group_size: int | None = None,
+        file_size_bytes: int | str | None = None,
+    ) -> DatasetVersion:
+        """
+        Importa uno o varios CSV (archivo, directorio, glob o lista).
 
-        version_obj = DatasetVersion(dataset_id=dataset_id, version=version, path=str(out_path))
+        Con partition_by o file_size_bytes la versión es un directorio
+        (StorageLayout.version_data_dir); si no, un único data.parquet.
+        """
+        policy = self.write_policy(dataset_id)  # asegura existencia
+        self._ensure_new_version(dataset_id, version)
+
+        multi_file = bool(partition_by) or file_size_bytes is not None
+        out_path = self.layout.version_target(dataset_id, version, multi_file=multi_file)
+        with self._tracked() as metrics:
+            out_path = self.engine.import_csv(
+                csv_path=csv_path,
+                out_path=out_path,
+                partition_by=partition_by,
+                row_group_size=row_group_size,
+                file_size_bytes=file_size_bytes,
+                write_policy=policy,
+            )
+            out_path = self.layout.commit_version(dataset_id, version, out_path)
+
+        operation_id = uuid.uuid4().hex
+        version_obj = DatasetVersion(dataset_id=dataset_id, version=version, path=str(out_path), operation_id=operation_id)
 
         # Registro en repo: si falla, intentamos rollback de archivo (best effort)
-        try:
-            self.repository.add_version(version_obj)
-        except Exception:
-            # Best-effort cleanup. Si falla el unlink, no ocultamos el error original.
-            try:
-                out_path.unlink(missing_ok=True)
-            except Exception:
-                pass
-            raise
-
+        self._register_version(version_obj, out_path)
+
+        source = [str(p) for p in csv_path] if isinstance(csv_path, (list, tuple)) else str(csv_path)
+        self.repository.create_operation(
+            operation_id=operation_id,
+            kind="import_csv",
+            params=_stringify_params(
+                {
+                    "output": f"{dataset_id}:{version}",
+                    "csv_path": source,
+                    "partition_by": list(partition_by) if partition_by else None,
+                    "row_group_size": row_group_size,
+                    "file_size_bytes": file_size_bytes,
+                    "write_policy": policy.to_dict() or None,
+                }
+            ),
+            metrics=metrics or None,
+        )
         return version_obj
 
     def import_xlsx(self, dataset_id: str, xlsx_path: Path, sheet: str | None, version: str = "v1") -> DatasetVersion:
-        _ = self.repository.get_dataset(dataset_id)
+        policy = self.write_policy(dataset_id)
+        self._ensure_new_version(dataset_id, version)
 
         out_path = self.layout.version_path(dataset_id, version)
-        out_path = self.engine.import_xlsx(xlsx_path=xlsx_path, out_path=out_path, sheet=sheet)
-
-        version_obj = DatasetVersion(dataset_id=dataset_id, version=version, path=str(out_path))
-        try:
-            self.repository.add_version(version_obj)
-        except Exception:
-            try:
-                out_path.unlink(missing_ok=True)
-            except Exception:
-                pass
-            raise
+        with self._tracked() as metrics:
+            out_path = self.engine.import_xlsx(xlsx_path=xlsx_path, out_path=out_path, sheet=sheet, write_policy=policy)
+            out_path = self.layout.commit_version(dataset_id, version, out_path)
+
+        operation_id = uuid.uuid4().hex
+        version_obj = DatasetVersion(dataset_id=dataset_id, version=version, path=str(out_path), operation_id=operation_id)
+        self._register_version(version_obj, out_path)
+
+        self.repository.create_operation(
+            operation_id=operation_id,
+            kind="import_xlsx",
+            params=_stringify_params(
+                {
+                    "output": f"{dataset_id}:{version}",
+                    "xlsx_path": str(xlsx_path),
+                    "sheet": sheet,
+                    "write_policy": policy.to_dict() or None,
+                }
+            ),
+            metrics=metrics or None,
+        )
+        return version_obj
 
+    def append(
+        self,
+        dataset_version: DatasetVersion,
+        csv_path: CsvSource,
+        out_version: str,
+        partition_by: Sequence[str] | None = None,
+        row_group_size: int | None = None,
+    ) -> DatasetVersion:
+        """
+        Nueva versión = versión padre + filas nuevas (delta), sin reescribir el padre.
+
+        - Solo se escribe el delta (layout.delta_dir); la versión es un
+          manifest con los archivos del padre más los del delta, así que el
+          costo escala con el delta y no con el dataset.
+        - El engine lee la unión de forma transparente (union_by_name: columnas
+          nuevas en el delta quedan NULL en las filas viejas).
+        - Si el padre está particionado (hive), el delta se escribe con las
+          mismas claves: DuckDB no mezcla archivos con y sin particiones.
+        """
+        dataset_id = dataset_version.dataset_id
+        self._ensure_new_version(dataset_id, out_version)
+
+        # Un delta sobre una vista necesita los archivos reales del padre.
+        self.materialize(dataset_version)
+        parent_path = Path(dataset_version.path)
+        parent_files = self.engine.version_files(parent_path)
+        parent_keys = self.engine.partition_columns(parent_path)
+        if partition_by is not None and list(partition_by) != parent_keys:
+            raise ValueError(f"partition_by {list(partition_by)} no coincide con las particiones del padre {parent_keys}.")
+        partition_by = parent_keys or None
+
+        # El delta se ordena solo consigo mismo: el padre no se reescribe.
+        policy = self.write_policy(dataset_id)
+        delta_dir = self.layout.delta_dir(dataset_id, out_version)
+        with self._tracked() as metrics:
+            written = self.engine.import_csv(
+                csv_path=csv_path,
+                out_path=delta_dir if partition_by else delta_dir / "data.parquet",
+                partition_by=partition_by,
+                row_group_size=row_group_size,
+                write_policy=policy,
+            )
+            out_path = self.layout.commit_append(
+                dataset_id,
+                out_version,
+                parent_files,
+                written,
+                parent=f"{dataset_id}:{dataset_version.version}",
+            )
+
+        operation_id = uuid.uuid4().hex
+        version_obj = DatasetVersion(
+            dataset_id=dataset_id,
+            version=out_version,
+            path=str(out_path),
+            operation_id=operation_id,
+            parent_version=dataset_version.version,
+        )
+        # Rollback sobre el directorio de la versión: manifest + delta (los
+        # archivos del padre viven en otro lado y no se tocan).
+        self._register_version(version_obj, self.layout.version_dir(dataset_id, out_version))
+
+        source = [str(p) for p in csv_path] if isinstance(csv_path, (list, tuple)) else str(csv_path)
+        self.repository.create_operation(
+            operation_id=operation_id,
+            kind="append",
+            params=_stringify_params(
+                {
+                    "input": f"{dataset_id}:{dataset_version.version}",
+                    "output": f"{dataset_id}:{out_version}",
+                    "csv_path": source,
+                    "partition_by": partition_by,
+                    "write_policy": policy.to_dict() or None,
+                }
+            ),
+            metrics=metrics or None,
+        )
         return version_obj
 
     # ---------------------------
     # Preview / profile
     # ---------------------------
 
-    def preview(self, dataset_version: DatasetVersion, limit: int = 100):
-        return self.engine.preview(Path(dataset_version.path), limit=limit)
+    def preview(
+        self,
+        dataset_version: DatasetVersion,
+        limit: int = 100,
+        offset: int = 0,
+        columns: Sequence[str] | None = None,
+    ):
+        return self.engine.preview(self._read_path(dataset_version), limit=limit, offset=offset, columns=columns)
+
+    def scan(
+        self,
+        dataset_version: DatasetVersion,
+        columns: Sequence[str] | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+        batch_size: int = 1024,
+    ):
+        """Stream de pyarrow.RecordBatch (ver DuckDBEngine.scan_batches)."""
+        return self.engine.scan_batches(
+            self._read_path(dataset_version),
+            columns=columns,
+            offset=offset,
+            limit=limit,
+            batch_size=batch_size,
+        )
 
     def profile(self, dataset_version: DatasetVersion):
-        return self.engine.profile(Path(dataset_version.path))
+        with self._tracked() as metrics:
+            result = self.engine.profile(self._read_path(dataset_version))
+        self._record_run(dataset_version, "profile", {}, metrics)
+        return result
 
     # ---------------------------
     # Transformaciones
     # ---------------------------
 
-    def filter(self, dataset_version: DatasetVersion, where: str, out_version: str) -> DatasetVersion:
-        out_path = self.layout.version_path(dataset_version.dataset_id, out_version)
+    def pipeline(self, dataset_version: DatasetVersion) -> Pipeline:
+        """Arranca una cadena lazy de transformaciones (ver Pipeline)."""
+        return Pipeline(self, dataset_version)
 
-        out_path = self.engine.filter(
-            Path(dataset_version.path),
-            where=where,
-            out_version_path=out_path,
-        )
-        version_obj = DatasetVersion(dataset_id=dataset_version.dataset_id, version=out_version, path=str(out_path))
+    def apply_steps(
+        self,
+        dataset_version: DatasetVersion,
+        steps: Sequence[TransformStep],
+        out_version: str,
+    ) -> DatasetVersion:
+        """
+        Materializa una cadena de pasos como UNA nueva versión.
 
-        try:
-            self.repository.add_version(version_obj)
-        except Exception:
-            try:
-                out_path.unlink(missing_ok=True)
-            except Exception:
-                pass
-            raise
+        - El engine compila todos los pasos en un solo plan (un scan, un write).
+        - Se registra una Operation por paso, encadenadas vía
+          `previous_operation_id`; la versión resultante apunta a la última.
+        """
+        steps = list(steps)
+        self._ensure_new_version(dataset_version.dataset_id, out_version)
+        out_path = self.layout.version_path(dataset_version.dataset_id, out_version)
+        with self._tracked() as metrics:
+            out_path = self.engine.apply_steps(
+                self._read_path(dataset_version),
+                steps,
+                out_version_path=out_path,
+                write_policy=self.write_policy(dataset_version.dataset_id),
+            )
+            out_path = self.layout.commit_version(dataset_version.dataset_id, out_version, out_path)
+
+        source_ref = f"{dataset_version.dataset_id}:{dataset_version.version}"
+        out_ref = f"{dataset_version.dataset_id}:{out_version}"
+        operation_ids = [uuid.uuid4().hex for _ in steps]
+
+        version_obj = DatasetVersion(
+            dataset_id=dataset_version.dataset_id,
+            version=out_version,
+            path=str(out_path),
+            operation_id=operation_ids[-1],
+            parent_version=dataset_version.version,
+        )
+        self._register_version(version_obj, out_path)
+
+        # Los pasos se ejecutan fusionados en UN query: la telemetría va en la
+        # última Operation; las anteriores apuntan a ella. Para ver el costo
+        # por operador, settings.telemetry_profile guarda el árbol del plan.
+        previous_id = None
+        for i, (operation_id, step) in enumerate(zip(operation_ids, steps), start=1):
+            params = {"input": source_ref, "output": out_ref, "step": str(i)}
+            if previous_id is not None:
+                params["previous_operation_id"] = previous_id
+            params.update(_stringify_params(step.params))
+            if operation_id == operation_ids[-1]:
+                step_metrics = metrics or None
+            else:
+                step_metrics = {"fused_into": operation_ids[-1]} if metrics else None
+            self.repository.create_operation(
+                operation_id=operation_id, kind=step.kind, params=params, metrics=step_metrics
+            )
+            previous_id = operation_id
 
         return version_obj
 
+    def filter(
+        self,
+        dataset_version: DatasetVersion,
+        where: str,
+        out_version: str,
+        virtual: bool = False,
+    ) -> DatasetVersion:
+        """Filtra filas; con virtual=True la versión es una vista (ver create_virtual_version)."""
+        if virtual:
+            return self.create_virtual_version(dataset_version, out_version, where=where)
+        return self.pipeline(dataset_version).filter(where).materialize(out_version)
+
+    def select(
+        self,
+        dataset_version: DatasetVersion,
+        columns: Sequence[str],
+        out_version: str,
+        virtual: bool = False,
+    ) -> DatasetVersion:
+        """Proyección a `columns`; con virtual=True la versión es una vista."""
+        if virtual:
+            return self.create_virtual_version(dataset_version, out_version, columns=columns)
+        return self.pipeline(dataset_version).select(columns).materialize(out_version)
+
     def winsorize(
         self,
         dataset_version: DatasetVersion,
-        column: str,
+        columns: str | Sequence[str],
         p_low: float,
         p_high: float,
-        out_column: str | None,
+        out_columns: Sequence[str | None] | None,
         out_version: str,
+        group_by: Sequence[str] | None = None,
+        approx: bool = False,
     ) -> DatasetVersion:
-        out_path = self.layout.version_path(dataset_version.dataset_id, out_version)
-
-        out_path = self.engine.winsorize(
-            Path(dataset_version.path),
-            column=column,
-            p_low=p_low,
-            p_high=p_high,
-            out_column=out_column,
-            out_version_path=out_path,
+        return (
+            self.pipeline(dataset_version)
+            .winsorize(
+                columns=columns,
+                p_low=p_low,
+                p_high=p_high,
+                out_columns=out_columns,
+                group_by=group_by,
+                approx=approx,
+            )
+            .materialize(out_version)
         )
-        version_obj = DatasetVersion(dataset_id=dataset_version.dataset_id, version=out_version, path=str(out_path))
-        self.repository.add_version(version_obj)
-        return version_obj
 
     def recode(
         self,
         dataset_version: DatasetVersion,
-        column: str,
-        mapping: Dict[str, Any],
-        out_column: str | None,
+        mappings: Dict[str, RecodeMapping],
+        out_columns: Dict[str, str] | None,
         out_version: str,
     ) -> DatasetVersion:
-        out_path = self.layout.version_path(dataset_version.dataset_id, out_version)
+        return self.pipeline(dataset_version).recode(mappings, out_columns=out_columns).materialize(out_version)
+
+    # ---------------------------
+    # Specs (sara run)
+    # ---------------------------
+
+    def run_spec(self, spec_path: Path, max_workers: int | None = None) -> list[StepResult]:
+        """
+        Ejecuta una spec JSON/YAML como DAG (ver SpecRunner).
+
+        Prioridad del límite de concurrencia: argumento > `max_workers` de la
+        spec > settings.run_max_workers. Paths relativos de la spec se
+        resuelven desde el directorio del archivo.
+        """
+        spec_path = Path(spec_path)
+        spec = load_spec(spec_path)
+        steps = parse_steps(spec)
+        workers = max_workers or spec.get("max_workers") or self.settings.run_max_workers
+        runner = SpecRunner(self, max_workers=int(workers), base_dir=spec_path.parent)
+        return runner.run(steps)
+
+    # ---------------------------
+    # Versiones virtuales
+    # ---------------------------
+
+    def create_virtual_version(
+        self,
+        dataset_version: DatasetVersion,
+        out_version: str,
+        where: str | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> DatasetVersion:
+        """
+        Registra una versión SIN escribir datos: padre + where/columns.
+
+        - Se guarda un manifest virtual; el engine la resuelve como vista en
+          cada consulta (ahorra disco y el tiempo de escritura si la versión
+          se usa una vez y se descarta).
+        - Si la cadena virtual supera settings.virtual_max_depth, la versión
+          se materializa en el acto.
+        - Ver materialize() y settings.virtual_materialize_after.
+        """
+        if where is None and not columns:
+            raise ValueError("Una versión virtual necesita where y/o columns.")
+        dataset_id = dataset_version.dataset_id
+        self._ensure_new_version(dataset_id, out_version)
+
+        out_path = self.layout.commit_virtual(
+            dataset_id, out_version, Path(dataset_version.path), where=where, columns=columns
+        )
+        version_dir = self.layout.version_dir(dataset_id, out_version)
+        try:
+            # DESCRIBE valida where/columns sin leer datos.
+            with self._tracked() as metrics:
+                self.engine.columns(out_path)
+        except Exception:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
 
-        out_path = self.engine.recode(
-            Path(dataset_version.path),
-            column=column,
-            mapping=mapping,
-            out_column=out_column,
-            out_version_path=out_path,
+        operation_id = uuid.uuid4().hex
+        version_obj = DatasetVersion(
+            dataset_id=dataset_id,
+            version=out_version,
+            path=str(out_path),
+            operation_id=operation_id,
+            parent_version=dataset_version.version,
         )
-        version_obj = DatasetVersion(dataset_id=dataset_version.dataset_id, version=out_version, path=str(out_path))
-        self.repository.add_version(version_obj)
+        self._register_version(version_obj, version_dir)
+        self.repository.create_operation(
+            operation_id=operation_id,
+            kind="virtual",
+            params=_stringify_params(
+                {
+                    "input": f"{dataset_id}:{dataset_version.version}",
+                    "output": f"{dataset_id}:{out_version}",
+                    "where": where,
+                    "columns": list(columns) if columns else None,
+                }
+            ),
+            metrics=metrics or None,
+        )
+
+        if virtual_depth(out_path) > self.settings.virtual_max_depth:
+            self.materialize(version_obj)
         return version_obj
 
+    def materialize(self, dataset_version: DatasetVersion) -> DatasetVersion:
+        """
+        Escribe a Parquet una versión virtual (no-op si ya es física).
+
+        La versión conserva su identidad y su path (manifest.json): solo
+        cambia el contenido del manifest, de vista a archivos.
+        """
+        path = Path(dataset_version.path)
+        if not is_virtual(path):
+            return dataset_version
+        dataset_id, version = dataset_version.dataset_id, dataset_version.version
+        with self._tracked() as metrics:
+            written = self.engine.materialize(
+                path, self.layout.version_path(dataset_id, version), write_policy=self.write_policy(dataset_id)
+            )
+            self.layout.commit_materialized(dataset_id, version, written)
+        self.layout.query_count_path(dataset_id, version).unlink(missing_ok=True)
+        # Ahora hay archivos propios: filas conocidas, otro tamaño.
+        self.refresh_version_info(dataset_version)
+        self.repository.create_operation(
+            operation_id=uuid.uuid4().hex,
+            kind="materialize",
+            params={"input": f"{dataset_id}:{version}", "output": f"{dataset_id}:{version}"},
+            metrics=metrics or None,
+        )
+        return dataset_version
+
+    def version_info(self, dataset_version: DatasetVersion) -> Dict[str, Any]:
+        """Metadata guardada de la versión (no toca archivos de datos)."""
+        return {
+            "dataset_id": dataset_version.dataset_id,
+            "version": dataset_version.version,
+            "path": dataset_version.path,
+            "parent_version": dataset_version.parent_version,
+            "created_at": dataset_version.created_at,
+            "virtual": is_virtual(Path(dataset_version.path)),
+            "num_rows": dataset_version.num_rows,
+            "num_columns": dataset_version.num_columns,
+            "num_files": dataset_version.num_files,
+            "size_bytes": dataset_version.size_bytes,
+            "schema": dataset_version.schema,
+        }
+
+    def refresh_version_info(self, dataset_version: DatasetVersion) -> DatasetVersion:
+        """Recalcula y guarda la metadata (versiones de catálogos anteriores, materialize)."""
+        self._fill_version_info(dataset_version)
+        return self.repository.update_version(dataset_version)
+
+    def _fill_version_info(self, dataset_version: DatasetVersion) -> None:
+        for key, value in self.engine.version_info(Path(dataset_version.path)).items():
+            setattr(dataset_version, key, value)
+
+    def _check_columns(self, dataset_version: DatasetVersion, *columns: str | Sequence[str] | None) -> None:
+        """
+        Valida nombres contra el esquema guardado (sin abrir Parquet; no-op
+        sin metadata). Acepta "col", ["a", "b"] o None por argumento.
+        """
+        if dataset_version.schema is None:
+            return
+        names = [c for group in columns if group for c in ([group] if isinstance(group, str) else group)]
+        missing = [c for c in names if c not in dataset_version.schema]
+        if missing:
+            raise ValueError(
+                f"Columnas inexistentes en {dataset_version.dataset_id}:{dataset_version.version}: {missing}"
+                f" (disponibles: {', '.join(dataset_version.schema)})"
+            )
+
+    def _read_path(self, dataset_version: DatasetVersion) -> Path:
+        """
+        Path a leer para una consulta.
+
+        Con settings.virtual_materialize_after > 0, cuenta consultas sobre
+        versiones virtuales y materializa la que se consulta seguido.
+        """
+        path = Path(dataset_version.path)
+        threshold = self.settings.virtual_materialize_after
+        if threshold > 0 and is_virtual(path):
+            count = self.layout.bump_query_count(dataset_version.dataset_id, dataset_version.version)
+            if count >= threshold:
+                self.materialize(dataset_version)
+        return path
+
+    def _ensure_new_version(self, dataset_id: str, version: str) -> None:
+        """
+        Falla si `dataset_id:version` ya existe.
+
+        Se chequea ANTES de escribir: el write pisaría los archivos de la
+        versión existente y el rollback de _register_version los borraría.
+        """
+        try:
+            self.repository.get_version(dataset_id, version)
+        except KeyError:
+            return
+        raise ValueError(f"Version '{dataset_id}:{version}' already exists.")
+
+    def adopt_version(self, dataset_id: str, version: str) -> DatasetVersion | None:
+        """
+        Registra en el catálogo una versión que ya está en disco y no en el repo.
+
+        Para re-correr specs sin catálogo persistente (repositorio en memoria):
+        la versión se reconoce por su path en el layout, sin reescribir datos.
+        Devuelve None si no hay nada en disco. El dataset tiene que existir.
+        """
+        path = self.layout.existing_version_path(dataset_id, version)
+        if path is None:
+            return None
+        version_obj = DatasetVersion(dataset_id=dataset_id, version=version, path=str(path))
+        # Sin rollback (a diferencia de _register_version): los archivos no son de esta llamada.
+        self._fill_version_info(version_obj)
+        return self.repository.add_version(version_obj)
+
+    def _register_version(self, version_obj: DatasetVersion, out_path: Path) -> None:
+        """
+        Registra en repo; si falla, rollback best-effort del archivo escrito.
+
+        Antes de registrar, guarda en la versión su metadata (esquema, filas,
+        tamaño; ver DuckDBEngine.version_info): se calcula una vez, acá, y
+        después `version info`, los listados y la validación de columnas no
+        abren datos.
+        """
+        try:
+            self._fill_version_info(version_obj)
+            self.repository.add_version(version_obj)
+        except Exception:
+            # Best-effort cleanup. Si falla el borrado, no ocultamos el error original.
+            try:
+                if out_path.is_dir():
+                    shutil.rmtree(out_path)
+                else:
+                    out_path.unlink(missing_ok=True)
+            except Exception:
+                pass
+            raise
+
     # ---------------------------
     # Stats
     # ---------------------------
 
     def mean(self, dataset_version: DatasetVersion, column: str, where: str | None = None) -> float:
-        return self.engine.mean(Path(dataset_version.path), column=column, where=where)
\ No newline at end of file
+        self._check_columns(dataset_version, column)
+        with self._tracked() as metrics:
+            result = self.engine.mean(self._read_path(dataset_version), column=column, where=where)
+        self._record_run(dataset_version, "mean", {"column": column, "where": where}, metrics)
+        return result
+
+    def describe(
+        self,
+        dataset_version: DatasetVersion,
+        columns: Sequence[str] | None = None,
+        stats: Sequence[str] | None = None,
+        group_by: Sequence[str] | None = None,
+        percentiles: Sequence[float] = (0.25, 0.5, 0.75),
+        where: str | None = None,
+        approx: bool = False,
+    ) -> Dict[str, list]:
+        """Varios estadísticos x varias columnas (x grupos) en un solo scan."""
+        self._check_columns(dataset_version, columns, group_by)
+        with self._tracked() as metrics:
+            result = self.engine.describe(
+                self._read_path(dataset_version),
+                columns=columns,
+                stats=stats,
+                group_by=group_by,
+                percentiles=percentiles,
+                where=where,
+                approx=approx,
+            )
+        params = {
+            "columns": list(columns) if columns else None,
+            "stats": list(stats) if stats else None,
+            "group_by": list(group_by) if group_by else None,
+            "percentiles": list(percentiles),
+            "where": where,
+            "approx": approx,
+        }
+        self._record_run(dataset_version, "describe", params, metrics)
+        return result
+
+    def ols(
+        self,
+        dataset_version: DatasetVersion,
+        y: str,
+        x: Sequence[str],
+        weights: str | None = None,
+        where: str | None = None,
+        add_constant: bool = True,
+        se: str = "classical",
+        cluster: str | Sequence[str] | None = None,
+        fe: str | Sequence[str] | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Regresión lineal OLS/WLS (un scan; ver DuckDBEngine.ols).
+
+        se = "hc0".."hc3" o cluster = "col" / ["c1", "c2"]: errores robustos
+        con un scan extra. fe = "unidad" / ["unidad", "anio"]: efectos fijos
+        de panel absorbidos en DuckDB (sin dummies).
+
+        El resultado queda guardado en el Run (Run.result), con o sin
+        telemetría: `sara runs show <run_id>` lo recupera.
+        """
+        self._check_columns(dataset_version, y, x, weights, cluster, fe)
+        with self._tracked() as metrics:
+            result = self.engine.ols(
+                self._read_path(dataset_version),
+                y=y,
+                x=x,
+                weights=weights,
+                where=where,
+                add_constant=add_constant,
+                se=se,
+                cluster=cluster,
+                fe=fe,
+            )
+        params = {
+            "y": y,
+            "x": list(x),
+            "weights": weights,
+            "where": where,
+            "add_constant": add_constant,
+            "se": se,
+            "cluster": [cluster] if isinstance(cluster, str) else cluster,
+            "fe": [fe] if isinstance(fe, str) else fe,
+        }
+        run = self._record_run(dataset_version, result["method"], params, metrics, result=result)
+        return {**result, "run_id": run.run_id} if run else result
+
+    def bootstrap(
+        self,
+        dataset_version: DatasetVersion,
+        stat: str = "mean",
+        replicates: int = 1000,
+        seed: int = 0,
+        level: float = 0.95,
+        batch_size: int | None = None,
+        workers: int | None = None,
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """
+        Bootstrap de `mean` u `ols` (ver DuckDBEngine.bootstrap).
+
+        params son los del estadístico: column/where para mean; y, x,
+        weights, where, add_constant para ols. batch_size / workers por
+        defecto salen de settings (bootstrap_batch_size / bootstrap_workers).
+
+        Como ols, el resultado (estimaciones + réplicas) queda en el Run.
+        """
+        self._check_columns(dataset_version, *(params.get(k) for k in ("column", "y", "x", "weights")))
+        batch_size = batch_size or self.settings.bootstrap_batch_size
+        workers = self.settings.bootstrap_workers if workers is None else workers
+        with self._tracked() as metrics:
+            result = self.engine.bootstrap(
+                self._read_path(dataset_version),
+                stat=stat,
+                replicates=replicates,
+                seed=seed,
+                level=level,
+                batch_size=batch_size,
+                workers=workers,
+                **params,
+            )
+        run_params = {
+            "stat": stat,
+            "replicates": replicates,
+            "seed": seed,
+            "level": level,
+            "batch_size": batch_size,
+            "workers": result["workers"],
+            **params,
+        }
+        run = self._record_run(dataset_version, f"bootstrap_{stat}", run_params, metrics, result=result)
+        return {**result, "run_id": run.run_id} if run else result
+
+    # ---------------------------
+    # Telemetría
+    # ---------------------------
+
+    @contextmanager
+    def _tracked(self) -> Iterator[Dict[str, Any]]:
+        """
+        Métricas de las llamadas al engine dentro del bloque (+ tiempo de pared).
+
+        Con settings.telemetry = False devuelve un dict vacío y no activa
+        el profiler.
+        """
+        if not self.settings.telemetry:
+            yield {}
+            return
+        start = time.perf_counter()
+        with self.engine.track(profile=self.settings.telemetry_profile) as metrics:
+            yield metrics
+        metrics["seconds"] = time.perf_counter() - start
+
+    def _record_run(
+        self,
+        dataset_version: DatasetVersion,
+        method: str,
+        params: Dict[str, Any],
+        metrics: Dict[str, Any],
+        result: Dict[str, Any] | None = None,
+    ) -> Run | None:
+        """
+        Registra un Run de stats con su telemetría (si está activa).
+
+        Con `result` el Run se registra siempre: es el resultado del método,
+        no solo telemetría.
+        """
+        if not self.settings.telemetry and result is None:
+            return None
+        return self.repository.create_run(
+            run_id=uuid.uuid4().hex,
+            dataset_version=f"{dataset_version.dataset_id}:{dataset_version.version}",
+            method=method,
+            params=_stringify_params(params),
+            metrics=metrics or None,
+            result=result,
+        )
+
+    def list_operations(self, kind: str | None = None, limit: int | None = None) -> list[Operation]:
+        return list(self.repository.list_operations(kind=kind, limit=limit))
+
+    def get_operation(self, operation_id: str) -> Operation:
+        return self.repository.get_operation(operation_id)
+
+    def list_runs(
+        self,
+        dataset_version: DatasetVersion | None = None,
+        method: str | None = None,
+        limit: int | None = None,
+    ) -> list[Run]:
+        ref = f"{dataset_version.dataset_id}:{dataset_version.version}" if dataset_version else None
+        return list(self.repository.list_runs(dataset_version=ref, method=method, limit=limit))
+
+    def get_run(self, run_id: str) -> Run:
+        return self.repository.get_run(run_id)
@@ -1,5 +1,6 @@
 """Storage adapters for metadata and dataset locations."""
 
 from .repository import DatasetRepository
+from .sqlite_repository import SQLiteDatasetRepository
 
-__all__ = ["DatasetRepository"]
+__all__ = ["DatasetRepository", "SQLiteDatasetRepository"]
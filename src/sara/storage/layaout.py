@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import shutil
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Sequence
+
+from .manifest import MANIFEST_NAME, write_manifest, write_virtual_manifest
 
 
 @dataclass(frozen=True)
@@ -21,6 +27,13 @@ class StorageLayout:
 
     data_dir: Path
 
+    # Layout direccionado por contenido:
+    #   - los Parquet viven UNA vez en data/objects/<hash[:2]>/<hash>.parquet
+    #   - cada versión es un manifest.json que apunta a esos objetos
+    # Datos idénticos (reimport del mismo archivo, outputs iguales) no se
+    # duplican en disco.
+    content_addressed: bool = False
+
     def version_dir(self, dataset_id: str, version: str) -> Path:
         """
         Directorio para una versión.
@@ -35,4 +48,220 @@ class StorageLayout:
 
         Ej: data/datasets/hogares_2023/v1/data.parquet
         """
-        return self.version_dir(dataset_id, version) / "data.parquet"
\ No newline at end of file
+        return self.version_dir(dataset_id, version) / "data.parquet"
+
+    def version_data_dir(self, dataset_id: str, version: str) -> Path:
+        """
+        Directorio de datos de una versión multi-archivo.
+
+        Se usa cuando la versión no entra en un único data.parquet:
+          - particionada (hive): data/datasets/hogares_2023/v1/data/anio=2023/provincia=X/*.parquet
+          - rotada por tamaño:   data/datasets/hogares_2023/v1/data/data_0.parquet, data_1.parquet, ...
+
+        El engine lee cualquiera de las dos formas de manera transparente.
+        """
+        return self.version_dir(dataset_id, version) / "data"
+
+    def version_target(self, dataset_id: str, version: str, multi_file: bool = False) -> Path:
+        """Destino de escritura: archivo único o directorio de datos."""
+        if multi_file:
+            return self.version_data_dir(dataset_id, version)
+        return self.version_path(dataset_id, version)
+
+    def existing_version_path(self, dataset_id: str, version: str) -> Path | None:
+        """
+        Path de una versión ya escrita en disco (None si no hay nada).
+
+        Mismo orden en que se escriben: manifest (content-addressed, append,
+        virtual), data.parquet, o directorio de datos con algún Parquet.
+        No mira el catálogo: sirve para reconocer versiones de corridas
+        anteriores cuando el catálogo no las tiene (repositorio en memoria).
+        """
+        manifest = self.manifest_path(dataset_id, version)
+        if manifest.is_file():
+            return manifest
+        single = self.version_path(dataset_id, version)
+        if single.is_file():
+            return single
+        multi = self.version_data_dir(dataset_id, version)
+        if multi.is_dir() and next(multi.rglob("*.parquet"), None) is not None:
+            return multi
+        return None
+
+    def delta_dir(self, dataset_id: str, version: str) -> Path:
+        """
+        Directorio de los archivos NUEVOS de una versión append.
+
+        Ej: data/datasets/hogares_2023/v2/delta/
+        (el resto de los datos son los archivos del padre, vía manifest)
+        """
+        return self.version_dir(dataset_id, version) / "delta"
+
+    def catalog_path(self) -> Path:
+        """Catálogo SQLite por defecto. Ej: data/catalog.sqlite"""
+        return self.data_dir / "catalog.sqlite"
+
+    def socket_path(self) -> Path:
+        """Socket Unix por defecto de `sara serve`. Ej: data/sara.sock"""
+        return self.data_dir / "sara.sock"
+
+    def cache_dir(self) -> Path:
+        """Store en disco del caché de resultados. Ej: data/cache/"""
+        return self.data_dir / "cache"
+
+    def temp_dir(self) -> Path:
+        """Spill de DuckDB (sorts/joins que no entran en memoria). Ej: data/tmp/"""
+        return self.data_dir / "tmp"
+
+    def slots_dir(self) -> Path:
+        """Locks de admisión de jobs pesados (max_concurrent_jobs). Ej: data/slots/"""
+        return self.data_dir / "slots"
+
+    # ---------------------------
+    # Content-addressed storage
+    # ---------------------------
+
+    def objects_dir(self) -> Path:
+        """Ej: data/objects/"""
+        return self.data_dir / "objects"
+
+    def object_path(self, digest: str) -> Path:
+        """
+        Path de un objeto Parquet por hash (sha256).
+
+        Ej: data/objects/3f/3f9a...c1.parquet (fan-out por prefijo para no
+        tener cientos de miles de archivos en un solo directorio).
+        """
+        return self.objects_dir() / digest[:2] / f"{digest}.parquet"
+
+    def manifest_path(self, dataset_id: str, version: str) -> Path:
+        """Ej: data/datasets/hogares_2023/v1/manifest.json"""
+        return self.version_dir(dataset_id, version) / MANIFEST_NAME
+
+    def commit_version(self, dataset_id: str, version: str, written: Path) -> Path:
+        """
+        Cierra la escritura de una versión y devuelve su path definitivo.
+
+        - Layout por directorio: no hace nada (devuelve `written`).
+        - Content-addressed: hashea cada Parquet escrito, lo mueve a objects/
+          (o lo descarta si el objeto ya existe: dedup), escribe el manifest
+          y borra lo escrito. Devuelve el path del manifest.
+        """
+        written = Path(written)
+        if not self.content_addressed:
+            return written
+
+        files = [written] if written.is_file() else sorted(written.rglob("*.parquet"))
+        objects = [self.store_object(f) for f in files]
+        manifest = write_manifest(self.manifest_path(dataset_id, version), objects, kind="files")
+
+        if written.is_dir():
+            shutil.rmtree(written, ignore_errors=True)
+        return manifest
+
+    def commit_append(
+        self,
+        dataset_id: str,
+        version: str,
+        parent_files: Sequence[Path | str],
+        written: Path,
+        parent: str | None = None,
+    ) -> Path:
+        """
+        Cierra una versión append: manifest = archivos del padre + delta.
+
+        - Los archivos del padre NO se copian ni reescriben: el costo de la
+          versión nueva es proporcional al delta.
+        - Layout por directorio: el delta queda en version_dir/delta.
+        - Content-addressed: el delta va a objects/ como cualquier Parquet.
+
+        Devuelve el path del manifest.
+        """
+        written = Path(written)
+        delta = [written] if written.is_file() else sorted(written.rglob("*.parquet"))
+        if self.content_addressed:
+            delta = [self.store_object(f) for f in delta]
+            if written.is_dir():
+                shutil.rmtree(written, ignore_errors=True)
+        files = [Path(f) for f in parent_files] + delta
+        extra = {"parent": parent} if parent is not None else {}
+        return write_manifest(self.manifest_path(dataset_id, version), files, kind="files", **extra)
+
+    # ---------------------------
+    # Versiones virtuales
+    # ---------------------------
+
+    def commit_virtual(
+        self,
+        dataset_id: str,
+        version: str,
+        parent_path: Path,
+        where: str | None = None,
+        columns: Sequence[str] | None = None,
+    ) -> Path:
+        """
+        Registra una versión virtual (padre + where/columns) sin escribir datos.
+
+        Devuelve el path del manifest (el engine lo resuelve como vista).
+        """
+        return write_virtual_manifest(
+            self.manifest_path(dataset_id, version), Path(parent_path), where=where, columns=columns
+        )
+
+    def commit_materialized(self, dataset_id: str, version: str, written: Path) -> Path:
+        """
+        Reemplaza el manifest virtual de una versión por uno físico.
+
+        El path de la versión (manifest.json) no cambia: catálogo y versiones
+        virtuales hijas siguen apuntando al mismo lugar. El reemplazo es
+        atómico (write_manifest), un lector ve la vista o los datos, nunca
+        algo a medias.
+        """
+        if self.content_addressed:
+            return self.commit_version(dataset_id, version, written)
+        return write_manifest(self.manifest_path(dataset_id, version), [Path(written)], kind="files")
+
+    def query_count_path(self, dataset_id: str, version: str) -> Path:
+        """Contador de consultas de una versión virtual. Ej: data/datasets/hogares_2023/v3/queries"""
+        return self.version_dir(dataset_id, version) / "queries"
+
+    def bump_query_count(self, dataset_id: str, version: str) -> int:
+        """
+        Suma una consulta al contador de la versión y devuelve el total.
+
+        Best-effort (sin lock): dos procesos a la vez pueden perder un
+        incremento, lo que solo demora un poco la materialización automática.
+        """
+        path = self.query_count_path(dataset_id, version)
+        try:
+            count = int(path.read_text(encoding="utf-8")) + 1
+        except (FileNotFoundError, ValueError):
+            count = 1
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(str(count), encoding="utf-8")
+        return count
+
+    def store_object(self, path: Path) -> Path:
+        """
+        Mueve un Parquet al store por contenido y devuelve el path del objeto.
+
+        Si ya existe un objeto con el mismo hash, el archivo nuevo se borra:
+        los datos idénticos se guardan una sola vez.
+        """
+        path = Path(path)
+        target = self.object_path(_sha256(path))
+        if target.exists():
+            path.unlink()
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # os.replace es atómico: dos writers del mismo objeto no se pisan a medias.
+            os.replace(path, target)
+        return target
+
+
+def _sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
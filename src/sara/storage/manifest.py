@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+# Nombre fijo del manifest dentro del directorio de una versión.
+MANIFEST_NAME = "manifest.json"
+
+# Versión del formato: si cambia la estructura, se sube y se migra.
+MANIFEST_FORMAT = "sara-manifest/1"
+
+
+def is_manifest(path: Path) -> bool:
+    """True si `path` apunta a un manifest de versión (no a datos Parquet)."""
+    path = Path(path)
+    return path.name == MANIFEST_NAME and path.is_file()
+
+
+def write_manifest(path: Path, files: Iterable[Path], **extra: Any) -> Path:
+    """
+    Escribe un manifest: versión liviana que apunta a archivos Parquet.
+
+    Los paths se guardan RELATIVOS al directorio del manifest, así el
+    data_dir completo se puede mover/copiar sin romper versiones.
+
+    `extra` permite guardar metadatos adicionales (ej: kind, parent).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    base = path.parent.resolve()
+    payload = {
+        "format": MANIFEST_FORMAT,
+        **extra,
+        "files": [_relpath(Path(f).resolve(), base) for f in files],
+    }
+    # Escritura atómica: un lector nunca ve un manifest a medias.
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def write_virtual_manifest(
+    path: Path,
+    parent: Path,
+    where: str | None = None,
+    columns: Sequence[str] | None = None,
+) -> Path:
+    """
+    Escribe un manifest VIRTUAL: la versión no tiene datos propios, es
+    "padre + predicado/proyección" y el engine la resuelve como vista.
+
+    - parent: path de la versión padre (relativo, igual que `files`).
+    - depth: largo de la cadena virtual hasta una versión física (padre
+      físico = 1); sirve para decidir cuándo materializar.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "format": MANIFEST_FORMAT,
+        "kind": "virtual",
+        "parent": _relpath(Path(parent).resolve(), path.parent.resolve()),
+        "where": where,
+        "columns": list(columns) if columns else None,
+        "depth": virtual_depth(parent) + 1,
+    }
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def read_manifest(path: Path) -> dict[str, Any]:
+    path = Path(path)
+    if not path.is_file():
+        raise FileNotFoundError(f"Manifest no encontrado: {path}")
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    if payload.get("format") != MANIFEST_FORMAT:
+        raise ValueError(f"Formato de manifest desconocido en {path}: {payload.get('format')!r}")
+    return payload
+
+
+def manifest_files(path: Path) -> list[Path]:
+    """Archivos Parquet (paths absolutos) listados en un manifest."""
+    path = Path(path)
+    payload = read_manifest(path)
+    if payload.get("kind") == "virtual":
+        raise ValueError(f"{path} es una versión virtual: no lista archivos (materializala primero).")
+    base = path.parent
+    return [(base / rel).resolve() for rel in payload["files"]]
+
+
+def is_virtual(path: Path) -> bool:
+    """True si `path` es el manifest de una versión virtual."""
+    return is_manifest(path) and read_manifest(path).get("kind") == "virtual"
+
+
+def virtual_parent(path: Path) -> Path:
+    """Path (absoluto) de la versión padre de un manifest virtual."""
+    path = Path(path)
+    return (path.parent / read_manifest(path)["parent"]).resolve()
+
+
+def virtual_depth(path: Path) -> int:
+    """Largo de la cadena virtual (0 = versión física)."""
+    if not is_manifest(path):
+        return 0
+    return int(read_manifest(path).get("depth", 0))
+
+
+def _relpath(target: Path, base: Path) -> str:
+    # os.path.relpath permite "../" (Path.relative_to no, en 3.10/3.11).
+    return os.path.relpath(target, base)
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from dataclasses import asdict
 from datetime import datetime
-from typing import Dict, Iterable
+from typing import Any, Dict, Iterable, List
 
-from sara.core.models import Dataset, DatasetVersion, Operation
+from sara.core.models import Dataset, DatasetVersion, Operation, Run
 
 
 class DatasetRepository:
@@ -21,7 +21,11 @@ class DatasetRepository:
     def __init__(self) -> None:
         self._datasets: Dict[str, Dataset] = {}
         self._versions: Dict[str, DatasetVersion] = {}
+        # Índice dataset_id -> keys de versiones (en orden de alta), para que
+        # list_versions no recorra TODAS las versiones del catálogo.
+        self._versions_by_dataset: Dict[str, List[str]] = {}
         self._operations: Dict[str, Operation] = {}
+        self._runs: Dict[str, Run] = {}
 
     # ---------------------------
     # Dataset ops
@@ -37,6 +41,13 @@ class DatasetRepository:
     def list_datasets(self) -> Iterable[Dataset]:
         return self._datasets.values()
 
+    def update_dataset(self, dataset: Dataset) -> Dataset:
+        """Reemplaza la metadata de un dataset existente (p. ej. write_policy)."""
+        if dataset.dataset_id not in self._datasets:
+            raise KeyError(f"Dataset '{dataset.dataset_id}' not found.")
+        self._datasets[dataset.dataset_id] = dataset
+        return dataset
+
     def get_dataset(self, dataset_id: str) -> Dataset:
         if dataset_id not in self._datasets:
             raise KeyError(f"Dataset '{dataset_id}' not found.")
@@ -51,42 +62,133 @@ class DatasetRepository:
         if key in self._versions:
             raise ValueError(f"Version '{key}' already exists.")
         self._versions[key] = dataset_version
+        self._versions_by_dataset.setdefault(dataset_version.dataset_id, []).append(key)
         return dataset_version
 
+    def add_versions(self, dataset_versions: Iterable[DatasetVersion]) -> List[DatasetVersion]:
+        """Alta en bloque: valida todo antes de insertar (todo o nada)."""
+        batch = list(dataset_versions)
+        keys = [f"{dv.dataset_id}:{dv.version}" for dv in batch]
+        duplicated = [k for k in keys if k in self._versions] or [k for k in keys if keys.count(k) > 1]
+        if duplicated:
+            raise ValueError(f"Version '{duplicated[0]}' already exists.")
+        for dv in batch:
+            self.add_version(dv)
+        return batch
+
     def get_version(self, dataset_id: str, version: str) -> DatasetVersion:
         key = f"{dataset_id}:{version}"
         if key not in self._versions:
             raise KeyError(f"Version '{key}' not found.")
         return self._versions[key]
 
+    def update_version(self, dataset_version: DatasetVersion) -> DatasetVersion:
+        """Reemplaza la metadata de una versión existente (p. ej. al materializarla)."""
+        key = f"{dataset_version.dataset_id}:{dataset_version.version}"
+        if key not in self._versions:
+            raise KeyError(f"Version '{key}' not found.")
+        self._versions[key] = dataset_version
+        return dataset_version
+
     def list_versions(self, dataset_id: str) -> Iterable[DatasetVersion]:
         """
         Listado simple de versiones por dataset.
 
         Nota:
-          - En Postgres esto sería un SELECT ... WHERE dataset_id = ...
-          - En memory, filtramos por prefijo.
+          - En SQLite/Postgres esto es un SELECT ... WHERE dataset_id = ...
+          - En memory, usamos el índice por dataset (no recorremos todo).
         """
-        prefix = f"{dataset_id}:"
-        for key, dv in self._versions.items():
-            if key.startswith(prefix):
-                yield dv
+        for key in self._versions_by_dataset.get(dataset_id, []):
+            yield self._versions[key]
+
+    def list_children(self, dataset_id: str, parent_version: str) -> Iterable[DatasetVersion]:
+        """Versiones derivadas directamente de `parent_version`."""
+        return [dv for dv in self.list_versions(dataset_id) if dv.parent_version == parent_version]
 
     # ---------------------------
     # Operation ops
     # ---------------------------
 
-    def create_operation(self, operation_id: str, kind: str, params: Dict[str, str]) -> Operation:
+    def create_operation(
+        self,
+        operation_id: str,
+        kind: str,
+        params: Dict[str, str],
+        metrics: Dict[str, Any] | None = None,
+    ) -> Operation:
         if operation_id in self._operations:
             raise ValueError(f"Operation '{operation_id}' already exists.")
-        op = Operation(operation_id=operation_id, kind=kind, params=params, created_at=datetime.utcnow())
+        op = Operation(
+            operation_id=operation_id, kind=kind, params=params, created_at=datetime.utcnow(), metrics=metrics
+        )
         self._operations[operation_id] = op
         return op
 
+    def get_operation(self, operation_id: str) -> Operation:
+        if operation_id not in self._operations:
+            raise KeyError(f"Operation '{operation_id}' not found.")
+        return self._operations[operation_id]
+
+    def list_operations(self, kind: str | None = None, limit: int | None = None) -> List[Operation]:
+        """Operaciones más recientes primero (opcionalmente de un solo kind)."""
+        ops = [op for op in reversed(self._operations.values()) if kind is None or op.kind == kind]
+        return ops[:limit] if limit is not None else ops
+
+    # ---------------------------
+    # Run ops
+    # ---------------------------
+
+    def create_run(
+        self,
+        run_id: str,
+        dataset_version: str,
+        method: str,
+        params: Dict[str, str],
+        metrics: Dict[str, Any] | None = None,
+        result: Dict[str, Any] | None = None,
+    ) -> Run:
+        if run_id in self._runs:
+            raise ValueError(f"Run '{run_id}' already exists.")
+        run = Run(
+            run_id=run_id,
+            dataset_version=dataset_version,
+            method=method,
+            params=params,
+            created_at=datetime.utcnow(),
+            metrics=metrics,
+            result=result,
+        )
+        self._runs[run_id] = run
+        return run
+
+    def get_run(self, run_id: str) -> Run:
+        if run_id not in self._runs:
+            raise KeyError(f"Run '{run_id}' not found.")
+        return self._runs[run_id]
+
+    def list_runs(
+        self,
+        dataset_version: str | None = None,
+        method: str | None = None,
+        limit: int | None = None,
+    ) -> List[Run]:
+        """Runs más recientes primero, filtrables por versión ("ds:v") y método."""
+        runs = [
+            run
+            for run in reversed(self._runs.values())
+            if (dataset_version is None or run.dataset_version == dataset_version)
+            and (method is None or run.method == method)
+        ]
+        return runs[:limit] if limit is not None else runs
+
+    def close(self) -> None:
+        """Nada que liberar en memoria (interfaz común con backends persistentes)."""
+
     def as_debug_dict(self) -> Dict[str, Dict[str, dict]]:
         """Helper para debug (no persistente)."""
         return {
             "datasets": {k: asdict(v) for k, v in self._datasets.items()},
             "versions": {k: asdict(v) for k, v in self._versions.items()},
             "operations": {k: asdict(v) for k, v in self._operations.items()},
+            "runs": {k: asdict(v) for k, v in self._runs.items()},
         }
\ No newline at end of file
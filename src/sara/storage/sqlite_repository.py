@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Type, TypeVar
+
+from sara.core.models import Dataset, DatasetVersion, Operation, Run
+
+T = TypeVar("T")
+
+# Campos datetime de los modelos: viajan como ISO 8601 dentro del payload.
+_DATETIME_FIELDS = ("created_at",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset_id TEXT PRIMARY KEY,
+    payload    TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS versions (
+    seq            INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset_id     TEXT NOT NULL,
+    version        TEXT NOT NULL,
+    parent_version TEXT,
+    operation_id   TEXT,
+    payload        TEXT NOT NULL,
+    UNIQUE (dataset_id, version)
+);
+CREATE INDEX IF NOT EXISTS versions_by_parent ON versions (dataset_id, parent_version);
+CREATE INDEX IF NOT EXISTS versions_by_operation ON versions (operation_id);
+
+CREATE TABLE IF NOT EXISTS operations (
+    operation_id TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    payload      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS operations_by_kind ON operations (kind);
+
+CREATE TABLE IF NOT EXISTS runs (
+    seq             INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id          TEXT NOT NULL UNIQUE,
+    dataset_version TEXT NOT NULL,
+    method          TEXT NOT NULL,
+    payload         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_version ON runs (dataset_version, method);
+CREATE INDEX IF NOT EXISTS runs_by_method ON runs (method);
+"""
+
+
+def _encode(obj: Any) -> str:
+    data = asdict(obj)
+    for name in _DATETIME_FIELDS:
+        if isinstance(data.get(name), datetime):
+            data[name] = data[name].isoformat()
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+def _decode(cls: Type[T], payload: str) -> T:
+    data = json.loads(payload)
+    for name in _DATETIME_FIELDS:
+        if data.get(name):
+            data[name] = datetime.fromisoformat(data[name])
+    # Tolerar payloads escritos por versiones más nuevas/viejas del modelo.
+    known = {f.name for f in fields(cls)}
+    return cls(**{k: v for k, v in data.items() if k in known})
+
+
+class SQLiteDatasetRepository:
+    """
+    Catálogo persistente (archivo SQLite) con la MISMA interfaz que
+    DatasetRepository.
+
+    Por qué SQLite y no DuckDB para el catálogo:
+      - es OLTP chico (altas y lookups por clave), justo lo que SQLite hace bien;
+      - viene con Python (sin dependencias) y no compite por el lock del
+        archivo .duckdb del engine.
+
+    Diseño:
+      - columnas indexadas para lo que se consulta (dataset_id, versión padre,
+        operación); el resto del modelo va como JSON en `payload`, así agregar
+        campos a los dataclasses no requiere migraciones.
+      - WAL: lectores concurrentes (otros procesos CLI) no bloquean a escritores.
+      - una conexión por repositorio + lock: seguro entre hilos.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._con = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode = WAL")
+        # Con WAL, NORMAL es durable ante crash de proceso y mucho más rápido en altas.
+        self._con.execute("PRAGMA synchronous = NORMAL")
+        self._con.executescript(_SCHEMA)
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        with self._lock, self._con:
+            yield self._con
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+    # ---------------------------
+    # Dataset ops
+    # ---------------------------
+
+    def create_dataset(self, dataset_id: str, name: str, description: str | None = None) -> Dataset:
+        dataset = Dataset(dataset_id=dataset_id, name=name, description=description, created_at=datetime.utcnow())
+        try:
+            with self._tx() as con:
+                con.execute("INSERT INTO datasets (dataset_id, payload) VALUES (?, ?)", (dataset_id, _encode(dataset)))
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"Dataset '{dataset_id}' already exists.") from exc
+        return dataset
+
+    def list_datasets(self) -> Iterable[Dataset]:
+        with self._tx() as con:
+            rows = con.execute("SELECT payload FROM datasets ORDER BY rowid").fetchall()
+        return [_decode(Dataset, row[0]) for row in rows]
+
+    def get_dataset(self, dataset_id: str) -> Dataset:
+        with self._tx() as con:
+            row = con.execute("SELECT payload FROM datasets WHERE dataset_id = ?", (dataset_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Dataset '{dataset_id}' not found.")
+        return _decode(Dataset, row[0])
+
+    def update_dataset(self, dataset: Dataset) -> Dataset:
+        with self._tx() as con:
+            cur = con.execute(
+                "UPDATE datasets SET payload = ? WHERE dataset_id = ?", (_encode(dataset), dataset.dataset_id)
+            )
+        if cur.rowcount == 0:
+            raise KeyError(f"Dataset '{dataset.dataset_id}' not found.")
+        return dataset
+
+    # ---------------------------
+    # Version ops
+    # ---------------------------
+
+    @staticmethod
+    def _version_row(dv: DatasetVersion) -> tuple:
+        return (dv.dataset_id, dv.version, dv.parent_version, dv.operation_id, _encode(dv))
+
+    def add_version(self, dataset_version: DatasetVersion) -> DatasetVersion:
+        self.add_versions([dataset_version])
+        return dataset_version
+
+    def add_versions(self, dataset_versions: Iterable[DatasetVersion]) -> List[DatasetVersion]:
+        """Alta en bloque en UNA transacción (todo o nada)."""
+        batch = list(dataset_versions)
+        try:
+            with self._tx() as con:
+                con.executemany(
+                    """
+                    INSERT INTO versions (dataset_id, version, parent_version, operation_id, payload)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [self._version_row(dv) for dv in batch],
+                )
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"Version already exists ({exc}).") from exc
+        return batch
+
+    def get_version(self, dataset_id: str, version: str) -> DatasetVersion:
+        with self._tx() as con:
+            row = con.execute(
+                "SELECT payload FROM versions WHERE dataset_id = ? AND version = ?",
+                (dataset_id, version),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Version '{dataset_id}:{version}' not found.")
+        return _decode(DatasetVersion, row[0])
+
+    def update_version(self, dataset_version: DatasetVersion) -> DatasetVersion:
+        with self._tx() as con:
+            cur = con.execute(
+                "UPDATE versions SET payload = ? WHERE dataset_id = ? AND version = ?",
+                (_encode(dataset_version), dataset_version.dataset_id, dataset_version.version),
+            )
+        if cur.rowcount == 0:
+            raise KeyError(f"Version '{dataset_version.dataset_id}:{dataset_version.version}' not found.")
+        return dataset_version
+
+    def list_versions(self, dataset_id: str) -> Iterable[DatasetVersion]:
+        # Usa el índice UNIQUE (dataset_id, version): no recorre otros datasets.
+        with self._tx() as con:
+            rows = con.execute(
+                "SELECT payload FROM versions WHERE dataset_id = ? ORDER BY seq",
+                (dataset_id,),
+            ).fetchall()
+        return [_decode(DatasetVersion, row[0]) for row in rows]
+
+    def list_children(self, dataset_id: str, parent_version: str) -> Iterable[DatasetVersion]:
+        """Versiones derivadas directamente de `parent_version` (índice por padre)."""
+        with self._tx() as con:
+            rows = con.execute(
+                "SELECT payload FROM versions WHERE dataset_id = ? AND parent_version = ? ORDER BY seq",
+                (dataset_id, parent_version),
+            ).fetchall()
+        return [_decode(DatasetVersion, row[0]) for row in rows]
+
+    # ---------------------------
+    # Operation ops
+    # ---------------------------
+
+    def create_operation(
+        self,
+        operation_id: str,
+        kind: str,
+        params: Dict[str, str],
+        metrics: Dict[str, Any] | None = None,
+    ) -> Operation:
+        op = Operation(
+            operation_id=operation_id, kind=kind, params=params, created_at=datetime.utcnow(), metrics=metrics
+        )
+        try:
+            with self._tx() as con:
+                con.execute(
+                    "INSERT INTO operations (operation_id, kind, payload) VALUES (?, ?, ?)",
+                    (operation_id, kind, _encode(op)),
+                )
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"Operation '{operation_id}' already exists.") from exc
+        return op
+
+    def get_operation(self, operation_id: str) -> Operation:
+        with self._tx() as con:
+            row = con.execute("SELECT payload FROM operations WHERE operation_id = ?", (operation_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Operation '{operation_id}' not found.")
+        return _decode(Operation, row[0])
+
+    def list_operations(self, kind: str | None = None, limit: int | None = None) -> List[Operation]:
+        """Operaciones más recientes primero (opcionalmente de un solo kind)."""
+        sql = "SELECT payload FROM operations"
+        params: list[Any] = []
+        if kind is not None:
+            sql += " WHERE kind = ?"
+            params.append(kind)
+        sql += " ORDER BY rowid DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._tx() as con:
+            rows = con.execute(sql, params).fetchall()
+        return [_decode(Operation, row[0]) for row in rows]
+
+    # ---------------------------
+    # Run ops
+    # ---------------------------
+
+    def create_run(
+        self,
+        run_id: str,
+        dataset_version: str,
+        method: str,
+        params: Dict[str, str],
+        metrics: Dict[str, Any] | None = None,
+        result: Dict[str, Any] | None = None,
+    ) -> Run:
+        run = Run(
+            run_id=run_id,
+            dataset_version=dataset_version,
+            method=method,
+            params=params,
+            created_at=datetime.utcnow(),
+            metrics=metrics,
+            result=result,
+        )
+        try:
+            with self._tx() as con:
+                con.execute(
+                    "INSERT INTO runs (run_id, dataset_version, method, payload) VALUES (?, ?, ?, ?)",
+                    (run_id, dataset_version, method, _encode(run)),
+                )
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"Run '{run_id}' already exists.") from exc
+        return run
+
+    def get_run(self, run_id: str) -> Run:
+        with self._tx() as con:
+            row = con.execute("SELECT payload FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Run '{run_id}' not found.")
+        return _decode(Run, row[0])
+
+    def list_runs(
+        self,
+        dataset_version: str | None = None,
+        method: str | None = None,
+        limit: int | None = None,
+    ) -> List[Run]:
+        """Runs más recientes primero, filtrables por versión ("ds:v") y método."""
+        clauses, params = [], []
+        if dataset_version is not None:
+            clauses.append("dataset_version = ?")
+            params.append(dataset_version)
+        if method is not None:
+            clauses.append("method = ?")
+            params.append(method)
+        sql = "SELECT payload FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY seq DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._tx() as con:
+            rows = con.execute(sql, params).fetchall()
+        return [_decode(Run, row[0]) for row in rows]
+
+    def as_debug_dict(self) -> Dict[str, Dict[str, dict]]:
+        """Helper para debug (vuelca el catálogo completo: usar con catálogos chicos)."""
+        with self._tx() as con:
+            datasets = con.execute("SELECT payload FROM datasets").fetchall()
+            versions = con.execute("SELECT payload FROM versions ORDER BY seq").fetchall()
+            operations = con.execute("SELECT payload FROM operations").fetchall()
+            runs = con.execute("SELECT payload FROM runs ORDER BY seq").fetchall()
+        return {
+            "datasets": {d.dataset_id: asdict(d) for d in (_decode(Dataset, r[0]) for r in datasets)},
+            "versions": {
+                f"{v.dataset_id}:{v.version}": asdict(v) for v in (_decode(DatasetVersion, r[0]) for r in versions)
+            },
+            "operations": {o.operation_id: asdict(o) for o in (_decode(Operation, r[0]) for r in operations)},
+            "runs": {r.run_id: asdict(r) for r in (_decode(Run, row[0]) for row in runs)},
+        }
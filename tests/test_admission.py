@@ -0,0 +1,32 @@
+"""Admisión (AdmissionControl): también cubre los previews leídos con pyarrow."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from sara.engine import AdmissionControl, DuckDBEngine
+
+
+def _take_slot(admission: AdmissionControl) -> None:
+    with admission.slot():
+        pass
+
+
+def test_scan_batches_toma_slot(tmp_path):
+    path = tmp_path / "data.parquet"
+    pq.write_table(pa.table({"x": [1, 2, 3]}), path)
+    admission = AdmissionControl(tmp_path / "slots", max_jobs=1, timeout=0.2)
+    engine = DuckDBEngine(admission=admission)
+
+    batches = engine.scan_batches(path, batch_size=1)
+    next(batches)
+    # Con el iterador a medio consumir, otro hilo no consigue el único slot.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with pytest.raises(TimeoutError):
+            pool.submit(_take_slot, admission).result()
+        batches.close()
+        pool.submit(_take_slot, admission).result()
@@ -0,0 +1,48 @@
+"""Caché de resultados del engine (ResultCache vía _query_rows)."""
+
+from __future__ import annotations
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from sara.engine import DuckDBEngine
+from sara.engine.cache import _MISSING, ResultCache
+
+
+def test_mean_cacheado(tmp_path):
+    path = tmp_path / "data.parquet"
+    pq.write_table(pa.table({"x": [1.0, 2.0, 6.0]}), path)
+    engine = DuckDBEngine(cache=ResultCache())
+
+    with engine.track() as first:
+        assert engine.mean(path, "x") == 3.0
+    with engine.track() as second:
+        assert engine.mean(path, "x") == 3.0
+
+    assert first.get("cache_hits", 0) == 0
+    assert second["cache_hits"] == 1
+    assert engine.cache.stats()["misses"] == 1
+
+
+def test_store_en_disco_sin_pickle(tmp_path):
+    import datetime
+    import decimal
+    import sqlite3
+
+    rows = [
+        (1, 2.5, "a", None, decimal.Decimal("1.50"), datetime.date(2024, 1, 31), [1, 2]),
+        (2, float("inf"), "b", True, decimal.Decimal("-3.25"), None, []),
+    ]
+    writer = ResultCache(directory=tmp_path)
+    writer.put("k", rows)
+    writer.put("raro", [(object(),)])  # Arrow no lo representa: solo LRU
+
+    # Otro proceso (caché nuevo, LRU vacío) lee del store.
+    reader = ResultCache(directory=tmp_path)
+    assert reader.get("k") == rows
+    assert reader.get("raro") is _MISSING
+
+    # Lo que haya en el archivo se decodifica como Arrow: basura = miss, no código.
+    with sqlite3.connect(tmp_path / "results.sqlite") as db:
+        db.execute("UPDATE rows_ipc SET value = ? WHERE key = 'k'", (b"\x80\x04garbage.",))
+    assert ResultCache(directory=tmp_path).get("k") is _MISSING
@@ -0,0 +1,24 @@
+"""
+Budget de arranque del CLI (ver sara.benchmarks.startup).
+
+Cada chequeo corre el CLI en un proceso nuevo, como lo llaman los scripts.
+En máquinas lentas (CI compartido) el budget se puede subir con
+SARA_STARTUP_BUDGET=<segundos>.
+"""
+
+from __future__ import annotations
+
+import os
+
+from sara.benchmarks.startup import DEFAULT_BUDGET, HEAVY_MODULES, cli_startup, heavy_imports
+
+
+def test_cli_import_no_carga_modulos_pesados(tmp_path):
+    assert heavy_imports(tmp_path) == [], f"import sara.cli.app no debería cargar {HEAVY_MODULES}"
+
+
+def test_help_dentro_del_budget(tmp_path):
+    budget = float(os.environ.get("SARA_STARTUP_BUDGET", DEFAULT_BUDGET))
+    result = cli_startup(tmp_path, commands=(("--help",),), repeat=3)
+    median = result["commands"]["--help"]["median_seconds"]
+    assert median <= budget, f"sara --help tardó {median:.3f}s (budget {budget}s)"
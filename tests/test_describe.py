@@ -0,0 +1,26 @@
+"""Describe (DuckDBEngine.describe): estadísticos y percentiles repetidos."""
+
+from __future__ import annotations
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from sara.engine import DuckDBEngine
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "data.parquet"
+    pq.write_table(pa.table({"a": [1.0, 3.0, 5.0, 7.0], "b": [2.0, 4.0, 6.0, 8.0]}), path)
+    return path
+
+
+def test_stats_repetidos_se_cuentan_una_vez(path):
+    result = DuckDBEngine().describe(path, stats=["mean", "max", "mean"], percentiles=())
+    assert result == {"variable": ["a", "b"], "mean": [4.0, 5.0], "max": [7.0, 8.0]}
+
+
+def test_percentiles_con_la_misma_etiqueta(path):
+    result = DuckDBEngine().describe(path, stats=["percentiles", "min"], percentiles=[0.5, 0.50, 0.25, 0.5])
+    assert result == {"variable": ["a", "b"], "p50": [4.0, 5.0], "p25": [2.5, 3.5], "min": [1.0, 2.0]}
@@ -0,0 +1,43 @@
+"""Particiones hive: solo los dirs key=value de la versión son columnas."""
+
+from __future__ import annotations
+
+import pytest
+
+from sara.config.setting import SARASettings
+from sara.orchestrator import Orchestrator
+
+
+@pytest.fixture
+def orc(tmp_path):
+    # data_dir bajo un directorio key=value que NO es una partición.
+    orc = Orchestrator(settings=SARASettings(data_dir=(tmp_path / "proj=2024" / "data").resolve()))
+    orc.create_dataset(dataset_id="d", name="D")
+    return orc
+
+
+@pytest.fixture
+def csv(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("x,g\n1,a\n5,b\n3,a\n", encoding="utf-8")
+    return path
+
+
+def test_version_sin_particiones(orc, csv):
+    v1 = orc.import_csv("d", csv, version="v1")
+    assert list(orc.engine.columns(v1.path)) == ["x", "g"]
+    v2 = orc.winsorize(v1, "x", 0.1, 0.9, None, "v2")
+    assert list(orc.engine.columns(v2.path)) == ["x", "g"]
+
+
+def test_version_particionada_y_append(orc, csv, tmp_path):
+    v1 = orc.import_csv("d", csv, version="v1", partition_by=["g"])
+    assert sorted(orc.engine.columns(v1.path)) == ["g", "x"]
+    assert orc.engine.partition_columns(v1.path) == ["g"]
+
+    delta = tmp_path / "b.csv"
+    delta.write_text("x,g\n7,c\n", encoding="utf-8")
+    v2 = orc.append(v1, delta, "v2")
+    assert sorted(orc.engine.columns(v2.path)) == ["g", "x"]
+    rows = orc.preview(v2)
+    assert sorted((row["g"], row["x"]) for row in rows) == [("a", 1), ("a", 3), ("b", 5), ("c", 7)]
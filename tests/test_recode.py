@@ -0,0 +1,59 @@
+"""Recode (DuckDBEngine.recode): orden de filas y mappings parciales."""
+
+from __future__ import annotations
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from sara.engine import DuckDBEngine, Resources
+
+N = 300_000
+
+
+def _engine():
+    # Varios hilos aunque la máquina tenga un core: el reorden aparece con scans paralelos.
+    return DuckDBEngine(resources=Resources(threads=8))
+
+
+@pytest.fixture
+def version(tmp_path):
+    # Muchos row groups: DuckDB escanea en paralelo y el join podría reordenar.
+    path = tmp_path / "v1" / "data.parquet"
+    path.parent.mkdir()
+    table = pa.table({"i": list(range(N)), "cat": [("A", "B", "C")[i % 3] for i in range(N)], "k": [i % 7 for i in range(N)]})
+    pq.write_table(table, path, row_group_size=10_000)
+    return path
+
+
+def _read(path):
+    return pq.read_table(path).to_pydict()
+
+
+def test_recode_no_reordena_filas(version, tmp_path):
+    out = _engine().recode(version, {"cat": {"A": "aa", "B": "bb"}}, None, tmp_path / "v2" / "data.parquet")
+    assert _read(out)["i"] == list(range(N))
+
+
+def test_recode_parcial_conserva_valores_sin_mapear(version, tmp_path):
+    out = _engine().recode(version, {"cat": {"A": "aa", "B": "bb"}}, None, tmp_path / "v2" / "data.parquet")
+    assert _read(out)["cat"][:6] == ["aa", "bb", "C", "aa", "bb", "C"]
+
+
+def test_recode_a_columna_nueva_deja_null_sin_mapear(version, tmp_path):
+    out = _engine().recode(
+        version, {"cat": {"A": "aa"}}, {"cat": "cat2"}, tmp_path / "v2" / "data.parquet"
+    )
+    data = _read(out)
+    assert data["cat"][:3] == ["A", "B", "C"]
+    assert data["cat2"][:3] == ["aa", None, None]
+
+
+def test_recode_tipos_incompatibles_falla_con_conteo(version, tmp_path):
+    with pytest.raises(ValueError, match=f"{2 * N // 3} filas"):
+        _engine().recode(version, {"cat": {"A": 1}}, None, tmp_path / "v2" / "data.parquet")
+
+
+def test_recode_tipos_incompatibles_con_mapping_completo(version, tmp_path):
+    out = _engine().recode(version, {"cat": {"A": 1, "B": 2, "C": 3}}, None, tmp_path / "v2" / "data.parquet")
+    assert _read(out)["cat"][:4] == [1, 2, 3, 1]
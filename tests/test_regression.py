@@ -0,0 +1,101 @@
+"""OLS por estadísticos suficientes vs NumPy, en diseños con escalas dispares."""
+
+from __future__ import annotations
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from sara.engine import DuckDBEngine
+
+N = 200_000
+
+
+@pytest.fixture(scope="module")
+def data(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    year = rng.integers(2010, 2013, N).astype(float)
+    cols = {
+        "year": year,
+        "income": rng.normal(1e5, 1e3, N),
+        # Epoch en segundos: ~1.3e9, casi colineal con el año.
+        "epoch": (year - 1970) * 365.25 * 86400 + rng.uniform(0, 365.25 * 86400, N),
+        "w": rng.uniform(0.5, 2.0, N),
+    }
+    cols["y"] = 1.0 + 0.5 * (year - 2010) + 0.002 * cols["income"] + rng.normal(0, 1, N)
+    path = tmp_path_factory.mktemp("reg") / "data.parquet"
+    pq.write_table(pa.table(cols), path)
+    return path, cols
+
+
+def _numpy_ols(cols, x, weights=None):
+    """Referencia: lstsq sobre x e y centrados (constante recuperada de las medias)."""
+    w = np.ones(N) if weights is None else cols[weights]
+    X = np.column_stack([cols[c] for c in x])
+    mu = w @ X / w.sum()
+    mu_y = w @ cols["y"] / w.sum()
+    sw = np.sqrt(w)
+    Xc, yc = (X - mu) * sw[:, None], (cols["y"] - mu_y) * sw
+    b = np.linalg.lstsq(Xc, yc, rcond=None)[0]
+    resid = yc - Xc @ b
+    sigma2 = resid @ resid / (N - len(x) - 1)
+    se = np.sqrt(np.diag(np.linalg.inv(Xc.T @ Xc)) * sigma2)
+    return np.concatenate([[mu_y - mu @ b], b]), se
+
+
+@pytest.mark.parametrize("x", [["year", "income"], ["year", "epoch"]])
+@pytest.mark.parametrize("weights", [None, "w"])
+def test_ols_escalas_dispares(data, x, weights):
+    path, cols = data
+    result = DuckDBEngine().ols(path, "y", x, weights=weights)
+    coef, se = _numpy_ols(cols, x, weights)
+    np.testing.assert_allclose(result["coefficients"]["coef"], coef, rtol=1e-6)
+    np.testing.assert_allclose(result["coefficients"]["se"][1:], se, rtol=1e-6)
+
+
+def test_ols_colineal_falla(tmp_path):
+    path = tmp_path / "data.parquet"
+    x = np.arange(100, dtype=float)
+    pq.write_table(pa.table({"y": x % 7, "a": x, "b": 3 * x + 2010}), path)
+    with pytest.raises(ValueError, match="singular"):
+        DuckDBEngine().ols(path, "y", ["a", "b"])
+
+
+def _numpy_hc_dummies(cols, x, unit, kind, weights=None):
+    """Referencia: HC2/HC3 con dummies explícitas por unidad (sin absorber)."""
+    n = len(cols["y"])
+    w = np.ones(n) if weights is None else cols[weights]
+    dummies = (cols[unit][:, None] == np.unique(cols[unit])[None, :]).astype(float)
+    sw = np.sqrt(w)
+    X = np.column_stack([cols[c] for c in x] + [dummies]) * sw[:, None]
+    y = cols["y"] * sw
+    inv = np.linalg.inv(X.T @ X)
+    e = y - X @ (inv @ X.T @ y)
+    h = np.einsum("ij,jk,ik->i", X, inv, X)
+    u2 = e**2 / (1 - h) ** (1 if kind == "hc2" else 2)
+    vcov = inv @ (X.T * u2) @ X @ inv
+    return np.sqrt(np.diag(vcov))[: len(x)]
+
+
+@pytest.mark.parametrize("kind", ["hc2", "hc3"])
+@pytest.mark.parametrize("weights", [None, "w"])
+def test_ols_fe_hc_incluye_leverage_del_grupo(tmp_path, kind, weights):
+    rng = np.random.default_rng(1)
+    n = 3_000
+    unit = rng.integers(0, 80, n)
+    cols = {"unit": unit, "x1": rng.normal(0, 1, n), "x2": rng.exponential(1, n), "w": rng.uniform(0.5, 2.0, n)}
+    cols["y"] = 0.3 * unit + cols["x1"] - 0.5 * cols["x2"] + rng.normal(0, 1, n) * (1 + cols["x2"])
+    path = tmp_path / "data.parquet"
+    pq.write_table(pa.table(cols), path)
+    result = DuckDBEngine().ols(path, "y", ["x1", "x2"], weights=weights, fe="unit", se=kind)
+    expected = _numpy_hc_dummies(cols, ["x1", "x2"], "unit", kind, weights)
+    np.testing.assert_allclose(result["coefficients"]["se"], expected, rtol=1e-8)
+
+
+def test_ols_fe_varias_vias_rechaza_hc3(tmp_path):
+    path = tmp_path / "data.parquet"
+    x = np.arange(100, dtype=float)
+    pq.write_table(pa.table({"y": x % 7, "x": x, "a": x % 5, "b": x % 3}), path)
+    with pytest.raises(ValueError, match="varias vías"):
+        DuckDBEngine().ols(path, "y", ["x"], fe=["a", "b"], se="hc3")
@@ -0,0 +1,72 @@
+"""Specs (Orchestrator.run_spec): paths relativos al directorio de la spec."""
+
+from __future__ import annotations
+
+import json
+
+from sara.config.setting import SARASettings
+from sara.orchestrator import Orchestrator
+
+
+def test_paths_relativos_a_la_spec(tmp_path, monkeypatch):
+    spec_dir = tmp_path / "spec"
+    spec_dir.mkdir()
+    (spec_dir / "a.csv").write_text("id,sexo\n1,M\n2,F\n3,M\n", encoding="utf-8")
+    (spec_dir / "m.json").write_text(json.dumps({"M": "varon", "F": "mujer"}), encoding="utf-8")
+    spec = {
+        "steps": [
+            {"id": "imp", "op": "import_csv", "dataset": "d", "version": "v1", "params": {"csv_path": "a.csv"}},
+            {"id": "rec", "op": "recode", "input": "d:v1", "version": "v2", "params": {"mappings": {"sexo": "m.json"}}},
+            {
+                "id": "pipe",
+                "op": "pipeline",
+                "input": "d:v1",
+                "version": "v3",
+                "params": {"steps": [{"op": "recode", "mappings": {"sexo": "m.json"}}]},
+            },
+        ]
+    }
+    (spec_dir / "s.json").write_text(json.dumps(spec), encoding="utf-8")
+
+    # Se corre desde el directorio padre, como `sara run spec/s.json`.
+    monkeypatch.chdir(tmp_path)
+    orc = Orchestrator(settings=SARASettings(data_dir=tmp_path / "data"))
+    results = orc.run_spec("spec/s.json")
+
+    assert [(r.step_id, r.status, r.error) for r in results] == [
+        ("imp", "ok", None),
+        ("rec", "ok", None),
+        ("pipe", "ok", None),
+    ]
+    for version in ("v2", "v3"):
+        rows = orc.preview(orc.get_version("d", version))
+        assert [row["sexo"] for row in rows] == ["varon", "mujer", "varon"]
+
+
+def test_segunda_corrida_reusa_versiones_en_disco(tmp_path):
+    # Repositorio en memoria: la segunda corrida arranca con el catálogo vacío.
+    (tmp_path / "a.csv").write_text("id,x\n1,10\n2,20\n3,30\n", encoding="utf-8")
+    spec = {
+        "steps": [
+            {"id": "imp", "op": "import_csv", "dataset": "d", "version": "v1", "params": {"csv_path": "a.csv"}},
+            {"id": "fil", "op": "filter", "input": "d:v1", "version": "v2", "params": {"where": "x > 10"}},
+            {"id": "avg", "op": "mean", "input": "d:v2", "params": {"column": "x"}},
+        ]
+    }
+    (tmp_path / "s.json").write_text(json.dumps(spec), encoding="utf-8")
+    settings = SARASettings(data_dir=tmp_path / "data", repository_backend="memory")
+
+    first = Orchestrator(settings=settings).run_spec(tmp_path / "s.json")
+    assert [r.status for r in first] == ["ok", "ok", "ok"]
+    written = {p: p.stat().st_mtime_ns for p in (tmp_path / "data" / "datasets").rglob("*") if p.is_file()}
+
+    orc = Orchestrator(settings=settings)
+    second = orc.run_spec(tmp_path / "s.json")
+    assert [(r.step_id, r.status, r.error) for r in second] == [
+        ("imp", "exists", None),
+        ("fil", "exists", None),
+        ("avg", "ok", None),
+    ]
+    assert second[2].value == 25.0
+    assert orc.get_version("d", "v1").num_rows == 3
+    assert {p: p.stat().st_mtime_ns for p in written} == written
@@ -0,0 +1,45 @@
+"""Versiones existentes: ningún write las pisa."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from sara.config.setting import SARASettings
+from sara.orchestrator import Orchestrator
+
+
+@pytest.fixture
+def orc(tmp_path):
+    orc = Orchestrator(settings=SARASettings(data_dir=tmp_path / "data"))
+    orc.create_dataset(dataset_id="d", name="D")
+    return orc
+
+
+@pytest.fixture
+def csv(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("x,g\n1,a\n-2,b\n3,a\n", encoding="utf-8")
+    return path
+
+
+def _assert_intact(orc, version):
+    assert Path(version.path).exists()
+    assert [row["x"] for row in orc.preview(orc.get_version("d", version.version))] == [1, -2, 3]
+
+
+def test_transform_sobre_version_existente_falla_sin_borrarla(orc, csv):
+    v1 = orc.import_csv("d", csv, version="v1")
+    with pytest.raises(ValueError, match="already exists"):
+        orc.filter(v1, "x > 0", "v1")
+    _assert_intact(orc, v1)
+
+
+@pytest.mark.parametrize("options", [{}, {"partition_by": ["g"]}])
+def test_reimport_sobre_version_existente_falla_sin_borrarla(orc, csv, options):
+    v1 = orc.import_csv("d", csv, version="v1", **options)
+    with pytest.raises(ValueError, match="already exists"):
+        orc.import_csv("d", csv, version="v1", **options)
+    assert Path(v1.path).exists()
+    assert sorted(row["x"] for row in orc.preview(v1)) == [-2, 1, 3]
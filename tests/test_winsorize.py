@@ -0,0 +1,51 @@
+"""Winsorize (DuckDBEngine.winsorize): orden de filas y tipos."""
+
+from __future__ import annotations
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from sara.engine import DuckDBEngine, Resources
+
+N = 300_000
+
+
+def _engine():
+    # Varios hilos aunque la máquina tenga un core: el reorden aparece con scans paralelos.
+    return DuckDBEngine(resources=Resources(threads=8))
+
+
+@pytest.fixture
+def version(tmp_path):
+    path = tmp_path / "v1" / "data.parquet"
+    path.parent.mkdir()
+    table = pa.table(
+        {
+            "i": pa.array(range(N), pa.int64()),
+            "g": [i // 20_000 for i in range(N)],
+            "iv": pa.array([(i * 7919) % 1000 for i in range(N)], pa.int64()),
+        }
+    )
+    pq.write_table(table, path, row_group_size=10_000)
+    return path
+
+
+@pytest.mark.parametrize("group_by", [None, ["g"]])
+def test_winsorize_no_reordena_filas(version, tmp_path, group_by):
+    out = _engine().winsorize(version, "iv", 0.05, 0.95, None, tmp_path / "v2" / "data.parquet", group_by=group_by)
+    assert pq.read_table(out, columns=["i"]).column("i").to_pylist() == list(range(N))
+
+
+def test_winsorize_en_el_lugar_conserva_tipo(version, tmp_path):
+    out = _engine().winsorize(version, "iv", 0.05, 0.95, None, tmp_path / "v2" / "data.parquet")
+    column = pq.read_table(out).column("iv")
+    assert column.type == pa.int64()
+    assert min(column.to_pylist()) >= 49 and max(column.to_pylist()) <= 950
+
+
+def test_winsorize_a_columna_nueva_es_double(version, tmp_path):
+    out = _engine().winsorize(version, "iv", 0.05, 0.95, ["iv_w"], tmp_path / "v2" / "data.parquet")
+    schema = pq.read_schema(out)
+    assert schema.field("iv").type == pa.int64()
+    assert schema.field("iv_w").type == pa.float64()